@@ -0,0 +1,50 @@
+"""
+Benchmark del anexado incremental
+Compara anexar un lote y actualizar el análisis con momentos acumulados
+(DatasetStore.append + online_analysis) con concatenar y volver a ejecutar
+comprehensive_analysis sobre todos los datos
+
+Uso (desde backend/):
+    python -m benchmarks.benchmark_append 100000 1000000 5000000
+"""
+
+import sys
+import time
+
+import pandas as pd
+
+from src.dataset_store import DatasetStore
+from src.generate_data import generate_simulation_data
+from src.online_stats import online_analysis
+from src.statistical_analysis import comprehensive_analysis
+
+DEFAULT_ROWS_PER_PERIOD = [100_000, 1_000_000, 5_000_000]
+BATCH_ROWS = 1_000
+N_BATCHES = 20
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_ROWS_PER_PERIOD
+    _, batches = generate_simulation_data(n_before=1, n_after=BATCH_ROWS * N_BATCHES, seed=7)
+
+    print(f"Lotes de {BATCH_ROWS:,} filas ('despues'), media de {N_BATCHES} lotes")
+    print(f"{'filas/período':>14} | {'recalcular (s)':>14} | {'incremental (ms)':>16} | {'aceleración':>11}")
+    print(f"{'-' * 14}-+-{'-' * 14}-+-{'-' * 16}-+-{'-' * 11}")
+    for size in sizes:
+        df_before, df_after = generate_simulation_data(n_before=size, n_after=size, seed=42)
+        empty = df_before.iloc[:0]
+
+        # Antes: concatenar el lote y repetir el análisis completo (un solo lote)
+        start = time.perf_counter()
+        comprehensive_analysis(df_before, pd.concat([df_after, batches.iloc[:BATCH_ROWS]]))
+        full = time.perf_counter() - start
+
+        store = DatasetStore()
+        dataset_id = store.add(df_before, df_after)
+        store.running_moments(dataset_id)
+        start = time.perf_counter()
+        for index in range(N_BATCHES):
+            store.append(dataset_id, empty, batches.iloc[index * BATCH_ROWS:(index + 1) * BATCH_ROWS])
+            online_analysis(*store.running_moments(dataset_id))
+        incremental = (time.perf_counter() - start) / N_BATCHES
+
+        print(f"{size:>14,} | {full:>14.3f} | {incremental * 1000:>16.2f} | {full / incremental:>10.0f}x")
@@ -0,0 +1,68 @@
+"""
+Benchmark del análisis por lotes
+Compara batch_analysis (array irregular y núcleos por grupo) con llamar a
+comprehensive_analysis dataset por dataset, en datasets por segundo
+
+El bucle "sin normalidad" calcula las mismas secciones que batch_analysis
+por defecto (describe, Welch, Cohen's d, Levene, impacto y resumen).
+
+Uso (desde backend/):
+    python -m benchmarks.benchmark_batch
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.batch_analysis import batch_analysis, stack_datasets
+from src.descriptive import describe
+from src.statistical_analysis import (business_impact_summary, cohens_d_from_stats, comprehensive_analysis,
+                                      generate_executive_summary, levene_median_test, welch_ttest_from_stats)
+
+# (datasets, observaciones por período)
+CONFIGURATIONS = [(100, 300), (1_000, 300), (5_000, 100), (50, 20_000)]
+
+def loop_without_normality(datasets) -> None:
+    """Las secciones de batch_analysis, un dataset a la vez"""
+    for before, after in datasets:
+        before_stats, after_stats = describe(before), describe(after)
+        ttest_results = welch_ttest_from_stats(before_stats, after_stats)
+        cohens_results = cohens_d_from_stats(before_stats, after_stats)
+        levene_median_test(before, after, before_stats['mediana'], after_stats['mediana'])
+        impact = business_impact_summary(before_stats['media'], after_stats['media'], ttest_results, cohens_results)
+        generate_executive_summary(impact, ttest_results, cohens_results)
+
+def loop_comprehensive(datasets) -> None:
+    """comprehensive_analysis por dataset, como un /analyze por tienda"""
+    for before, after in datasets:
+        comprehensive_analysis(pd.DataFrame({'tiempo_atencion_min': before}),
+                               pd.DataFrame({'tiempo_atencion_min': after}))
+
+def throughput(func, *args) -> float:
+    """Datasets por segundo de una llamada sobre todos los datasets"""
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(42)
+
+    print(f"{'datasets':>8} | {'n/período':>9} | {'comprehensive (ds/s)':>20} | "
+          f"{'bucle sin normalidad (ds/s)':>27} | {'lotes (ds/s)':>12} | {'aceleración':>11}")
+    print(f"{'-' * 8}-+-{'-' * 9}-+-{'-' * 20}-+-{'-' * 27}-+-{'-' * 12}-+-{'-' * 11}")
+    for n_datasets, n in CONFIGURATIONS:
+        datasets = [(np.round(rng.normal(8.5, 2.1, n), 2), np.round(rng.normal(6.2, 1.5, n), 2))
+                    for _ in range(n_datasets)]
+        names = [f"tienda_{i}" for i in range(n_datasets)]
+
+        comprehensive = n_datasets / throughput(loop_comprehensive, datasets)
+        loop = n_datasets / throughput(loop_without_normality, datasets)
+
+        start = time.perf_counter()
+        values, counts = stack_datasets(datasets)
+        batch_analysis(names, values, counts)
+        batched = n_datasets / (time.perf_counter() - start)
+
+        print(f"{n_datasets:>8,} | {n:>9,} | {comprehensive:>20,.0f} | {loop:>27,.0f} | "
+              f"{batched:>12,.0f} | {batched / loop:>10.1f}x")
@@ -0,0 +1,30 @@
+"""
+Benchmark del generador de datos simulados
+Mide el tiempo de generate_simulation_data para distintos tamaños de muestra
+
+Uso (desde backend/):
+    python -m benchmarks.benchmark_generate_data 1000 100000 10000000
+"""
+
+import sys
+import time
+
+from src.generate_data import generate_simulation_data
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+def time_generation(n: int, seed: int = 42) -> float:
+    """
+    Mide el tiempo (segundos) de generar n registros por grupo
+    """
+    start = time.perf_counter()
+    generate_simulation_data(n_before=n, n_after=n, seed=seed)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    
+    print(f"{'n por grupo':>14} | {'tiempo (s)':>10}")
+    print(f"{'-' * 14}-+-{'-' * 10}")
+    for n in sizes:
+        print(f"{n:>14,} | {time_generation(n):>10.3f}")
@@ -0,0 +1,61 @@
+"""
+Benchmark de la ingesta por chunks (/data/upload)
+Escribe un CSV con el esquema de la simulación en el que el período antes
+ocupa varios chunks y el último trae una franja ('19:00-21:00') y un
+servidor fuera del catálogo; verifica que la concatenación conserve todos
+los valores y mide el tiempo de ingest_service_times
+
+Uso (desde backend/):
+    python -m benchmarks.benchmark_ingest 100000 1000000
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from src.generate_data import generate_simulation_data
+from src.ingest import ingest_service_times, DEFAULT_CHUNK_ROWS
+
+DEFAULT_ROWS_PER_PERIOD = [100_000, 1_000_000]
+
+# Filas fuera del catálogo al final del período antes
+EXTRA_ROWS = 100
+
+def write_mixed_csv(path: str, rows: int):
+    """CSV antes + después con las últimas EXTRA_ROWS filas de antes fuera del catálogo"""
+    df_before, df_after = generate_simulation_data(n_before=rows, n_after=rows, seed=42)
+    for column, value in (('franja_horaria', '19:00-21:00'), ('servidor', 'Servidor_4')):
+        df_before[column] = df_before[column].cat.add_categories([value])
+        df_before.loc[df_before.index[-EXTRA_ROWS:], column] = value
+    df_before.to_csv(path, index=False)
+    df_after.to_csv(path, index=False, header=False, mode='a')
+    return df_before, df_after
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_ROWS_PER_PERIOD
+    directory = tempfile.mkdtemp(prefix='kaizen_ingest_')
+
+    print(f"{'filas/período':>14} | {'filas/chunk':>11} | {'chunks':>6} | {'tiempo (s)':>10} | {'filas/s':>11}")
+    print(f"{'-' * 14}-+-{'-' * 11}-+-{'-' * 6}-+-{'-' * 10}-+-{'-' * 11}")
+    for rows in sizes:
+        path = os.path.join(directory, f'kaizen_{rows}.csv')
+        expected_before, expected_after = write_mixed_csv(path, rows)
+        # Al menos dos chunks en el período antes
+        chunk_rows = min(DEFAULT_CHUNK_ROWS, rows // 2)
+
+        start = time.perf_counter()
+        with open(path, 'rb') as file_obj:
+            df_before, df_after, report = ingest_service_times(file_obj, 'csv', chunk_rows=chunk_rows)
+        elapsed = time.perf_counter() - start
+
+        assert (len(df_before), len(df_after)) == (rows, rows)
+        for column in ('franja_horaria', 'servidor'):
+            assert df_before[column].astype(str).tolist() == expected_before[column].astype(str).tolist()
+        assert df_after['franja_horaria'].dtype == expected_after['franja_horaria'].dtype
+
+        print(f"{rows:>14,} | {chunk_rows:>11,} | {report['chunks']:>6} | {elapsed:>10.2f} | "
+              f"{2 * rows / elapsed:>11,.0f}")
+        os.remove(path)
+
+    os.rmdir(directory)
@@ -0,0 +1,108 @@
+"""
+Benchmark del análisis fuera de memoria
+Escribe archivos Parquet con el esquema de /data/save (por partes, sin
+tenerlos en memoria) y compara, en procesos separados, la memoria máxima
+(RSS) y el tiempo de cargar el archivo + comprehensive_analysis con los de
+out_of_core_analysis; en los tamaños que caben en memoria también compara
+los resultados
+
+Uso (desde backend/):
+    python -m benchmarks.benchmark_out_of_core 5000000 50000000
+"""
+
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DEFAULT_SIZES = [5_000_000, 50_000_000]
+
+# Mayor tamaño que se compara también en memoria
+MAX_IN_MEMORY_ROWS = 10_000_000
+
+WRITE_PIECE_ROWS = 1_000_000
+
+def write_dataset(path: str, rows: int, seed: int = 42) -> None:
+    """Mitad antes (8.5 ± 2.1 min) y mitad después (6.2 ± 1.5 min), por partes"""
+    rng = np.random.default_rng(seed)
+    servers = pa.array(['Ana', 'Luis', 'Marta', 'Pedro']).dictionary_encode().dictionary
+    schema = pa.schema([('fecha', pa.timestamp('ns')), ('periodo', pa.dictionary(pa.int8(), pa.string())),
+                        ('tiempo_atencion_min', pa.float64()), ('servidor', pa.dictionary(pa.int8(), pa.string()))])
+    start = np.datetime64('2024-01-01T08:00', 'ns')
+    with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+        for period, (mean, std) in (('antes', (8.5, 2.1)), ('despues', (6.2, 1.5))):
+            for offset in range(0, rows // 2, WRITE_PIECE_ROWS):
+                n = min(WRITE_PIECE_ROWS, rows // 2 - offset)
+                times = np.maximum(np.round(rng.normal(mean, std, n), 2), 1.0)
+                dates = start + (offset + np.arange(n)).astype('timedelta64[s]')
+                writer.write_table(pa.table({
+                    'fecha': dates,
+                    'periodo': pa.DictionaryArray.from_arrays(np.zeros(n, dtype=np.int8), pa.array([period])),
+                    'tiempo_atencion_min': times,
+                    'servidor': pa.DictionaryArray.from_arrays(rng.integers(0, 4, n).astype(np.int8), servers)
+                }, schema=schema))
+
+def _measure(mode: str, path: str, queue) -> None:
+    """Proceso hijo: RSS tras importar, tiempo y RSS máximo del análisis"""
+    from src.out_of_core import out_of_core_analysis
+    from src.persistence import load_simulation_data
+    from src.statistical_analysis import comprehensive_analysis
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == 'memoria':
+        result = comprehensive_analysis(*load_simulation_data(path, 'parquet'))
+    else:
+        result = out_of_core_analysis(path, 'parquet')
+    elapsed = time.perf_counter() - start
+    queue.put((result, elapsed, baseline * 1024, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024))
+
+def measure(mode: str, path: str):
+    """(resultados, segundos, RSS base, RSS máximo) en un proceso nuevo"""
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_measure, args=(mode, path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def max_relative_difference(reference, other) -> float:
+    """Mayor diferencia relativa entre valores numéricos (sin la sección de normalidad)"""
+    if isinstance(reference, dict):
+        return max([max_relative_difference(value, other[key])
+                    for key, value in reference.items() if key != 'normalidad'] or [0.0])
+    if isinstance(reference, float) and reference != other:
+        return abs(reference - other) / max(abs(reference), 1e-300)
+    return 0.0
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    directory = tempfile.mkdtemp(prefix='kaizen_out_of_core_')
+
+    print(f"{'filas':>11} | {'archivo':>8} | {'modo':>16} | {'tiempo (s)':>10} | {'RSS máx (MB)':>12} | "
+          f"{'sobre la base (MB)':>18} | {'dif. relativa máx':>17}")
+    print(f"{'-' * 11}-+-{'-' * 8}-+-{'-' * 16}-+-{'-' * 10}-+-{'-' * 12}-+-{'-' * 18}-+-{'-' * 17}")
+    for rows in sizes:
+        path = os.path.join(directory, f'kaizen_{rows}.parquet')
+        write_dataset(path, rows)
+        size_mb = os.path.getsize(path) / 2**20
+
+        out_of_core, seconds, baseline, peak = measure('fuera_de_memoria', path)
+        reference = None
+        if rows <= MAX_IN_MEMORY_ROWS:
+            reference, memory_seconds, memory_baseline, memory_peak = measure('memoria', path)
+            print(f"{rows:>11,} | {size_mb:>5.0f} MB | {'en memoria':>16} | {memory_seconds:>10.1f} | "
+                  f"{memory_peak / 2**20:>12,.0f} | {(memory_peak - memory_baseline) / 2**20:>18,.0f} | {'-':>17}")
+        difference = f"{max_relative_difference(reference, out_of_core):.1e}" if reference else '-'
+        print(f"{rows:>11,} | {size_mb:>5.0f} MB | {'fuera de memoria':>16} | {seconds:>10.1f} | "
+              f"{peak / 2**20:>12,.0f} | {(peak - baseline) / 2**20:>18,.0f} | {difference:>17}")
+        os.remove(path)
+
+    os.rmdir(directory)
@@ -0,0 +1,53 @@
+"""
+Benchmark de persistencia de datos simulados
+Compara escritura, lectura y tamaño de archivo entre CSV, Parquet y Feather
+
+Uso (desde backend/):
+    python -m benchmarks.benchmark_persistence 1000000 10000000
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from src.generate_data import generate_simulation_data
+from src.persistence import STORAGE_FORMATS, storage_path, save_simulation_data, load_simulation_data
+
+DEFAULT_TOTAL_ROWS = [1_000_000, 10_000_000]
+
+def benchmark_format(df_before, df_after, base_path: str, fmt: str) -> dict:
+    """
+    Mide escritura, lectura (memory-map) y tamaño en disco para un formato
+    """
+    path = storage_path(base_path, fmt)
+    
+    start = time.perf_counter()
+    save_simulation_data(df_before, df_after, path, fmt)
+    write_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    load_simulation_data(path, fmt)
+    read_seconds = time.perf_counter() - start
+    
+    size_mb = os.path.getsize(path) / 1e6
+    os.remove(path)
+    
+    return {'write': write_seconds, 'read': read_seconds, 'size_mb': size_mb}
+
+if __name__ == "__main__":
+    totals = [int(arg) for arg in sys.argv[1:]] or DEFAULT_TOTAL_ROWS
+    
+    print(f"{'filas':>12} | {'formato':>8} | {'escritura (s)':>13} | {'lectura (s)':>11} | {'tamaño (MB)':>11}")
+    print(f"{'-' * 12}-+-{'-' * 8}-+-{'-' * 13}-+-{'-' * 11}-+-{'-' * 11}")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for total in totals:
+            df_before, df_after = generate_simulation_data(
+                n_before=total // 2, n_after=total - total // 2, seed=42
+            )
+            for fmt in STORAGE_FORMATS:
+                result = benchmark_format(df_before, df_after,
+                                          os.path.join(tmp_dir, 'simulation_data'), fmt)
+                print(f"{total:>12,} | {fmt:>8} | {result['write']:>13.2f} | "
+                      f"{result['read']:>11.2f} | {result['size_mb']:>11.1f}")
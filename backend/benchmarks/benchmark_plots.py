@@ -0,0 +1,72 @@
+"""
+Benchmark de renderizado de gráficos
+Mide el tiempo de cada gráfico por separado, el total en serie y el total con
+un gráfico por proceso (como hace /analyze)
+
+Uso (desde backend/):
+    python -m benchmarks.benchmark_plots 200000 2000000
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.generate_data import generate_simulation_data
+from src.statistical_analysis import comprehensive_analysis
+from src.tasks import render_plot
+from src.visualization import PLOT_FILENAMES, PLOT_COLUMNS
+
+DEFAULT_TOTAL_ROWS = [200_000, 2_000_000]
+
+def plot_calls(df_before, df_after, analysis_results, output_dir: str) -> list:
+    """
+    Argumentos de render_plot para cada tipo de gráfico
+    """
+    return [
+        (plot_type, df_before[PLOT_COLUMNS[plot_type]], df_after[PLOT_COLUMNS[plot_type]],
+         analysis_results, os.path.join(output_dir, filename))
+        for plot_type, filename in PLOT_FILENAMES.items()
+    ]
+
+def timed_render(*args) -> float:
+    """Renderiza un gráfico y retorna los segundos empleados"""
+    start = time.perf_counter()
+    render_plot(*args)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    totals = [int(arg) for arg in sys.argv[1:]] or DEFAULT_TOTAL_ROWS
+    workers = int(os.getenv("KAIZEN_EXECUTOR_WORKERS", "0")) or os.cpu_count() or 1
+
+    print(f"CPUs: {os.cpu_count()} | workers: {workers}")
+    print(f"{'filas':>12} | {'gráfico':>10} | {'tiempo (s)':>10}")
+    print(f"{'-' * 12}-+-{'-' * 10}-+-{'-' * 10}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir, ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+    ) as pool:
+        # Calentar los workers (importar matplotlib) fuera de la medición
+        for future in [pool.submit(os.getpid) for _ in range(workers)]:
+            future.result()
+
+        for total in totals:
+            df_before, df_after = generate_simulation_data(
+                n_before=total // 2, n_after=total - total // 2, seed=42
+            )
+            analysis_results = comprehensive_analysis(df_before, df_after)
+            calls = plot_calls(df_before, df_after, analysis_results, tmp_dir)
+
+            serial_start = time.perf_counter()
+            for args in calls:
+                print(f"{total:>12,} | {args[0]:>10} | {timed_render(*args):>10.2f}")
+            serial = time.perf_counter() - serial_start
+
+            parallel_start = time.perf_counter()
+            list(pool.map(timed_render, *zip(*calls)))
+            parallel = time.perf_counter() - parallel_start
+
+            print(f"{total:>12,} | {'serie':>10} | {serial:>10.2f}")
+            print(f"{total:>12,} | {'paralelo':>10} | {parallel:>10.2f}")
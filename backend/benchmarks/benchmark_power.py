@@ -0,0 +1,49 @@
+"""
+Benchmark del análisis de potencia
+Compara simular cada réplica con generate_simulation_data + welch_ttest en
+un bucle con power_row (matriz réplica × n y tests vectorizados), en
+réplicas por segundo para cada tamaño de muestra
+
+Uso (desde backend/):
+    python -m benchmarks.benchmark_power 20 100 500 2000
+"""
+
+import sys
+import time
+
+from src.generate_data import generate_simulation_data
+from src.power_analysis import DEFAULT_REDUCTIONS, power_row
+from src.statistical_analysis import welch_ttest
+
+DEFAULT_SIZES = [20, 100, 500, 2000]
+LOOP_REPLICATES = 100
+VECTOR_REPLICATES = 2000
+BEFORE_MEAN, BEFORE_STD, AFTER_STD = 8.5, 2.1, 1.5
+
+def loop_power(n: int, reductions, n_replicates: int, alpha: float = 0.05) -> None:
+    """Una simulación completa y un t-test por réplica y reducción"""
+    for reduction in reductions:
+        for replicate in range(n_replicates):
+            df_before, df_after = generate_simulation_data(
+                n_before=n, n_after=n, before_mean=BEFORE_MEAN, after_mean=BEFORE_MEAN * (1 - reduction / 100),
+                before_std=BEFORE_STD, after_std=AFTER_STD, seed=replicate
+            )
+            welch_ttest(df_before['tiempo_atencion_min'].to_numpy(), df_after['tiempo_atencion_min'].to_numpy(), alpha)
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    reductions = DEFAULT_REDUCTIONS
+
+    print(f"{len(reductions)} reducciones por tamaño; réplicas × reducciones por segundo")
+    print(f"{'n/período':>10} | {'bucle (tests/s)':>15} | {'matriz (tests/s)':>16} | {'aceleración':>11}")
+    print(f"{'-' * 10}-+-{'-' * 15}-+-{'-' * 16}-+-{'-' * 11}")
+    for n in sizes:
+        start = time.perf_counter()
+        loop_power(n, reductions, LOOP_REPLICATES)
+        loop = LOOP_REPLICATES * len(reductions) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        power_row(BEFORE_MEAN, BEFORE_STD, AFTER_STD, n, n, reductions, VECTOR_REPLICATES, seed=1)
+        vectorized = VECTOR_REPLICATES * len(reductions) / (time.perf_counter() - start)
+
+        print(f"{n:>10,} | {loop:>15,.0f} | {vectorized:>16,.0f} | {vectorized / loop:>10.0f}x")
@@ -0,0 +1,63 @@
+"""
+Benchmark de los cuantiles aproximados
+Compara los cuartiles exactos de describe() (np.partition sobre el array
+completo) con un sketch de cuantiles: tiempo de construcción, memoria, error
+observado frente a la cota, combinación de sketches por chunk y costo de
+actualizar los cuartiles tras anexar un lote
+
+Uso (desde backend/):
+    python -m benchmarks.benchmark_quantile_sketch 100000 1000000 10000000
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from src.descriptive import describe
+from src.quantile_sketch import QuantileSketch, merge_sketches
+
+DEFAULT_SIZES = [100_000, 1_000_000, 10_000_000]
+QUANTILES = [0.25, 0.5, 0.75]
+CHUNKS = 16
+BATCH = 1_000
+
+def timed(func, *args):
+    """(resultado, segundos) de una llamada"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    rng = np.random.default_rng(42)
+
+    print(f"{'filas':>11} | {'describe (s)':>12} | {'sketch (s)':>10} | {f'{CHUNKS} chunks + merge (s)':>21} | "
+          f"{'memoria array':>13} | {'sketch':>8} | {'error máx / cota':>16} | {'anexar: exacto (ms)':>19} | "
+          f"{'sketch (ms)':>11}")
+    print(f"{'-' * 11}-+-{'-' * 12}-+-{'-' * 10}-+-{'-' * 21}-+-{'-' * 13}-+-{'-' * 8}-+-{'-' * 16}-+-"
+          f"{'-' * 19}-+-{'-' * 11}")
+    for n in sizes:
+        values = np.maximum(np.round(rng.normal(8.5, 2.1, n), 2), 1.0)
+
+        exact, exact_seconds = timed(describe, values)
+        sketch, sketch_seconds = timed(QuantileSketch.from_values, values)
+
+        # Un sketch por chunk (como por worker o por chunk de un archivo) y combinación
+        start = time.perf_counter()
+        merged = merge_sketches([QuantileSketch.from_values(chunk) for chunk in np.array_split(values, CHUNKS)])
+        chunk_seconds = time.perf_counter() - start
+        assert merged.offset == sketch.offset and np.array_equal(merged.counts, sketch.counts)
+
+        approximate = sketch.quantiles(QUANTILES)
+        truth = np.array([exact['q25'], exact['mediana'], exact['q75']])
+        error_ratio = (np.abs(approximate - truth) / sketch.error_bound(approximate)).max()
+
+        # Cuartiles tras anexar un lote: concatenar + particionar vs actualizar el sketch
+        batch = np.maximum(np.round(rng.normal(6.2, 1.5, BATCH), 2), 1.0)
+        _, append_exact = timed(lambda: describe(np.concatenate([values, batch])))
+        _, append_sketch = timed(lambda: sketch.update(batch).quantiles(QUANTILES))
+
+        print(f"{n:>11,} | {exact_seconds:>12.4f} | {sketch_seconds:>10.4f} | {chunk_seconds:>21.4f} | "
+              f"{values.nbytes / 2**20:>10.1f} MB | {sketch.nbytes / 1024:>5.1f} KB | {error_ratio:>16.2f} | "
+              f"{append_exact * 1000:>19.2f} | {append_sketch * 1000:>11.3f}")
@@ -0,0 +1,51 @@
+"""
+Benchmark de perfiles de renderizado
+Mide tiempo y tamaño de los cinco gráficos para cada perfil y formato
+
+Uso (desde backend/):
+    python -m benchmarks.benchmark_render_profiles 200000
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from src.generate_data import generate_simulation_data
+from src.statistical_analysis import comprehensive_analysis
+from src.visualization import PLOT_FILENAMES, PLOT_FORMATS, RENDER_PROFILES, create_plot, plot_filename
+
+DEFAULT_TOTAL_ROWS = 200_000
+
+def benchmark_profile(df_before, df_after, analysis_results, output_dir: str,
+                      profile: str, fmt: str) -> dict:
+    """
+    Renderiza todos los gráficos con un perfil y formato; retorna segundos y bytes
+    """
+    seconds = 0.0
+    size = 0
+    for plot_type in PLOT_FILENAMES:
+        path = os.path.join(output_dir, plot_filename(plot_type, fmt))
+        start = time.perf_counter()
+        create_plot(plot_type, df_before, df_after, analysis_results, path, profile)
+        seconds += time.perf_counter() - start
+        size += os.path.getsize(path)
+        os.remove(path)
+    return {'seconds': seconds, 'size_kb': size / 1024}
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TOTAL_ROWS
+    df_before, df_after = generate_simulation_data(
+        n_before=total // 2, n_after=total - total // 2, seed=42
+    )
+    analysis_results = comprehensive_analysis(df_before, df_after)
+
+    print(f"{total:,} filas, 5 gráficos por combinación")
+    print(f"{'perfil':>8} | {'formato':>7} | {'tiempo (s)':>10} | {'tamaño (KB)':>11}")
+    print(f"{'-' * 8}-+-{'-' * 7}-+-{'-' * 10}-+-{'-' * 11}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for profile in RENDER_PROFILES:
+            for fmt in PLOT_FORMATS:
+                result = benchmark_profile(df_before, df_after, analysis_results, tmp_dir, profile, fmt)
+                print(f"{profile:>8} | {fmt:>7} | {result['seconds']:>10.2f} | {result['size_kb']:>11.0f}")
@@ -0,0 +1,84 @@
+"""
+Benchmark del remuestreo (bootstrap y test de permutación)
+Compara un bucle de Python (una remuestra por iteración con rng.choice) con
+los bloques de src.resampling, y mide el pico de memoria de
+bootstrap_blocks con distintos presupuestos
+
+Uso (desde backend/):
+    python -m benchmarks.benchmark_resampling 1000 10000 100000
+"""
+
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from src.generate_data import generate_simulation_data
+from src.resampling import bootstrap_blocks, n_blocks, permutation_blocks
+
+DEFAULT_ROWS_PER_PERIOD = [1_000, 10_000, 100_000]
+N_RESAMPLES = 2_000
+LOOP_RESAMPLES = 200
+MEMORY_BUDGETS = [16 * 1024**2, 64 * 1024**2, 256 * 1024**2]
+
+def loop_bootstrap(before: np.ndarray, after: np.ndarray, n_resamples: int, seed: int = 0) -> None:
+    """Diferencia de medias, de medianas y Cohen's d remuestra por remuestra"""
+    rng = np.random.default_rng(seed)
+    for _ in range(n_resamples):
+        b = rng.choice(before, before.size)
+        a = rng.choice(after, after.size)
+        pooled = np.sqrt(((b.size - 1) * b.var(ddof=1) + (a.size - 1) * a.var(ddof=1)) / (b.size + a.size - 2))
+        b.mean() - a.mean(), np.median(b) - np.median(a), (b.mean() - a.mean()) / pooled
+
+def loop_permutation(before: np.ndarray, after: np.ndarray, n_resamples: int, seed: int = 0) -> None:
+    """Diferencia de medias de cada permutación con rng.permutation"""
+    rng = np.random.default_rng(seed)
+    pooled = np.concatenate([before, after])
+    for _ in range(n_resamples):
+        shuffled = rng.permutation(pooled)
+        shuffled[:before.size].mean() - shuffled[before.size:].mean()
+
+def timed(func, *args) -> float:
+    """Segundos de una llamada"""
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_ROWS_PER_PERIOD
+    blocks = n_blocks(N_RESAMPLES)
+
+    print(f"{'filas/período':>14} | {'prueba':>11} | {'bucle (rem/s)':>13} | {'bloques (rem/s)':>15} | {'aceleración':>11}")
+    print(f"{'-' * 14}-+-{'-' * 11}-+-{'-' * 13}-+-{'-' * 15}-+-{'-' * 11}")
+    for size in sizes:
+        df_before, df_after = generate_simulation_data(n_before=size, n_after=size, seed=42)
+        before = df_before['tiempo_atencion_min'].to_numpy()
+        after = df_after['tiempo_atencion_min'].to_numpy()
+
+        loop = LOOP_RESAMPLES / timed(loop_bootstrap, before, after, LOOP_RESAMPLES)
+        vectorized = N_RESAMPLES / timed(bootstrap_blocks, before, after, N_RESAMPLES, 7, 0, blocks)
+        print(f"{size:>14,} | {'bootstrap':>11} | {loop:>13,.0f} | {vectorized:>15,.0f} | {vectorized / loop:>10.1f}x")
+
+        loop = LOOP_RESAMPLES / timed(loop_permutation, before, after, LOOP_RESAMPLES)
+        vectorized = N_RESAMPLES / timed(permutation_blocks, before, after, N_RESAMPLES, 7, 0, blocks)
+        print(f"{size:>14,} | {'permutación':>11} | {loop:>13,.0f} | {vectorized:>15,.0f} | {vectorized / loop:>10.1f}x")
+
+    # Pico de memoria del bootstrap frente al presupuesto (resultado idéntico en todos los casos)
+    size = sizes[-1]
+    df_before, df_after = generate_simulation_data(n_before=size, n_after=size, seed=42)
+    before = df_before['tiempo_atencion_min'].to_numpy()
+    after = df_after['tiempo_atencion_min'].to_numpy()
+    print(f"\n{'presupuesto (MiB)':>17} | {'pico (MiB)':>10} | {'tiempo (s)':>10} | {'idéntico':>8}")
+    print(f"{'-' * 17}-+-{'-' * 10}-+-{'-' * 10}-+-{'-' * 8}")
+    reference = None
+    for budget in MEMORY_BUDGETS:
+        tracemalloc.start()
+        start = time.perf_counter()
+        replicates = bootstrap_blocks(before, after, N_RESAMPLES, 7, 0, blocks, memory_bytes=budget)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        reference = replicates if reference is None else reference
+        print(f"{budget / 1024**2:>17.0f} | {peak / 1024**2:>10.1f} | {elapsed:>10.2f} | "
+              f"{str(np.array_equal(reference, replicates)):>8}")
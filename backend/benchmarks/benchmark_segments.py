@@ -0,0 +1,49 @@
+"""
+Benchmark del análisis segmentado
+Compara segmented_analysis (momentos agrupados y tests vectorizados) con
+iterar welch_ttest + cohens_d sobre cada segmento filtrado con pandas
+
+Uso (desde backend/):
+    python -m benchmarks.benchmark_segments 100000 1000000
+"""
+
+import sys
+import time
+
+from src.generate_data import generate_simulation_data
+from src.segments import segmented_analysis
+from src.statistical_analysis import cohens_d, welch_ttest
+
+DEFAULT_ROWS_PER_PERIOD = [100_000, 1_000_000]
+SEGMENTATIONS = [['servidor'], ['servidor', 'franja_horaria'], ['servidor', 'franja_horaria', 'dia_semana']]
+
+def loop_segments(df_before, df_after, by) -> int:
+    """Un t-test y un Cohen's d por segmento, con groupby de pandas"""
+    after_groups = dict(list(df_after.groupby(by, observed=True)['tiempo_atencion_min']))
+    tested = 0
+    for key, before_times in df_before.groupby(by, observed=True)['tiempo_atencion_min']:
+        after_times = after_groups.get(key)
+        if after_times is not None and len(before_times) > 1 and len(after_times) > 1:
+            welch_ttest(before_times.to_numpy(), after_times.to_numpy())
+            cohens_d(before_times.to_numpy(), after_times.to_numpy())
+            tested += 1
+    return tested
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_ROWS_PER_PERIOD
+
+    print(f"{'filas/período':>14} | {'segmentos':>9} | {'bucle (s)':>9} | {'vectorizado (s)':>15} | {'aceleración':>11}")
+    print(f"{'-' * 14}-+-{'-' * 9}-+-{'-' * 9}-+-{'-' * 15}-+-{'-' * 11}")
+    for size in sizes:
+        df_before, df_after = generate_simulation_data(n_before=size, n_after=size, seed=42)
+        for by in SEGMENTATIONS:
+            start = time.perf_counter()
+            loop_segments(df_before, df_after, by)
+            loop = time.perf_counter() - start
+
+            start = time.perf_counter()
+            result = segmented_analysis(df_before, df_after, by)
+            vectorized = time.perf_counter() - start
+
+            print(f"{size:>14,} | {result['n_testeados']:>9} | {loop:>9.3f} | {vectorized:>15.3f} | "
+                  f"{loop / vectorized:>10.1f}x")
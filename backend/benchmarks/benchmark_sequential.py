@@ -0,0 +1,81 @@
+"""
+Benchmark del test secuencial
+Compara el costo de actualizar el mSPRT con cada observación nueva (sumas
+acumuladas sobre los momentos previos) con recalcular el Welch t-test sobre
+todos los datos en cada mirada, y mide los falsos positivos de ambos bajo la
+hipótesis nula cuando se mira después de cada observación
+
+Uso (desde backend/):
+    python -m benchmarks.benchmark_sequential
+"""
+
+import time
+
+import numpy as np
+
+from src.online_stats import RunningMoments
+from src.sequential_testing import SequentialMonitor, prefix_moments
+from src.statistical_analysis import welch_ttest
+
+STREAM_SIZES = [1_000, 10_000, 100_000]
+NULL_SIMULATIONS = 300
+NULL_BEFORE, NULL_STREAM = 300, 2_000
+
+def welch_every_look(before: np.ndarray, after: np.ndarray, looks: int) -> None:
+    """Un Welch t-test sobre todos los datos en cada una de las últimas `looks` miradas"""
+    for k in range(after.size - looks, after.size):
+        welch_ttest(before, after[:k + 1])
+
+def null_false_positives(rng: np.random.Generator, alpha: float = 0.05):
+    """Proporción de flujos sin efecto en que cada método llega a declarar diferencia"""
+    sequential = naive = 0
+    for _ in range(NULL_SIMULATIONS):
+        before = rng.normal(8.5, 2.1, NULL_BEFORE)
+        after = rng.normal(8.5, 2.1, NULL_STREAM)
+        sequential += SequentialMonitor.from_data(before, after).summary(alpha)['decision'] != 'continuar'
+
+        base = RunningMoments.from_values(before).to_stats()
+        n, means, variances = prefix_moments(RunningMoments(), after)
+        t = (base['media'] - means[9:]) / np.sqrt(base['var'] / before.size + variances[9:] / n[9:])
+        # |t| > 1.96 ~ p < 0.05 con estos tamaños
+        naive += bool((np.abs(t) > 1.96).any())
+    return sequential / NULL_SIMULATIONS, naive / NULL_SIMULATIONS
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(42)
+
+    print(f"{'flujo después':>13} | {'Welch completo (µs/mirada)':>26} | {'mSPRT (µs/mirada)':>17} | "
+          f"{'aceleración':>11} | {'parada (n_despues)':>18}")
+    print(f"{'-' * 13}-+-{'-' * 26}-+-{'-' * 17}-+-{'-' * 11}-+-{'-' * 18}")
+    for n in STREAM_SIZES:
+        before = np.round(rng.normal(8.5, 2.1, 500), 2)
+        after = np.round(rng.normal(7.8, 2.0, n), 2)
+
+        looks = 200
+        start = time.perf_counter()
+        welch_every_look(before, after, looks)
+        full = (time.perf_counter() - start) / looks * 1e6
+
+        # Flujo en lotes de una observación, como /append en vivo
+        monitor = SequentialMonitor.from_data(before, after[:-looks])
+        before_moments = RunningMoments.from_values(before)
+        after_moments = RunningMoments.from_values(after[:-looks])
+        start = time.perf_counter()
+        for value in after[-looks:]:
+            batch = np.array([value])
+            monitor.observe(before_moments, after_moments, batch)
+            after_moments.update(batch)
+        incremental = (time.perf_counter() - start) / looks * 1e6
+
+        summary = monitor.summary()
+        rebuilt = SequentialMonitor.from_data(before, after).summary()
+        assert np.isclose(summary['p_value'], rebuilt['p_value'], rtol=1e-9, atol=1e-300)
+        stop = f"{summary['punto_parada']['n_despues']:,}" if summary['punto_parada'] else "-"
+
+        print(f"{n:>13,} | {full:>26,.1f} | {incremental:>17,.1f} | {full / incremental:>10.1f}x | "
+              f"{stop:>18}")
+
+    sequential, naive = null_false_positives(rng)
+    print(f"\nFalsos positivos sin efecto ({NULL_SIMULATIONS} flujos, mirando tras cada observación, alpha 0.05):")
+    print(f"  mSPRT (p-value siempre válido): {sequential:.1%}")
+    print(f"  Welch repetido en cada mirada:  {naive:.1%}")
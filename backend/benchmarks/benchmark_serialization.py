@@ -0,0 +1,69 @@
+"""
+Benchmark de serialización y compresión de respuestas
+Compara jsonable_encoder + json estándar (lo que hacía FastAPI) con orjson
+sobre el resultado de /analyze y páginas de /data/current, y mide el tamaño
+sin comprimir, con gzip y con brotli
+
+Uso (desde backend/):
+    python -m benchmarks.benchmark_serialization 1000000
+"""
+
+import gzip
+import sys
+import time
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from src.data_query import read_page, records
+from src.generate_data import generate_simulation_data, get_simulation_summary
+from src.responses import FastJSONResponse, brotli
+from src.statistical_analysis import comprehensive_analysis
+
+DEFAULT_TOTAL_ROWS = 1_000_000
+PAGE_SIZES = [1_000, 100_000]
+REPEATS = 3
+
+def best_time(func) -> float:
+    """Mejor tiempo de REPEATS ejecuciones, en segundos"""
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def benchmark_payload(name: str, build) -> None:
+    """
+    Mide serialización antes/después y tamaño comprimido de un payload
+    """
+    stdlib = best_time(lambda: JSONResponse(jsonable_encoder(build())).body)
+    fast = best_time(lambda: FastJSONResponse(build()).body)
+    body = FastJSONResponse(build()).body
+    gzip_size = len(gzip.compress(body, 6))
+    br_size = len(brotli.compress(body, quality=4)) if brotli is not None else None
+
+    print(f"{name:>20} | {stdlib * 1000:>9.1f} | {fast * 1000:>9.1f} | {len(body) / 1024:>9.0f} | "
+          f"{gzip_size / 1024:>8.0f} | {'-' if br_size is None else f'{br_size / 1024:.0f}':>8}")
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TOTAL_ROWS
+    df_before, df_after = generate_simulation_data(
+        n_before=total // 2, n_after=total - total // 2, seed=42
+    )
+    analysis_results = comprehensive_analysis(df_before, df_after)
+    summary = get_simulation_summary(df_before, df_after)
+    frames = [df_before, df_after]
+
+    print(f"{total:,} filas | tiempos de serialización (mejor de {REPEATS})")
+    print(f"{'payload':>20} | {'json (ms)':>9} | {'orjson(ms)':>9} | {'bytes (KB)':>9} | "
+          f"{'gzip (KB)':>8} | {'br (KB)':>8}")
+    print(f"{'-' * 20}-+-{'-' * 9}-+-{'-' * 9}-+-{'-' * 9}-+-{'-' * 8}-+-{'-' * 8}")
+
+    benchmark_payload("analyze", lambda: {"data": {"analysis_results": analysis_results}})
+    for page_size in PAGE_SIZES:
+        (page_before, page_after), _ = read_page(frames, {}, limit=page_size)
+        benchmark_payload(
+            f"data/current {page_size:,}",
+            lambda: {"before": records(page_before), "after": records(page_after), "summary": summary}
+        )
@@ -0,0 +1,65 @@
+"""
+Benchmark del núcleo de estadísticas descriptivas
+Compara el cálculo anterior (una llamada de NumPy/SciPy por estadístico,
+medias y varianzas repetidas en el t-test, Cohen's d y el resumen) con
+describe() compartido por todas las salidas
+
+Uso (desde backend/):
+    python -m benchmarks.benchmark_statistics 100000 1000000 10000000
+"""
+
+import sys
+import time
+
+import numpy as np
+from scipy import stats
+
+from src.descriptive import describe
+from src.statistical_analysis import cohens_d_from_stats, levene_median_test, welch_ttest_from_stats
+
+DEFAULT_ROWS_PER_PERIOD = [100_000, 1_000_000, 10_000_000]
+REPEATS = 3
+
+def legacy_statistics(before: np.ndarray, after: np.ndarray) -> None:
+    """Estadísticos como se calculaban antes de describe()"""
+    for times in (before, after):
+        np.mean(times), np.median(times), np.std(times, ddof=1), np.var(times, ddof=1)
+        np.min(times), np.max(times), np.percentile(times, 25), np.percentile(times, 75)
+        np.percentile(times, 75) - np.percentile(times, 25)
+        # Resumen de get_simulation_summary (pandas en el original)
+        np.mean(times), np.median(times), np.std(times, ddof=1), np.min(times), np.max(times)
+    # welch_ttest
+    stats.ttest_ind(before, after, equal_var=False)
+    np.var(before, ddof=1), np.var(after, ddof=1), np.mean(before) - np.mean(after)
+    # cohens_d
+    np.mean(before), np.mean(after), np.std(before, ddof=1), np.std(after, ddof=1)
+    stats.levene(before, after)
+
+def kernel_statistics(before: np.ndarray, after: np.ndarray) -> None:
+    """Estadísticos con describe() compartido"""
+    before_stats, after_stats = describe(before), describe(after)
+    welch_ttest_from_stats(before_stats, after_stats)
+    cohens_d_from_stats(before_stats, after_stats)
+    levene_median_test(before, after, before_stats['mediana'], after_stats['mediana'])
+
+def best_time(func, *args) -> float:
+    """Mejor tiempo de REPEATS ejecuciones, en segundos"""
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_ROWS_PER_PERIOD
+    rng = np.random.default_rng(42)
+
+    print(f"{'filas/período':>14} | {'antes (s)':>9} | {'núcleo (s)':>10} | {'aceleración':>11}")
+    print(f"{'-' * 14}-+-{'-' * 9}-+-{'-' * 10}-+-{'-' * 11}")
+    for size in sizes:
+        before = rng.gamma(16, 8.5 / 16, size)
+        after = rng.gamma(16, 6.2 / 16, size)
+        legacy = best_time(legacy_statistics, before, after)
+        kernel = best_time(kernel_statistics, before, after)
+        print(f"{size:>14,} | {legacy:>9.3f} | {kernel:>10.3f} | {legacy / kernel:>10.1f}x")
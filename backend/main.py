@@ -3,21 +3,50 @@ API FastAPI para análisis Kaizen - Cafetería
 Endpoints para simulación de datos y análisis estadístico
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Header, UploadFile, File
+from starlette.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+import numpy as np
 import pandas as pd
 import os
+import shutil
+import uuid
 import json
-from datetime import datetime
+import time
+from datetime import datetime, date
 
 # Importar módulos locales
-from src.generate_data import generate_simulation_data, get_simulation_summary, save_simulation_to_csv
-from src.statistical_analysis import comprehensive_analysis
-from src.visualization import generate_all_plots, create_combined_dashboard
+from src.generate_data import get_simulation_summary, memory_footprint
+from src.persistence import STORAGE_FORMATS, storage_path, save_simulation_data, load_simulation_data
+from src.ingest import UPLOAD_FORMATS, infer_upload_format, ingest_service_times, prepare_chunk
+from src.dataset_store import DatasetStore, DatasetNotFoundError
+from src.online_stats import online_analysis
+from src.sequential_testing import DEFAULT_CURVE_POINTS
+from src.descriptive import describe
+from src.executor import TaskQueueFullError, TaskTimeoutError, executor_from_env
+from src.tasks import (run_simulation, run_analysis, run_segmented_analysis, run_bootstrap_blocks,
+                       run_permutation_blocks, run_power_row, run_batch_analysis, run_out_of_core_analysis,
+                       render_plot)
+from src.resampling import MAX_RESAMPLES, block_ranges, new_seed, summarize_bootstrap, summarize_permutation
+from src.segments import SEGMENT_COLUMNS, CORRECTION_METHODS
+from src.batch_analysis import MAX_BATCH_DATASETS, stack_datasets
+from src.ingest import DEFAULT_CHUNK_ROWS
+from src.power_analysis import (DEFAULT_REPLICATES, DEFAULT_TARGET_POWER, power_grid, validate_power_params,
+                                summarize_power)
+from src.jobs import JobManager, JobNotFoundError, JobQueueFullError
+from src.data_query import (DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, DATA_RESPONSE_FORMATS, InvalidCursorError,
+                            encode_cursor, decode_cursor, count_rows, read_page, records, iter_ndjson)
+from src.charts import CHART_TYPES, MAX_HISTOGRAM_BINS, MAX_OUTLIER_SAMPLE, sketch_boxplot_data
+from src.quantile_sketch import (QUANTILE_MODES, DEFAULT_RELATIVE_ACCURACY, MIN_RELATIVE_ACCURACY,
+                                 MAX_RELATIVE_ACCURACY, QuantileSketch, describe_with_sketch)
+from src.responses import FastJSONResponse, CompressionMiddleware, DEFAULT_MINIMUM_SIZE
+from src.cache import AnalysisCache, analysis_cache_key, render_options_key, file_etag, etag_matches
+from src.visualization import (PLOT_FILENAMES, PLOT_COLUMNS, PLOT_FORMATS, RENDER_PROFILES,
+                               ANALYSIS_PLOT_TYPES, plot_filename)
 
 # Crear instancia de FastAPI
 app = FastAPI(
@@ -25,7 +54,8 @@ app = FastAPI(
     description="API para análisis estadístico de mejoras en tiempo de atención usando metodología Kaizen",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse
 )
 
 # Configurar CORS para permitir requests desde frontend
@@ -37,6 +67,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compresión gzip/brotli de respuestas grandes (JSON, NDJSON, SVG)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("KAIZEN_COMPRESSION_MIN_BYTES", str(DEFAULT_MINIMUM_SIZE)))
+)
+
 # Montar archivos estáticos para servir gráficos
 app.mount("/static", StaticFiles(directory="static"), name="static")
 app.mount("/reports", StaticFiles(directory="reports"), name="reports")
@@ -50,6 +86,28 @@ class SimulationRequest(BaseModel):
     before_std: float = 2.1
     after_std: float = 1.5
     seed: Optional[int] = None
+    n_workers: int = 1
+
+class PowerRequest(SimulationRequest):
+    n_grid: Optional[List[int]] = None
+    reductions: Optional[List[float]] = None
+    n_replicates: int = DEFAULT_REPLICATES
+    alpha: float = 0.05
+    target_power: float = DEFAULT_TARGET_POWER
+
+class BatchDataset(BaseModel):
+    nombre: str
+    antes: List[float]
+    despues: List[float]
+
+class BatchAnalysisRequest(BaseModel):
+    datasets: List[BatchDataset]
+    alpha: float = 0.05
+    include_normality: bool = False
+
+class AppendRequest(BaseModel):
+    observaciones: List[Dict[str, Any]]
+    periodo: str = "despues"
 
 class AnalysisResponse(BaseModel):
     success: bool
@@ -58,9 +116,188 @@ class AnalysisResponse(BaseModel):
     plots: Optional[Dict[str, str]] = None
     timestamp: str
 
-# Variables globales para almacenar datos actuales
-current_data_before = None
-current_data_after = None
+def analysis_response(**fields) -> FastJSONResponse:
+    """
+    AnalysisResponse serializada directamente con orjson
+
+    Devolver la respuesta ya construida evita que FastAPI recorra los
+    resultados con jsonable_encoder.
+    """
+    return FastJSONResponse(AnalysisResponse(**fields).model_dump())
+
+# Directorio con los archivos (CSV, gráficos) de cada dataset
+DATASETS_DIR = "reports/datasets"
+
+# Caché de gráficos renderizados: reports/plots/<huella del dataset>/<opciones>/
+PLOTS_DIR = "reports/plots"
+
+# Gráficos individuales (el dashboard se pide aparte)
+INDIVIDUAL_PLOT_TYPES = [plot_type for plot_type in PLOT_FILENAMES if plot_type != "dashboard"]
+
+# Nombre base (sin extensión) de los datos persistidos de cada dataset
+DATA_FILENAME = "simulation_data"
+
+# Almacén de datasets: presupuesto de memoria y volcado opcional a disco
+dataset_store = DatasetStore(
+    max_bytes=int(os.getenv("KAIZEN_STORE_MAX_BYTES", str(2 * 1024**3))),
+    spill_dir=os.getenv("KAIZEN_STORE_SPILL_DIR") or None
+)
+
+# Pool de workers para generación, análisis y gráficos (fuera del event loop)
+task_executor = executor_from_env()
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    """Detiene el pool de workers al apagar la API"""
+    task_executor.shutdown(wait=False)
+
+async def run_task(func, *args, **kwargs):
+    """
+    Ejecuta una tarea en el pool de workers traduciendo los errores de la cola
+    
+    Cola llena -> 503; timeout -> 504.
+    """
+    try:
+        return await task_executor.run(func, *args, **kwargs)
+    except TaskQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+async def run_tasks(calls):
+    """
+    Ejecuta varias tareas en paralelo (un solo lugar de cola) traduciendo los
+    errores de la cola; retorna el resultado o la excepción de cada una
+    """
+    try:
+        return await task_executor.run_many(calls)
+    except TaskQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+# Caché de resultados de comprehensive_analysis (memoria LRU + disco opcional)
+analysis_cache = AnalysisCache(
+    max_entries=int(os.getenv("KAIZEN_ANALYSIS_CACHE_SIZE", "128")),
+    cache_dir=os.getenv("KAIZEN_ANALYSIS_CACHE_DIR") or None
+)
+
+# Caché en memoria de los datos agregados de /charts
+chart_cache = AnalysisCache(max_entries=int(os.getenv("KAIZEN_ANALYSIS_CACHE_SIZE", "128")))
+
+# Contadores del caché de gráficos
+plot_cache_stats = {"hits": 0, "renders": 0}
+
+# Trabajos de análisis en segundo plano (sin broker externo)
+job_manager = JobManager(
+    max_concurrent=int(os.getenv("KAIZEN_MAX_CONCURRENT_JOBS", "2")),
+    max_queued=int(os.getenv("KAIZEN_MAX_QUEUED_JOBS", "8"))
+)
+
+def dataset_dir(dataset_id: str) -> str:
+    """Directorio de archivos de un dataset"""
+    return os.path.join(DATASETS_DIR, dataset_id)
+
+def plot_path(fingerprint: str, plot_type: str, alpha: float = 0.05,
+              profile: str = "print", fmt: str = "png") -> str:
+    """
+    Ruta en caché de un gráfico: depende del contenido del dataset, del perfil
+    y formato de renderizado y, para los gráficos que muestran resultados del
+    análisis, de sus parámetros
+    """
+    options = {"profile": profile, "format": fmt}
+    if plot_type in ANALYSIS_PLOT_TYPES:
+        options["alpha"] = alpha
+    return os.path.join(PLOTS_DIR, fingerprint, render_options_key(options), plot_filename(plot_type, fmt))
+
+def check_render_options(profile: str, fmt: str) -> None:
+    """
+    Valida perfil y formato de renderizado o responde 400
+    """
+    if profile not in RENDER_PROFILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Perfil '{profile}' no soportado. Disponibles: {list(RENDER_PROFILES.keys())}"
+        )
+    if fmt not in PLOT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Formato '{fmt}' no soportado. Disponibles: {list(PLOT_FORMATS.keys())}"
+        )
+
+def check_quantile_mode(quantiles: str) -> None:
+    """
+    Valida el modo de cálculo de cuantiles o responde 400
+    """
+    if quantiles not in QUANTILE_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Modo de cuantiles '{quantiles}' no soportado. Disponibles: {list(QUANTILE_MODES)}"
+        )
+
+def requested_plot_types(generate_plots: bool, create_dashboard: bool) -> List[str]:
+    """Tipos de gráfico a renderizar según las opciones de /analyze"""
+    return (INDIVIDUAL_PLOT_TYPES if generate_plots else []) + (["dashboard"] if create_dashboard else [])
+
+def remove_saved_data(dataset_id: str) -> List[str]:
+    """
+    Borra los archivos de datos guardados de un dataset (/data/save,
+    /data/download, CSV de /simulate) cuando su contenido cambia
+    
+    Returns:
+        Rutas borradas
+    """
+    removed = []
+    for fmt in STORAGE_FORMATS:
+        file_path = storage_path(os.path.join(dataset_dir(dataset_id), DATA_FILENAME), fmt)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+            removed.append(file_path)
+    return removed
+
+def remove_dataset(dataset_id: str) -> List[str]:
+    """
+    Elimina un dataset del almacén o responde 404
+    
+    Returns:
+        Directorios de archivos a limpiar (los gráficos solo si ningún otro
+        dataset comparte el mismo contenido)
+    """
+    try:
+        fingerprint = dataset_store.info(dataset_id)["fingerprint"]
+    except DatasetNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Dataset '{dataset_id}' no encontrado.")
+    
+    dataset_store.remove(dataset_id)
+    directories = [dataset_dir(dataset_id)]
+    if fingerprint and not dataset_store.has_fingerprint(fingerprint):
+        directories.append(os.path.join(PLOTS_DIR, fingerprint))
+    return directories
+
+async def get_dataset(dataset_id: Optional[str]):
+    """
+    Obtiene (id, antes, después) del almacén o responde 404
+    
+    Sin dataset_id se usa el dataset más reciente. get() puede recargar un
+    volcado desde disco o concatenar lotes anexados con el lock del almacén
+    tomado, por eso corre fuera del event loop.
+    """
+    try:
+        dataset_id = dataset_store.resolve_id(dataset_id)
+        df_before, df_after = await run_in_threadpool(dataset_store.get, dataset_id)
+    except DatasetNotFoundError:
+        detail = (f"Dataset '{dataset_id}' no encontrado." if dataset_id
+                  else "No hay datos disponibles. Ejecuta /simulate primero.")
+        raise HTTPException(status_code=404, detail=detail)
+    return dataset_id, df_before, df_after
+
+def check_storage_format(format: str) -> None:
+    """Valida el formato de almacenamiento o responde 400"""
+    if format not in STORAGE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Formato '{format}' no soportado. Disponibles: {list(STORAGE_FORMATS.keys())}"
+        )
 
 @app.get("/")
 async def root():
@@ -71,6 +308,7 @@ async def root():
         "endpoints": {
             "simulate": "/simulate - Generar datos simulados",
             "analyze": "/analyze - Realizar análisis estadístico",
+            "datasets": "/datasets - Listar datasets disponibles",
             "health": "/health - Estado de la API",
             "docs": "/docs - Documentación interactiva"
         },
@@ -91,38 +329,43 @@ async def health_check():
 async def simulate_data(request: SimulationRequest):
     """
     Genera datos simulados de tiempos de atención antes y después de Kaizen
-    """
-    global current_data_before, current_data_after
     
+    Los datos se registran como un dataset nuevo; el ID devuelto se usa en
+    /analyze, /data/current y /plots.
+    """
     try:
-        # Generar datos simulados
-        df_before, df_after = generate_simulation_data(
-            n_before=request.n_before,
-            n_after=request.n_after,
-            before_mean=request.before_mean,
-            after_mean=request.after_mean,
-            before_std=request.before_std,
-            after_std=request.after_std,
-            seed=request.seed
+        # Generar datos simulados y guardarlos en CSV en el pool de workers
+        dataset_id = uuid.uuid4().hex
+        csv_path = storage_path(os.path.join(dataset_dir(dataset_id), DATA_FILENAME), "csv")
+        df_before, df_after, summary = await run_task(
+            run_simulation,
+            {
+                "n_before": request.n_before,
+                "n_after": request.n_after,
+                "before_mean": request.before_mean,
+                "after_mean": request.after_mean,
+                "before_std": request.before_std,
+                "after_std": request.after_std,
+                "seed": request.seed,
+                "n_workers": request.n_workers
+            },
+            csv_path
         )
         
-        # Almacenar datos globalmente
-        current_data_before = df_before
-        current_data_after = df_after
-        
-        # Guardar datos en CSV
-        csv_path = save_simulation_to_csv(df_before, df_after, "reports/simulation_data.csv")
-        
-        # Obtener resumen estadístico
-        summary = get_simulation_summary(df_before, df_after)
+        # Registrar el dataset en el almacén
+        await run_in_threadpool(dataset_store.add, df_before, df_after, metadata={
+            "source": "simulation",
+            "simulation_parameters": request.dict()
+        }, dataset_id=dataset_id)
         
         # Preparar respuesta
         response_data = {
+            "dataset_id": dataset_id,
             "simulation_parameters": request.dict(),
             "summary": summary,
             "csv_file": csv_path,
-            "data_before": df_before.to_dict('records')[:10],  # Solo primeros 10 registros
-            "data_after": df_after.to_dict('records')[:10],    # Solo primeros 10 registros
+            "data_before": df_before.head(10).to_dict('records'),  # Solo primeros 10 registros
+            "data_after": df_after.head(10).to_dict('records'),    # Solo primeros 10 registros
             "total_records": {
                 "before": len(df_before),
                 "after": len(df_after)
@@ -136,140 +379,1080 @@ async def simulate_data(request: SimulationRequest):
             timestamp=datetime.now().isoformat()
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generando datos simulados: {str(e)}")
 
+async def resampling_sections(df_before: pd.DataFrame, df_after: pd.DataFrame, alpha: float,
+                              bootstrap_resamples: int, permutation_resamples: int,
+                              seed: Optional[int]) -> Dict[str, Any]:
+    """
+    Secciones 'bootstrap' y 'permutation_test' de comprehensive_analysis,
+    con los bloques de remuestras repartidos entre los workers del pool
+    
+    Cada bloque tiene su propio flujo aleatorio, así que el resultado es el
+    mismo que en un solo proceso con la misma semilla.
+    """
+    seed = new_seed() if seed is None else seed
+    before_times = df_before["tiempo_atencion_min"].to_numpy()
+    after_times = df_after["tiempo_atencion_min"].to_numpy()
+    
+    procedures = []
+    calls = []
+    for name, n_resamples, func in (("bootstrap", bootstrap_resamples, run_bootstrap_blocks),
+                                    ("permutation_test", permutation_resamples, run_permutation_blocks)):
+        if n_resamples:
+            for block_start, block_stop in block_ranges(n_resamples, task_executor.max_workers):
+                procedures.append(name)
+                calls.append((func, (before_times, after_times, n_resamples, seed, block_start, block_stop)))
+    
+    results = await run_tasks(calls)
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+    
+    sections = {}
+    if bootstrap_resamples:
+        replicates = np.concatenate([r for name, r in zip(procedures, results) if name == "bootstrap"])
+        sections["bootstrap"] = await run_in_threadpool(
+            summarize_bootstrap, before_times, after_times, replicates, bootstrap_resamples, seed, alpha
+        )
+    if permutation_resamples:
+        extreme = sum(r for name, r in zip(procedures, results) if name == "permutation_test")
+        sections["permutation_test"] = await run_in_threadpool(
+            summarize_permutation, before_times, after_times, extreme, permutation_resamples, seed, alpha
+        )
+    return sections
+
+async def cached_analysis(fingerprint: str, df_before: pd.DataFrame, df_after: pd.DataFrame,
+                          alpha: float, bootstrap_resamples: int = 0, permutation_resamples: int = 0,
+                          seed: Optional[int] = None,
+                          quantile_sketches: Optional[Tuple[QuantileSketch, QuantileSketch]] = None) -> Dict[str, Any]:
+    """
+    Resultados de comprehensive_analysis, reutilizando el caché si los datos y
+    parámetros ya se analizaron
+    
+    Con remuestreo, el análisis base se toma del caché y solo se calculan
+    las secciones de bootstrap/permutación. Con quantile_sketches, los
+    cuantiles son aproximados (clave de caché propia por error relativo).
+    """
+    params = {"alpha": alpha}
+    if quantile_sketches is not None:
+        params["relative_accuracy"] = quantile_sketches[0].relative_accuracy
+    if bootstrap_resamples or permutation_resamples:
+        params.update(bootstrap=bootstrap_resamples, permutation=permutation_resamples, seed=seed)
+    cache_key = analysis_cache_key(fingerprint, params)
+    analysis_results = await run_in_threadpool(analysis_cache.get, cache_key)
+    if analysis_results is None:
+        if bootstrap_resamples or permutation_resamples:
+            analysis_results = dict(await cached_analysis(fingerprint, df_before, df_after, alpha,
+                                                          quantile_sketches=quantile_sketches))
+            analysis_results.update(await resampling_sections(
+                df_before, df_after, alpha, bootstrap_resamples, permutation_resamples, seed
+            ))
+        else:
+            analysis_results = await run_task(run_analysis, df_before, df_after, alpha, quantile_sketches)
+        await run_in_threadpool(analysis_cache.put, cache_key, analysis_results)
+    return analysis_results
+
+async def render_cached_plots(fingerprint: str, df_before: pd.DataFrame, df_after: pd.DataFrame,
+                              analysis_results: Dict[str, Any], plot_types: List[str],
+                              alpha: float = 0.05, profile: str = "print",
+                              fmt: str = "png") -> Dict[str, str]:
+    """
+    Renderiza en paralelo los gráficos que no estén en caché
+    
+    Returns:
+        URL de cada gráfico disponible por tipo
+    """
+    output_paths = {plot_type: plot_path(fingerprint, plot_type, alpha, profile, fmt) for plot_type in plot_types}
+    missing = {plot_type: path for plot_type, path in output_paths.items() if not os.path.exists(path)}
+    plot_cache_stats["hits"] += len(output_paths) - len(missing)
+    if missing:
+        plot_cache_stats["renders"] += len(missing)
+        # Un gráfico por worker; cada uno recibe solo las columnas que usa
+        results = await run_tasks([
+            (render_plot, (plot_type, df_before[PLOT_COLUMNS[plot_type]], df_after[PLOT_COLUMNS[plot_type]],
+                           analysis_results, path, profile))
+            for plot_type, path in missing.items()
+        ])
+        for plot_type, result in zip(missing, results):
+            if isinstance(result, Exception):
+                print(f"❌ Error generando gráfico {plot_type}: {result}")
+    
+    # Convertir rutas locales a URLs del servidor
+    return {
+        plot_type: "/" + path.replace(os.sep, "/")
+        for plot_type, path in output_paths.items() if os.path.exists(path)
+    }
+
+async def run_analysis_pipeline(dataset_id: str, fingerprint: str,
+                                df_before: pd.DataFrame, df_after: pd.DataFrame,
+                                generate_plots: bool, create_dashboard: bool,
+                                alpha: float = 0.05, profile: str = "print", fmt: str = "png",
+                                progress=None, resampling: Optional[Dict[str, Any]] = None,
+                                quantile_sketches: Optional[Tuple[QuantileSketch, QuantileSketch]] = None) -> Dict[str, Any]:
+    """
+    Ejecuta análisis y gráficos de un dataset en el pool de workers
+    
+    Args:
+        dataset_id: ID del dataset
+        fingerprint: Huella de contenido del dataset (clave del caché)
+        df_before: DataFrame con datos antes
+        df_after: DataFrame con datos después
+        generate_plots: Generar gráficos estadísticos
+        create_dashboard: Crear dashboard completo
+        alpha: Nivel de significancia
+        profile: Perfil de renderizado de los gráficos
+        fmt: Formato de los gráficos
+        progress: Función opcional (fracción, etapa) para informar avance
+        resampling: bootstrap_resamples, permutation_resamples y seed (opcional)
+        quantile_sketches: Sketches (antes, después) para cuantiles aproximados (opcional)
+    
+    Returns:
+        Diccionario con 'data' y 'plots' para AnalysisResponse
+    """
+    def report(fraction: float, stage: str) -> None:
+        if progress is not None:
+            progress(fraction, stage)
+    
+    # Realizar análisis estadístico completo
+    report(0.05, "análisis estadístico")
+    analysis_results = await cached_analysis(fingerprint, df_before, df_after, alpha, **(resampling or {}),
+                                             quantile_sketches=quantile_sketches)
+    
+    # Generar gráficos y/o dashboard si se solicita (solo los que no estén en caché)
+    report(0.4, "renderizando gráficos")
+    plot_paths = await render_cached_plots(
+        fingerprint, df_before, df_after, analysis_results,
+        requested_plot_types(generate_plots, create_dashboard), alpha, profile, fmt
+    )
+    dashboard_path = plot_paths.pop("dashboard", None)
+    
+    # Preparar respuesta completa
+    report(0.95, "preparando respuesta")
+    response_data = {
+        "dataset_id": dataset_id,
+        "analysis_results": analysis_results,
+        "data_info": {
+            "before_count": len(df_before),
+            "after_count": len(df_after),
+            "before_period": f"{df_before['fecha'].min().strftime('%Y-%m-%d')} a {df_before['fecha'].max().strftime('%Y-%m-%d')}",
+            "after_period": f"{df_after['fecha'].min().strftime('%Y-%m-%d')} a {df_after['fecha'].max().strftime('%Y-%m-%d')}"
+        },
+        "dashboard_url": dashboard_path,
+        "render": {"profile": profile, "format": fmt}
+    }
+    
+    return {"data": response_data, "plots": plot_paths}
+
 @app.get("/analyze", response_model=AnalysisResponse)
 async def analyze_data(
+    dataset_id: Optional[str] = Query(None, description="ID del dataset (por defecto el más reciente)"),
     generate_plots: bool = Query(True, description="Generar gráficos estadísticos"),
-    create_dashboard: bool = Query(True, description="Crear dashboard completo")
+    create_dashboard: bool = Query(True, description="Crear dashboard completo"),
+    alpha: float = Query(0.05, gt=0, lt=1, description="Nivel de significancia"),
+    profile: str = Query("print", description="Perfil de renderizado: preview, screen o print"),
+    format: str = Query("png", description="Formato de los gráficos: png, webp o svg"),
+    two_phase: bool = Query(False, description="Responder con vistas previas y renderizar la versión final en segundo plano"),
+    bootstrap_resamples: int = Query(0, ge=0, le=MAX_RESAMPLES, description="Remuestras bootstrap para intervalos de confianza (0 = no)"),
+    permutation_resamples: int = Query(0, ge=0, le=MAX_RESAMPLES, description="Permutaciones para el test de permutación (0 = no)"),
+    seed: Optional[int] = Query(None, ge=0, description="Semilla del remuestreo (por defecto aleatoria)"),
+    quantiles: str = Query("exact", description="Cuantiles exactos (exact) o aproximados con sketch (approx)"),
+    relative_accuracy: float = Query(DEFAULT_RELATIVE_ACCURACY, ge=MIN_RELATIVE_ACCURACY, le=MAX_RELATIVE_ACCURACY,
+                                     description="Error relativo máximo de los cuantiles aproximados")
 ):
     """
     Realiza análisis estadístico completo de los datos simulados
+    
+    Con two_phase=true los gráficos se devuelven en perfil 'preview' y la
+    versión con el perfil pedido se renderiza como trabajo en segundo plano
+    (ver data.final_render y /jobs/{job_id}).
+    
+    Con quantiles=approx, mediana y cuartiles salen de los sketches del
+    dataset (mantenidos con cada /append) y cada período informa
+    error_relativo y cota_error (error absoluto máximo de cada cuantil).
     """
-    global current_data_before, current_data_after
+    # Verificar que existan datos
+    dataset_id, df_before, df_after = await get_dataset(dataset_id)
+    check_render_options(profile, format)
+    check_quantile_mode(quantiles)
     
     try:
-        # Verificar que existan datos
-        if current_data_before is None or current_data_after is None:
-            raise HTTPException(
-                status_code=400, 
-                detail="No hay datos disponibles. Primero ejecuta /simulate para generar datos."
-            )
+        fingerprint = await run_in_threadpool(dataset_store.fingerprint, dataset_id)
+        quantile_sketches = (await run_in_threadpool(dataset_store.quantile_sketches, dataset_id, relative_accuracy)
+                             if quantiles == "approx" else None)
         
-        # Realizar análisis estadístico completo
-        analysis_results = comprehensive_analysis(current_data_before, current_data_after)
+        # Dos fases solo si la versión final aún no está en caché
+        plot_types = requested_plot_types(generate_plots, create_dashboard)
+        two_phase = two_phase and profile != "preview" and not all(
+            os.path.exists(plot_path(fingerprint, plot_type, alpha, profile, format)) for plot_type in plot_types
+        )
         
-        plot_paths = {}
-        dashboard_path = None
+        result = await run_analysis_pipeline(
+            dataset_id, fingerprint, df_before, df_after, generate_plots, create_dashboard,
+            alpha, "preview" if two_phase else profile, format,
+            resampling={"bootstrap_resamples": bootstrap_resamples,
+                        "permutation_resamples": permutation_resamples, "seed": seed},
+            quantile_sketches=quantile_sketches
+        )
+        message = "Análisis estadístico completado exitosamente."
         
-        # Generar gráficos si se solicita
-        if generate_plots:
-            plot_paths = generate_all_plots(current_data_before, current_data_after, analysis_results)
+        if two_phase:
+            analysis_results = result["data"]["analysis_results"]
             
-            # Convertir rutas locales a URLs del servidor
-            plot_urls = {}
-            for plot_type, path in plot_paths.items():
-                # Convertir path local a URL del servidor
-                url_path = path.replace("reports/", "/reports/").replace("static/", "/static/")
-                plot_urls[plot_type] = url_path
-            plot_paths = plot_urls
-        
-        # Crear dashboard completo si se solicita
-        if create_dashboard:
-            dashboard_path = create_combined_dashboard(
-                current_data_before, 
-                current_data_after, 
-                analysis_results
-            )
-            dashboard_path = dashboard_path.replace("reports/", "/reports/")
-        
-        # Preparar respuesta completa
-        response_data = {
-            "analysis_results": analysis_results,
-            "data_info": {
-                "before_count": len(current_data_before),
-                "after_count": len(current_data_after),
-                "before_period": f"{current_data_before['fecha'].min().strftime('%Y-%m-%d')} a {current_data_before['fecha'].max().strftime('%Y-%m-%d')}",
-                "after_period": f"{current_data_after['fecha'].min().strftime('%Y-%m-%d')} a {current_data_after['fecha'].max().strftime('%Y-%m-%d')}"
-            },
-            "dashboard_url": dashboard_path
-        }
+            async def job(progress):
+                progress(0.1, "renderizando gráficos")
+                try:
+                    plots = await render_cached_plots(
+                        fingerprint, df_before, df_after, analysis_results, plot_types, alpha, profile, format
+                    )
+                except HTTPException as e:
+                    raise RuntimeError(e.detail)
+                return {
+                    "data": {
+                        "dataset_id": dataset_id,
+                        "dashboard_url": plots.pop("dashboard", None),
+                        "render": {"profile": profile, "format": format}
+                    },
+                    "plots": plots
+                }
+            
+            try:
+                job_id = job_manager.submit("render", job, metadata={
+                    "dataset_id": dataset_id, "profile": profile, "format": format, "alpha": alpha
+                })
+            except JobQueueFullError as e:
+                # Las vistas previas ya están listas: se responden sin la versión final
+                result["data"]["final_render"] = {"error": str(e), "profile": profile, "format": format}
+                message = "Análisis estadístico completado. Gráficos en vista previa; cola llena para la versión final."
+            else:
+                result["data"]["final_render"] = {
+                    "job_id": job_id,
+                    "status_url": f"/jobs/{job_id}",
+                    "result_url": f"/jobs/{job_id}/result",
+                    "profile": profile,
+                    "format": format
+                }
+                message = "Análisis estadístico completado. Gráficos en vista previa; la versión final se renderiza en segundo plano."
         
-        return AnalysisResponse(
+        return analysis_response(
             success=True,
-            message="Análisis estadístico completado exitosamente.",
-            data=response_data,
-            plots=plot_paths,
+            message=message,
+            data=result["data"],
+            plots=result["plots"],
             timestamp=datetime.now().isoformat()
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error en análisis estadístico: {str(e)}")
 
-@app.get("/data/current")
-async def get_current_data():
+@app.get("/analyze/segments")
+async def analyze_segments(
+    dataset_id: Optional[str] = Query(None, description="ID del dataset (por defecto el más reciente)"),
+    by: str = Query("servidor,franja_horaria", description="Columnas de segmentación separadas por comas: servidor, franja_horaria, dia_semana"),
+    alpha: float = Query(0.05, gt=0, lt=1, description="Nivel de significancia (sobre p-values ajustados)"),
+    correction: str = Query("holm", description="Corrección por comparaciones múltiples: holm, fdr_bh, bonferroni o none"),
+    min_n: int = Query(2, ge=2, description="Observaciones mínimas por período para testear un segmento")
+):
+    """
+    Compara antes vs después en cada segmento (p. ej. Servidor_2 en 11:00-13:00)
+    
+    Welch t-test y Cohen's d de todos los segmentos se calculan vectorizados a
+    partir de momentos agrupados; los p-values se corrigen entre segmentos.
+    """
+    segment_columns = split_values(by) or []
+    unknown = [column for column in segment_columns if column not in SEGMENT_COLUMNS]
+    if not segment_columns or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Columnas de segmentación inválidas: {unknown or by}. Disponibles: {SEGMENT_COLUMNS}"
+        )
+    if correction not in CORRECTION_METHODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Corrección '{correction}' no soportada. Disponibles: {CORRECTION_METHODS}"
+        )
+    
+    dataset_id, df_before, df_after = await get_dataset(dataset_id)
+    missing = [column for column in segment_columns if column not in df_before.columns]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"El dataset no tiene las columnas: {missing}")
+    
+    try:
+        fingerprint = await run_in_threadpool(dataset_store.fingerprint, dataset_id)
+        cache_key = analysis_cache_key(fingerprint, {
+            "segments": segment_columns, "alpha": alpha, "correction": correction, "min_n": min_n
+        })
+        segment_results = await run_in_threadpool(analysis_cache.get, cache_key)
+        if segment_results is None:
+            columns = segment_columns + ["tiempo_atencion_min"]
+            segment_results = await run_task(
+                run_segmented_analysis, df_before[columns], df_after[columns],
+                segment_columns, alpha, correction, min_n
+            )
+            await run_in_threadpool(analysis_cache.put, cache_key, segment_results)
+        
+        return FastJSONResponse({
+            "success": True,
+            "message": f"Análisis segmentado completado: {segment_results['n_significativos']} de "
+                       f"{segment_results['n_testeados']} segmentos con cambio significativo.",
+            "dataset_id": dataset_id,
+            "data": segment_results,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error en análisis segmentado: {str(e)}")
+
+@app.post("/analyze/batch")
+async def analyze_batch(request: BatchAnalysisRequest):
+    """
+    Análisis completo de muchos datasets antes/después en una sola llamada
+    
+    Los datasets se apilan en un array irregular y los tests se calculan con
+    núcleos por grupo; cada resultado tiene las secciones de /analyze
+    ('normalidad' solo con include_normality=true). No se registran en el
+    almacén de datasets ni se generan gráficos.
+    """
+    start = time.perf_counter()
+    names = [dataset.nombre for dataset in request.datasets]
+    if len(names) > MAX_BATCH_DATASETS:
+        raise HTTPException(status_code=400, detail=f"Máximo {MAX_BATCH_DATASETS:,} datasets por petición.")
+    if len(set(names)) != len(names):
+        raise HTTPException(status_code=400, detail="Los nombres de los datasets deben ser únicos.")
+    if not 0 < request.alpha < 1:
+        raise HTTPException(status_code=400, detail="alpha debe estar entre 0 y 1.")
+    try:
+        values, counts = await run_in_threadpool(
+            stack_datasets, [(dataset.antes, dataset.despues) for dataset in request.datasets]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        results = await run_task(run_batch_analysis, names, values, counts, request.alpha, request.include_normality)
+        elapsed = time.perf_counter() - start
+        n_significant = sum(result['welch_ttest']['is_significant'] for result in results.values())
+        
+        return FastJSONResponse({
+            "success": True,
+            "message": f"Análisis por lotes completado: {n_significant} de {len(names)} datasets con cambio significativo.",
+            "data": {
+                "n_datasets": len(names),
+                "n_observaciones": int(values.size),
+                "resultados": results,
+                "rendimiento": {
+                    "segundos": round(elapsed, 4),
+                    "datasets_por_segundo": round(len(names) / elapsed, 1) if elapsed > 0 else None
+                }
+            },
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error en análisis por lotes: {str(e)}")
+
+@app.get("/analyze/stored")
+async def analyze_stored_data(
+    dataset_id: str = Query(..., description="ID del dataset persistido con /data/save"),
+    format: str = Query("parquet", description="Formato del archivo: csv, parquet o feather"),
+    alpha: float = Query(0.05, gt=0, lt=1, description="Nivel de significancia"),
+    chunk_rows: int = Query(DEFAULT_CHUNK_ROWS, ge=1_000, le=5_000_000, description="Filas leídas por chunk")
+):
     """
-    Retorna los datos actuales en formato JSON
+    Análisis completo de un dataset persistido, leyendo el archivo por chunks
+    
+    El dataset no se carga en memoria (ni en el almacén): el archivo se lee
+    dos veces, solo las columnas periodo y tiempo_atencion_min, y la memoria
+    depende de chunk_rows, no del tamaño del archivo. Los resultados coinciden
+    con /analyze (cuartiles y Levene exactos); la normalidad se evalúa sobre
+    una muestra uniforme de hasta 100,000 observaciones por período.
     """
-    global current_data_before, current_data_after
+    check_storage_format(format)
+    
+    # Los IDs son hexadecimales: evita rutas fuera del directorio de datasets
+    if not dataset_id.isalnum():
+        raise HTTPException(status_code=400, detail=f"ID de dataset inválido: '{dataset_id}'")
     
-    if current_data_before is None or current_data_after is None:
+    file_path = storage_path(os.path.join(dataset_dir(dataset_id), DATA_FILENAME), format)
+    if not os.path.exists(file_path):
         raise HTTPException(
-            status_code=404, 
-            detail="No hay datos disponibles. Ejecuta /simulate primero."
+            status_code=404,
+            detail=f"No existe un dataset guardado en formato {format}. Ejecuta /data/save primero."
         )
     
+    try:
+        etag = await run_in_threadpool(file_etag, file_path)
+        cache_key = analysis_cache_key(etag, {"alpha": alpha, "out_of_core": True, "chunk_rows": chunk_rows})
+        analysis_results = await run_in_threadpool(analysis_cache.get, cache_key)
+        if analysis_results is None:
+            analysis_results = await run_task(run_out_of_core_analysis, file_path, format, alpha, chunk_rows)
+            await run_in_threadpool(analysis_cache.put, cache_key, analysis_results)
+        
+        return FastJSONResponse({
+            "success": True,
+            "message": "Análisis fuera de memoria completado exitosamente.",
+            "dataset_id": dataset_id,
+            "file": file_path,
+            "size_bytes": os.path.getsize(file_path),
+            "analysis_results": analysis_results,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error en análisis fuera de memoria: {str(e)}")
+
+@app.post("/power")
+async def power_analysis_endpoint(request: PowerRequest):
+    """
+    Potencia del Welch t-test y tamaño de muestra mínimo por simulación
+    
+    Usa los parámetros de /simulate: medias y desviaciones definen el modelo,
+    n_before/n_after la proporción entre períodos de la grilla n_grid, y
+    reductions las reducciones porcentuales de la media a evaluar. Cada tamaño
+    de la grilla se simula en un worker del pool.
+    """
+    try:
+        grid, reductions = power_grid(request.before_mean, request.after_mean, request.n_before,
+                                      request.n_after, request.n_grid, request.reductions)
+        validate_power_params(grid, reductions, request.n_replicates, request.alpha, request.target_power)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        params = {
+            "before_mean": request.before_mean, "after_mean": request.after_mean,
+            "before_std": request.before_std, "after_std": request.after_std
+        }
+        cache_key = analysis_cache_key("power", {
+            **params, "grid": grid, "reductions": reductions, "n_replicates": request.n_replicates,
+            "alpha": request.alpha, "target_power": request.target_power, "seed": request.seed
+        })
+        power_results = await run_in_threadpool(analysis_cache.get, cache_key)
+        if power_results is None:
+            seed = new_seed() if request.seed is None else request.seed
+            results = await run_tasks([
+                (run_power_row, (request.before_mean, request.before_std, request.after_std, n_before, n_after,
+                                 reductions, request.n_replicates, seed, request.alpha))
+                for n_before, n_after in grid
+            ])
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+            power_results = summarize_power(params, grid, reductions, np.array(results),
+                                            request.n_replicates, seed, request.alpha, request.target_power)
+            await run_in_threadpool(analysis_cache.put, cache_key, power_results)
+        
+        return FastJSONResponse({
+            "success": True,
+            "message": f"Análisis de potencia completado: {len(grid)} tamaños × {len(reductions)} "
+                       f"reducciones, {request.n_replicates:,} réplicas por combinación.",
+            "data": power_results,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error en análisis de potencia: {str(e)}")
+
+@app.post("/jobs/analyze", status_code=202)
+async def submit_analysis_job(
+    dataset_id: Optional[str] = Query(None, description="ID del dataset (por defecto el más reciente)"),
+    generate_plots: bool = Query(True, description="Generar gráficos estadísticos"),
+    create_dashboard: bool = Query(True, description="Crear dashboard completo"),
+    alpha: float = Query(0.05, gt=0, lt=1, description="Nivel de significancia"),
+    profile: str = Query("print", description="Perfil de renderizado: preview, screen o print"),
+    format: str = Query("png", description="Formato de los gráficos: png, webp o svg"),
+    bootstrap_resamples: int = Query(0, ge=0, le=MAX_RESAMPLES, description="Remuestras bootstrap para intervalos de confianza (0 = no)"),
+    permutation_resamples: int = Query(0, ge=0, le=MAX_RESAMPLES, description="Permutaciones para el test de permutación (0 = no)"),
+    seed: Optional[int] = Query(None, ge=0, description="Semilla del remuestreo (por defecto aleatoria)")
+):
+    """
+    Encola un análisis completo y devuelve el ID del trabajo
+    
+    El trabajo sigue ejecutándose aunque el cliente se desconecte; su estado
+    se consulta en /jobs/{job_id} y el resultado en /jobs/{job_id}/result.
+    """
+    dataset_id, df_before, df_after = await get_dataset(dataset_id)
+    check_render_options(profile, format)
+    fingerprint = await run_in_threadpool(dataset_store.fingerprint, dataset_id)
+    
+    async def job(progress):
+        try:
+            return await run_analysis_pipeline(
+                dataset_id, fingerprint, df_before, df_after, generate_plots, create_dashboard,
+                alpha, profile, format, progress,
+                resampling={"bootstrap_resamples": bootstrap_resamples,
+                            "permutation_resamples": permutation_resamples, "seed": seed}
+            )
+        except HTTPException as e:
+            raise RuntimeError(e.detail)
+    
+    try:
+        job_id = job_manager.submit("analysis", job, metadata={
+            "dataset_id": dataset_id,
+            "generate_plots": generate_plots,
+            "create_dashboard": create_dashboard,
+            "alpha": alpha,
+            "profile": profile,
+            "format": format,
+            "bootstrap_resamples": bootstrap_resamples,
+            "permutation_resamples": permutation_resamples,
+            "seed": seed
+        })
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
     return {
-        "before": current_data_before.to_dict('records'),
-        "after": current_data_after.to_dict('records'),
-        "summary": get_simulation_summary(current_data_before, current_data_after)
+        "success": True,
+        "message": "Análisis encolado.",
+        "job_id": job_id,
+        "status_url": f"/jobs/{job_id}",
+        "result_url": f"/jobs/{job_id}/result",
+        "timestamp": datetime.now().isoformat()
     }
 
-@app.get("/data/download")
-async def download_data():
+@app.get("/jobs")
+async def list_jobs():
     """
-    Descarga los datos actuales como archivo CSV
+    Lista los trabajos retenidos y sus estados
     """
-    global current_data_before, current_data_after
+    return {
+        "jobs": job_manager.list_jobs(),
+        "stats": job_manager.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """
+    Retorna estado y progreso de un trabajo
+    """
+    try:
+        return job_manager.get(job_id)
+    except JobNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Trabajo '{job_id}' no encontrado.")
+
+@app.get("/jobs/{job_id}/result", response_model=AnalysisResponse)
+async def get_job_result(job_id: str):
+    """
+    Retorna el resultado de un trabajo de análisis completado
+    """
+    try:
+        job = job_manager.get(job_id)
+    except JobNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Trabajo '{job_id}' no encontrado.")
+    
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=f"Error en análisis estadístico: {job['error']}")
+    if job["status"] != "completed":
+        raise HTTPException(
+            status_code=409,
+            detail=f"El trabajo aún no termina (estado: {job['status']}, progreso: {job['progress']:.0%})."
+        )
+    
+    result = job_manager.result(job_id)
+    return analysis_response(
+        success=True,
+        message="Análisis estadístico completado exitosamente.",
+        data=result["data"],
+        plots=result["plots"],
+        timestamp=job["finished_at"]
+    )
+
+@app.get("/datasets")
+async def list_datasets():
+    """
+    Lista los datasets registrados y el estado del almacén
+    """
+    return {
+        "datasets": dataset_store.list_datasets(),
+        "store": dataset_store.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.delete("/datasets/{dataset_id}")
+async def delete_dataset(dataset_id: str):
+    """
+    Elimina un dataset y sus archivos generados
+    """
+    for directory in remove_dataset(dataset_id):
+        shutil.rmtree(directory, ignore_errors=True)
+    
+    return {
+        "success": True,
+        "message": f"Dataset '{dataset_id}' eliminado.",
+        "timestamp": datetime.now().isoformat()
+    }
+
+def prepare_append_batches(request: AppendRequest):
+    """
+    Valida las observaciones a anexar y las separa por período
+    
+    Returns:
+        Tuple con (lote antes, lote después, filas descartadas)
+    """
+    batch = pd.DataFrame(request.observaciones)
+    # Las observaciones sin 'periodo' propio usan el del request
+    batch["periodo"] = batch["periodo"].fillna(request.periodo) if "periodo" in batch.columns else request.periodo
+    batch, n_invalid = prepare_chunk(batch)
+    is_before = (batch["periodo"] == "antes").to_numpy()
+    return batch[is_before], batch[~is_before], n_invalid
+
+@app.post("/datasets/{dataset_id}/append")
+async def append_data(
+    dataset_id: str,
+    request: AppendRequest,
+    alpha: float = Query(0.05, gt=0, lt=1, description="Nivel de significancia")
+):
+    """
+    Anexa observaciones nuevas a un dataset y actualiza el análisis en línea
+    
+    Cada observación necesita 'fecha' y 'tiempo_atencion_min' (y
+    opcionalmente 'periodo', 'servidor', 'franja_horaria', 'dia_semana').
+    Welch t-test, Cohen's d e impacto de negocio se actualizan con momentos
+    acumulados en O(tamaño del lote); los datos completos solo se concatenan
+    cuando otro endpoint los necesita.
+    """
+    if request.periodo not in ("antes", "despues"):
+        raise HTTPException(status_code=400, detail="periodo debe ser 'antes' o 'despues'.")
+    if not request.observaciones:
+        raise HTTPException(status_code=400, detail="No hay observaciones para anexar.")
+    
+    try:
+        previous_fingerprint = dataset_store.info(dataset_id)["fingerprint"]
+    except DatasetNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Dataset '{dataset_id}' no encontrado.")
+    
+    try:
+        before_batch, after_batch, n_invalid = await run_in_threadpool(prepare_append_batches, request)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Observaciones inválidas: {str(e)}")
+    
+    try:
+        # Calcular los momentos antes de anexar (solo la primera vez recorre los datos)
+        await run_in_threadpool(dataset_store.running_moments, dataset_id)
+        info = await run_in_threadpool(dataset_store.append, dataset_id, before_batch, after_batch)
+        before_moments, after_moments = dataset_store.running_moments(dataset_id)
+        sequential = dataset_store.sequential_summary(dataset_id, alpha, build=False)
+        
+        # Los gráficos del contenido anterior ya no corresponden a ningún dataset
+        if previous_fingerprint and not dataset_store.has_fingerprint(previous_fingerprint):
+            shutil.rmtree(os.path.join(PLOTS_DIR, previous_fingerprint), ignore_errors=True)
+        # Los archivos guardados tampoco: /data/download los regenera y
+        # /analyze/stored pide un /data/save nuevo
+        await run_in_threadpool(remove_saved_data, dataset_id)
+        
+        return FastJSONResponse({
+            "success": True,
+            "message": f"{len(before_batch)} observaciones anexadas antes y {len(after_batch)} después.",
+            "dataset_id": dataset_id,
+            "appended": {"antes": len(before_batch), "despues": len(after_batch), "descartadas": n_invalid},
+            "dataset": info,
+            "analysis": online_analysis(before_moments, after_moments, alpha),
+            **({"sequential": sequential} if sequential is not None else {}),
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except DatasetNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Dataset '{dataset_id}' no encontrado.")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Observaciones inválidas: {str(e)}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error anexando datos: {str(e)}")
+
+@app.get("/datasets/{dataset_id}/sequential")
+async def get_sequential_analysis(
+    dataset_id: str,
+    alpha: float = Query(0.05, gt=0, lt=1, description="Nivel de significancia"),
+    curve_points: int = Query(DEFAULT_CURVE_POINTS, ge=2, le=5000, description="Puntos de la curva de p-values")
+):
+    """
+    Test secuencial (mSPRT) antes vs después con p-values siempre válidos
+    
+    A diferencia de repetir el Welch t-test con cada lote, el p-value y la
+    secuencia de confianza se pueden consultar tras cada observación sin
+    inflar los falsos positivos. La primera llamada recorre el período
+    después en orden de fecha; desde entonces cada /append actualiza el
+    monitor en O(tamaño del lote) y su respuesta incluye 'sequential'.
+    punto_parada indica la primera observación en que la mejora (o el
+    deterioro) fue concluyente: ahí se podría haber detenido el piloto.
+    """
+    try:
+        summary = await run_in_threadpool(dataset_store.sequential_summary, dataset_id, alpha, curve_points)
+        stop = summary["punto_parada"]
+        
+        return FastJSONResponse({
+            "success": True,
+            "message": (f"Resultado concluyente ({stop['decision']}) tras {stop['n_despues']:,} observaciones después."
+                        if stop else "Aún no hay evidencia concluyente: continuar el piloto."),
+            "dataset_id": dataset_id,
+            "dataset": dataset_store.info(dataset_id),
+            "sequential": summary,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except DatasetNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Dataset '{dataset_id}' no encontrado.")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error en análisis secuencial: {str(e)}")
+
+@app.get("/datasets/{dataset_id}/online")
+async def get_online_analysis(
+    dataset_id: str,
+    alpha: float = Query(0.05, gt=0, lt=1, description="Nivel de significancia"),
+    include_quantiles: bool = Query(False, description="Agregar mediana y cuartiles"),
+    quantiles: str = Query("exact", description="Cuantiles exactos (recorre los datos completos) o aproximados (approx)"),
+    relative_accuracy: float = Query(DEFAULT_RELATIVE_ACCURACY, ge=MIN_RELATIVE_ACCURACY, le=MAX_RELATIVE_ACCURACY,
+                                     description="Error relativo máximo de los cuantiles aproximados")
+):
+    """
+    Análisis en línea de un dataset a partir de sus momentos acumulados
+    
+    Sin include_quantiles responde en O(1). Con include_quantiles y
+    quantiles=exact concatena los lotes pendientes y calcula las estadísticas
+    descriptivas completas (reutilizando el caché de análisis si el contenido
+    no cambió); con quantiles=approx usa los sketches del dataset, que se
+    mantienen con cada /append, e informa la cota de error de cada cuantil.
+    """
+    check_quantile_mode(quantiles)
+    try:
+        before_moments, after_moments = await run_in_threadpool(dataset_store.running_moments, dataset_id)
+        
+        descriptive = None
+        if include_quantiles and quantiles == "approx":
+            sketches = await run_in_threadpool(dataset_store.quantile_sketches, dataset_id, relative_accuracy)
+            descriptive = {
+                "antes": describe_with_sketch(before_moments.to_stats(), sketches[0]),
+                "despues": describe_with_sketch(after_moments.to_stats(), sketches[1])
+            }
+        elif include_quantiles:
+            fingerprint = await run_in_threadpool(dataset_store.fingerprint, dataset_id)
+            cache_key = analysis_cache_key(fingerprint, {"describe": True})
+            descriptive = await run_in_threadpool(analysis_cache.get, cache_key)
+            if descriptive is None:
+                df_before, df_after = await run_in_threadpool(dataset_store.get, dataset_id)
+                descriptive = {
+                    "antes": await run_in_threadpool(describe, df_before["tiempo_atencion_min"].to_numpy()),
+                    "despues": await run_in_threadpool(describe, df_after["tiempo_atencion_min"].to_numpy())
+                }
+                await run_in_threadpool(analysis_cache.put, cache_key, descriptive)
+        
+        return FastJSONResponse({
+            "success": True,
+            "dataset_id": dataset_id,
+            "dataset": dataset_store.info(dataset_id),
+            "analysis": online_analysis(before_moments, after_moments, alpha, descriptive),
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except DatasetNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Dataset '{dataset_id}' no encontrado.")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error en análisis en línea: {str(e)}")
+
+def split_values(value: Optional[str]) -> Optional[List[str]]:
+    """Lista de valores separados por comas (None si no hay)"""
+    if not value:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+@app.get("/data/current")
+async def get_current_data(
+    dataset_id: Optional[str] = Query(None, description="ID del dataset (por defecto el más reciente)"),
+    columns: Optional[str] = Query(None, description="Columnas separadas por comas (por defecto todas)"),
+    periodo: Optional[str] = Query(None, description="Solo un período: antes o despues"),
+    servidor: Optional[str] = Query(None, description="Servidores separados por comas"),
+    franja_horaria: Optional[str] = Query(None, description="Franjas horarias separadas por comas"),
+    fecha_desde: Optional[date] = Query(None, description="Fecha inicial (inclusive)"),
+    fecha_hasta: Optional[date] = Query(None, description="Fecha final (inclusive)"),
+    offset: int = Query(0, ge=0, description="Filas a saltar (paginación por offset)"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Filas por página (json: 1000 por defecto; ndjson: sin límite)"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto por la página anterior"),
+    format: str = Query("json", description="json (paginado) o ndjson (streaming)"),
+    include_summary: bool = Query(True, description="Incluir resumen estadístico (json, solo en la primera página)")
+):
+    """
+    Retorna los datos actuales, filtrados y paginados
+    
+    - json: una página con 'before'/'after', 'pagination.next_cursor' y total
+      (el total solo con paginación por offset)
+    - ndjson: una fila JSON por línea, serializada por bloques en streaming
     
-    if current_data_before is None or current_data_after is None:
+    La memoria usada depende del tamaño de página o de bloque, no del dataset.
+    El resumen recorre el dataset completo: solo se incluye en la primera
+    página (sin cursor) y se guarda en el caché por huella del contenido.
+    """
+    if format not in DATA_RESPONSE_FORMATS:
         raise HTTPException(
-            status_code=404, 
-            detail="No hay datos disponibles. Ejecuta /simulate primero."
+            status_code=400,
+            detail=f"Formato '{format}' no soportado. Disponibles: {DATA_RESPONSE_FORMATS}"
+        )
+    if periodo not in (None, "antes", "despues"):
+        raise HTTPException(status_code=400, detail="periodo debe ser 'antes' o 'despues'.")
+    if cursor and offset:
+        raise HTTPException(status_code=400, detail="Usa offset o cursor, no ambos.")
+    
+    dataset_id, df_before, df_after = await get_dataset(dataset_id)
+    
+    selected_columns = split_values(columns)
+    if selected_columns:
+        unknown = [column for column in selected_columns if column not in df_before.columns]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Columnas desconocidas: {unknown}. Disponibles: {list(df_before.columns)}"
+            )
+    
+    # Con 'periodo' el otro período queda vacío (las posiciones del cursor se mantienen)
+    frames = [
+        df_before if periodo in (None, "antes") else df_before.iloc[:0],
+        df_after if periodo in (None, "despues") else df_after.iloc[:0]
+    ]
+    filters = {
+        "servidor": split_values(servidor),
+        "franja_horaria": split_values(franja_horaria),
+        "fecha_desde": fecha_desde,
+        "fecha_hasta": fecha_hasta
+    }
+    
+    try:
+        start = decode_cursor(cursor, dataset_id) if cursor else (0, 0)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if format == "ndjson":
+        return StreamingResponse(
+            iter_ndjson(frames, filters, selected_columns, start, offset, limit),
+            media_type="application/x-ndjson",
+            headers={"X-Dataset-Id": dataset_id}
         )
     
-    csv_path = "reports/simulation_data.csv"
-    if not os.path.exists(csv_path):
-        # Generar CSV si no existe
-        save_simulation_to_csv(current_data_before, current_data_after, csv_path)
+    try:
+        limit = limit or DEFAULT_PAGE_SIZE
+        (page_before, page_after), next_position = await run_in_threadpool(
+            read_page, frames, filters, selected_columns, start, offset, limit
+        )
+        total = None if cursor else await run_in_threadpool(count_rows, frames, filters)
+        
+        response = {
+            "dataset_id": dataset_id,
+            "before": records(page_before),
+            "after": records(page_after),
+            "pagination": {
+                "offset": None if cursor else offset,
+                "limit": limit,
+                "returned": len(page_before) + len(page_after),
+                "total": total,
+                "next_cursor": encode_cursor(dataset_id, next_position) if next_position else None
+            }
+        }
+        if include_summary and not cursor:
+            fingerprint = await run_in_threadpool(dataset_store.fingerprint, dataset_id)
+            cache_key = analysis_cache_key(fingerprint, {"summary": True})
+            summary = await run_in_threadpool(analysis_cache.get, cache_key)
+            if summary is None:
+                summary = await run_in_threadpool(get_simulation_summary, df_before, df_after)
+                await run_in_threadpool(analysis_cache.put, cache_key, summary)
+            response["summary"] = summary
+        return FastJSONResponse(response)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error leyendo datos: {str(e)}")
+
+@app.get("/data/download")
+async def download_data(
+    dataset_id: Optional[str] = Query(None, description="ID del dataset (por defecto el más reciente)"),
+    format: str = Query("csv", description="Formato del archivo: csv, parquet o feather")
+):
+    """
+    Descarga los datos actuales en el formato solicitado
+    """
+    check_storage_format(format)
+    dataset_id, df_before, df_after = await get_dataset(dataset_id)
+    
+    file_path = storage_path(os.path.join(dataset_dir(dataset_id), DATA_FILENAME), format)
+    if not os.path.exists(file_path):
+        # Generar archivo si no existe
+        os.makedirs(dataset_dir(dataset_id), exist_ok=True)
+        await run_task(save_simulation_data, df_before, df_after, file_path, format)
     
     return FileResponse(
-        path=csv_path,
-        filename="kaizen_simulation_data.csv",
-        media_type="text/csv"
+        path=file_path,
+        filename=f"kaizen_simulation_data{STORAGE_FORMATS[format]['extension']}",
+        media_type=STORAGE_FORMATS[format]['media_type']
     )
 
-@app.get("/plots/{plot_type}")
-async def get_plot(plot_type: str):
+@app.post("/data/save")
+async def save_data(
+    dataset_id: Optional[str] = Query(None, description="ID del dataset (por defecto el más reciente)"),
+    format: str = Query("parquet", description="Formato del archivo: csv, parquet o feather")
+):
     """
-    Retorna un gráfico específico
+    Persiste un dataset en formato columnar (o CSV)
+    """
+    check_storage_format(format)
+    dataset_id, df_before, df_after = await get_dataset(dataset_id)
+    
+    try:
+        os.makedirs(dataset_dir(dataset_id), exist_ok=True)
+        file_path = await run_task(
+            save_simulation_data, df_before, df_after,
+            storage_path(os.path.join(dataset_dir(dataset_id), DATA_FILENAME), format), format
+        )
+        return {
+            "success": True,
+            "message": f"Datos guardados en formato {format}.",
+            "dataset_id": dataset_id,
+            "file": file_path,
+            "size_bytes": os.path.getsize(file_path),
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error guardando datos: {str(e)}")
+
+@app.post("/data/load")
+async def load_data(
+    dataset_id: str = Query(..., description="ID del dataset persistido con /data/save"),
+    format: str = Query("parquet", description="Formato del archivo: csv, parquet o feather")
+):
+    """
+    Vuelve a registrar en memoria un dataset persistido previamente
+    """
+    check_storage_format(format)
+    
+    # Los IDs son hexadecimales: evita rutas fuera del directorio de datasets
+    if not dataset_id.isalnum():
+        raise HTTPException(status_code=400, detail=f"ID de dataset inválido: '{dataset_id}'")
+    
+    file_path = storage_path(os.path.join(dataset_dir(dataset_id), DATA_FILENAME), format)
+    if not os.path.exists(file_path):
+        raise HTTPException(
+            status_code=404,
+            detail=f"No existe un dataset guardado en formato {format}. Ejecuta /data/save primero."
+        )
+    
+    try:
+        df_before, df_after = await run_task(load_simulation_data, file_path, format)
+        await run_in_threadpool(dataset_store.add, df_before, df_after,
+                                metadata={"source": file_path}, dataset_id=dataset_id)
+        
+        return {
+            "success": True,
+            "message": f"Datos cargados desde {file_path}.",
+            "dataset_id": dataset_id,
+            "total_records": {
+                "before": len(df_before),
+                "after": len(df_after)
+            },
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error cargando datos: {str(e)}")
+
+@app.post("/data/upload")
+async def upload_data(
+    file: UploadFile = File(..., description="Archivo CSV o Parquet con tiempos de atención"),
+    cutoff_date: Optional[str] = Query(None, description="Fecha de corte antes/después (YYYY-MM-DD); si se omite se usa la columna 'periodo'"),
+    format: Optional[str] = Query(None, description="Formato del archivo: csv o parquet (por defecto según extensión)")
+):
+    """
+    Registra datos reales de tiempos de atención como un dataset nuevo
+    
+    El archivo se parsea por chunks desde el archivo temporal de la subida,
+    sin leer todos sus bytes en memoria.
     """
-    plot_files = {
-        "histogram": "reports/histogram_comparison.png",
-        "boxplot": "reports/boxplot_comparison.png", 
-        "timeline": "reports/timeline_analysis.png",
-        "summary": "reports/statistical_summary.png",
-        "dashboard": "reports/dashboard_completo.png"
+    try:
+        fmt = format or infer_upload_format(file.filename)
+        if fmt not in UPLOAD_FORMATS:
+            raise ValueError(f"Formato '{fmt}' no soportado. Disponibles: {UPLOAD_FORMATS}")
+        
+        df_before, df_after, report = await run_in_threadpool(
+            ingest_service_times, file.file, fmt, cutoff_date
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Archivo inválido: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error procesando archivo: {str(e)}")
+    finally:
+        await file.close()
+    
+    if df_before.empty or df_after.empty:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El archivo debe contener observaciones antes y después. Reporte: {report}"
+        )
+    
+    dataset_id = await run_in_threadpool(dataset_store.add, df_before, df_after, metadata={
+        "source": "upload",
+        "filename": file.filename,
+        "ingestion_report": report
+    })
+    
+    return {
+        "success": True,
+        "message": f"Datos cargados exitosamente. {len(df_before)} registros antes, {len(df_after)} registros después.",
+        "dataset_id": dataset_id,
+        "ingestion_report": report,
+        "summary": get_simulation_summary(df_before, df_after),
+        "timestamp": datetime.now().isoformat()
     }
+
+@app.get("/plots/{plot_type}")
+async def get_plot(
+    plot_type: str,
+    dataset_id: Optional[str] = Query(None, description="ID del dataset (por defecto el más reciente)"),
+    alpha: float = Query(0.05, gt=0, lt=1, description="Nivel de significancia usado en /analyze"),
+    profile: str = Query("print", description="Perfil de renderizado: preview, screen o print"),
+    format: str = Query("png", description="Formato: png, webp o svg"),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Retorna un gráfico específico
     
-    if plot_type not in plot_files:
+    Incluye un ETag fuerte; con If-None-Match coincidente responde 304 sin cuerpo.
+    """
+    if plot_type not in PLOT_FILENAMES:
         raise HTTPException(
             status_code=404,
-            detail=f"Tipo de gráfico '{plot_type}' no encontrado. Disponibles: {list(plot_files.keys())}"
+            detail=f"Tipo de gráfico '{plot_type}' no encontrado. Disponibles: {list(PLOT_FILENAMES.keys())}"
         )
+    check_render_options(profile, format)
     
-    file_path = plot_files[plot_type]
+    try:
+        dataset_id = dataset_store.resolve_id(dataset_id)
+        fingerprint = await run_in_threadpool(dataset_store.fingerprint, dataset_id)
+    except DatasetNotFoundError:
+        raise HTTPException(status_code=404, detail="Dataset no encontrado. Ejecuta /simulate primero.")
+    
+    file_path = plot_path(fingerprint, plot_type, alpha, profile, format)
     
     if not os.path.exists(file_path):
         raise HTTPException(
@@ -277,38 +1460,114 @@ async def get_plot(plot_type: str):
             detail=f"Gráfico '{plot_type}' no encontrado. Ejecuta /analyze primero."
         )
     
+    # La URL no identifica el contenido (el dataset más reciente cambia): revalidar siempre
+    etag = await run_in_threadpool(file_etag, file_path)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    
     return FileResponse(
         path=file_path,
-        media_type="image/png"
+        media_type=PLOT_FORMATS[format],
+        headers=headers
     )
 
-@app.post("/reset")
-async def reset_data():
+@app.get("/charts/{chart_type}")
+async def get_chart_data(
+    chart_type: str,
+    dataset_id: Optional[str] = Query(None, description="ID del dataset (por defecto el más reciente)"),
+    bins: int = Query(20, ge=1, le=MAX_HISTOGRAM_BINS, description="Número de bins del histograma"),
+    max_outliers: int = Query(50, ge=0, le=MAX_OUTLIER_SAMPLE, description="Máximo de atípicos devueltos por período (boxplot)"),
+    quantiles: str = Query("exact", description="Boxplot con cuantiles exactos (exact) o aproximados con sketch (approx)"),
+    relative_accuracy: float = Query(DEFAULT_RELATIVE_ACCURACY, ge=MIN_RELATIVE_ACCURACY, le=MAX_RELATIVE_ACCURACY,
+                                     description="Error relativo máximo de los cuantiles aproximados")
+):
     """
-    Limpia todos los datos y archivos generados
+    Retorna los datos agregados de un gráfico para dibujarlo en el cliente
+    
+    - histogram: bordes compartidos y conteos por período
+    - boxplot: resumen de cinco números, bigotes y muestra de atípicos
+    - timeline: media, desviación estándar y conteo por semana
+    
+    El tamaño de la respuesta no depende del número de filas del dataset.
+    El boxplot con quantiles=approx sale de los sketches del dataset sin
+    recorrer los datos e informa la cota de error de cuartiles y bigotes.
     """
-    global current_data_before, current_data_after
+    if chart_type not in CHART_TYPES:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Tipo de gráfico '{chart_type}' no encontrado. Disponibles: {list(CHART_TYPES.keys())}"
+        )
+    check_quantile_mode(quantiles)
+    
+    if chart_type == "boxplot" and quantiles == "approx":
+        options = {"max_outliers": max_outliers, "quantiles": quantiles, "relative_accuracy": relative_accuracy}
+        try:
+            moments = await run_in_threadpool(dataset_store.running_moments, dataset_id)
+            sketches = await run_in_threadpool(dataset_store.quantile_sketches, dataset_id, relative_accuracy)
+            return FastJSONResponse({
+                "success": True,
+                "dataset_id": dataset_store.resolve_id(dataset_id),
+                "chart_type": chart_type,
+                "options": options,
+                "data": sketch_boxplot_data((moments[0].to_stats(), moments[1].to_stats()), sketches, max_outliers),
+                "timestamp": datetime.now().isoformat()
+            })
+        except DatasetNotFoundError:
+            detail = (f"Dataset '{dataset_id}' no encontrado." if dataset_id
+                      else "No hay datos disponibles. Ejecuta /simulate primero.")
+            raise HTTPException(status_code=404, detail=detail)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error calculando datos del gráfico: {str(e)}")
+    
+    dataset_id, df_before, df_after = await get_dataset(dataset_id)
+    options = {"histogram": {"bins": bins}, "boxplot": {"max_outliers": max_outliers}}.get(chart_type, {})
     
     try:
-        # Limpiar variables globales
-        current_data_before = None
-        current_data_after = None
-        
-        # Limpiar archivos generados (opcional)
-        files_to_clean = [
-            "reports/simulation_data.csv",
-            "reports/histogram_comparison.png",
-            "reports/boxplot_comparison.png",
-            "reports/timeline_analysis.png", 
-            "reports/statistical_summary.png",
-            "reports/dashboard_completo.png"
-        ]
+        fingerprint = await run_in_threadpool(dataset_store.fingerprint, dataset_id)
+        cache_key = analysis_cache_key(fingerprint, {"chart": chart_type, **options})
+        chart_data = chart_cache.get(cache_key)
+        if chart_data is None:
+            chart_data = await run_in_threadpool(CHART_TYPES[chart_type], df_before, df_after, **options)
+            chart_cache.put(cache_key, chart_data)
+        
+        return FastJSONResponse({
+            "success": True,
+            "dataset_id": dataset_id,
+            "chart_type": chart_type,
+            "options": options,
+            "data": chart_data,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error calculando datos del gráfico: {str(e)}")
+
+@app.post("/reset")
+async def reset_data(
+    dataset_id: Optional[str] = Query(None, description="ID del dataset a limpiar (por defecto todos)")
+):
+    """
+    Limpia los datos y archivos generados (de un dataset o de todos)
+    """
+    try:
+        if dataset_id:
+            dirs_to_clean = remove_dataset(dataset_id)
+        else:
+            dataset_store.clear()
+            dirs_to_clean = [DATASETS_DIR, PLOTS_DIR]
         
+        # Limpiar archivos generados
         cleaned_files = []
-        for file_path in files_to_clean:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                cleaned_files.append(file_path)
+        for directory in dirs_to_clean:
+            if os.path.exists(directory):
+                for root, _, files in os.walk(directory):
+                    cleaned_files.extend(os.path.join(root, name) for name in files)
+                shutil.rmtree(directory)
         
         return {
             "success": True,
@@ -317,37 +1576,56 @@ async def reset_data():
             "timestamp": datetime.now().isoformat()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error limpiando datos: {str(e)}")
 
 @app.get("/status")
-async def get_status():
+async def get_status(
+    dataset_id: Optional[str] = Query(None, description="ID del dataset (por defecto el más reciente)")
+):
     """
     Retorna el estado actual del sistema
     """
-    global current_data_before, current_data_after
-    
-    has_data = current_data_before is not None and current_data_after is not None
+    try:
+        info = dataset_store.info(dataset_id)
+    except DatasetNotFoundError:
+        info = None
     
-    # Verificar archivos existentes
+    # Verificar archivos existentes del dataset
     files_status = {}
-    check_files = [
-        "reports/simulation_data.csv",
-        "reports/histogram_comparison.png", 
-        "reports/boxplot_comparison.png",
-        "reports/dashboard_completo.png"
-    ]
-    
-    for file_path in check_files:
-        files_status[os.path.basename(file_path)] = os.path.exists(file_path)
+    memory_usage = {"before": {}, "after": {}}
+    if info is not None:
+        output_dir = dataset_dir(info["dataset_id"])
+        check_files = [storage_path(os.path.join(output_dir, DATA_FILENAME), fmt) for fmt in STORAGE_FORMATS]
+        if info["fingerprint"]:
+            check_files += [plot_path(info["fingerprint"], plot_type) for plot_type in PLOT_FILENAMES]
+        for file_path in check_files:
+            files_status[os.path.basename(file_path)] = os.path.exists(file_path)
+        
+        if info["in_memory"]:
+            df_before, df_after = await run_in_threadpool(dataset_store.get, info["dataset_id"])
+            memory_usage = {
+                "before": memory_footprint(df_before),
+                "after": memory_footprint(df_after)
+            }
     
     return {
-        "has_data": has_data,
+        "has_data": info is not None,
+        "dataset_id": info["dataset_id"] if info else None,
         "data_counts": {
-            "before": len(current_data_before) if current_data_before is not None else 0,
-            "after": len(current_data_after) if current_data_after is not None else 0
+            "before": info["n_before"] if info else 0,
+            "after": info["n_after"] if info else 0
         },
         "files_available": files_status,
+        "memory_usage_bytes": memory_usage,
+        "store": dataset_store.stats(),
+        "executor": task_executor.stats(),
+        "jobs": job_manager.stats(),
+        "analysis_cache": analysis_cache.stats(),
+        "plot_cache": plot_cache_stats,
+        "chart_cache": chart_cache.stats(),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -355,7 +1633,8 @@ if __name__ == "__main__":
     import uvicorn
     
     # Crear directorios necesarios
-    os.makedirs("reports", exist_ok=True)
+    os.makedirs(DATASETS_DIR, exist_ok=True)
+    os.makedirs(PLOTS_DIR, exist_ok=True)
     os.makedirs("static", exist_ok=True)
     
     print("🚀 Iniciando servidor FastAPI...")
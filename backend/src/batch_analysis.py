@@ -0,0 +1,200 @@
+"""
+Análisis por lotes para proyecto Kaizen - Cafetería
+comprehensive_analysis de muchos datasets antes/después a la vez: todas las
+observaciones se apilan en un solo array irregular (un grupo por período de
+cada dataset) y momentos, cuantiles, Welch t-test, Cohen's d y Levene se
+calculan con núcleos por grupo (np.add.reduceat y un ordenamiento por grupo y
+valor) sin un bucle de Python por dataset
+"""
+
+import numpy as np
+from scipy import stats
+from typing import Dict, Any, Sequence, Tuple
+
+from src.descriptive import DEFAULT_QUANTILES, order_statistics
+from src.segments import vectorized_welch
+from src.statistical_analysis import (interpret_ttest_result, interpret_cohens_d, normality_tests,
+                                      business_impact_summary, generate_executive_summary)
+
+# Datasets aceptados por petición
+MAX_BATCH_DATASETS = 10_000
+
+# Tamaño medio de grupo a partir del cual los cuantiles se calculan con un
+# np.partition por grupo (lineal) en vez de ordenar todo el array irregular
+PARTITION_MIN_GROUP_SIZE = 500
+
+def stack_datasets(datasets: Sequence[Tuple[Sequence[float], Sequence[float]]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Apila los períodos de varios datasets en un array irregular
+
+    Args:
+        datasets: Pares (tiempos antes, tiempos después)
+
+    Returns:
+        Tuple con (valores concatenados, tamaño de cada grupo); el grupo 2i es
+        el período antes del dataset i y el 2i + 1 el período después
+
+    Raises:
+        ValueError: Si algún período tiene menos de 2 observaciones o valores no finitos
+    """
+    groups = [np.asarray(times, dtype=np.float64) for pair in datasets for times in pair]
+    counts = np.array([group.size for group in groups], dtype=np.int64)
+    if counts.size == 0:
+        raise ValueError("No hay datasets para analizar")
+    if counts.min() < 2:
+        raise ValueError("Cada período necesita al menos 2 observaciones")
+    values = np.concatenate(groups)
+    if not np.isfinite(values).all():
+        raise ValueError("Los tiempos deben ser números finitos")
+    return values, counts
+
+def ragged_moments(values: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Inicio, media y varianza muestral (ddof=1) de cada grupo
+
+    Como moments(), la varianza usa desviaciones a la media del grupo.
+    """
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    means = np.add.reduceat(values, starts) / counts
+    deviations = values - np.repeat(means, counts)
+    variances = np.add.reduceat(np.square(deviations, out=deviations), starts) / (counts - 1)
+    return starts, means, variances
+
+def ragged_order_statistics(values: np.ndarray, counts: np.ndarray, starts: np.ndarray,
+                            quantiles: Sequence[float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Mínimo, máximo y cuantiles (interpolación lineal, como np.percentile) de
+    cada grupo, ordenando todo por (grupo, valor)
+
+    En vez de np.lexsort se ordena por valor y luego, de forma estable, por
+    grupo: con grupos uint16 el segundo orden es radix sort (lineal) y el
+    total es ~2.5x más rápido, con el mismo resultado. Con grupos grandes
+    (PARTITION_MIN_GROUP_SIZE) ordenar cuesta más que particionar cada grupo
+    con order_statistics, y el costo por llamada ya es despreciable.
+
+    Returns:
+        Tuple con (mínimos, máximos, matriz grupos × cuantiles)
+    """
+    if counts.mean() >= PARTITION_MIN_GROUP_SIZE:
+        groups = [order_statistics(values[start:start + n], quantiles) for start, n in zip(starts, counts)]
+        return (np.array([group['min'] for group in groups]), np.array([group['max'] for group in groups]),
+                np.array([group['quantiles'] for group in groups]))
+
+    group_dtype = np.uint16 if counts.size <= np.iinfo(np.uint16).max + 1 else np.int64
+    group_ids = np.repeat(np.arange(counts.size, dtype=group_dtype), counts)
+    by_value = np.argsort(values)
+    ordered = values[by_value[np.argsort(group_ids[by_value], kind='stable')]]
+
+    positions = np.asarray(quantiles, dtype=np.float64)[None, :] * (counts[:, None] - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, counts[:, None] - 1)
+    low_values = ordered[starts[:, None] + lower]
+    high_values = ordered[starts[:, None] + upper]
+    quantile_values = low_values + (high_values - low_values) * (positions - lower)
+    return ordered[starts], ordered[starts + counts - 1], quantile_values
+
+def ragged_levene(values: np.ndarray, counts: np.ndarray, starts: np.ndarray,
+                  medians: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Levene centrado en la mediana (Brown-Forsythe) de cada dataset; las
+    mismas fórmulas que levene_median_test con k = 2 grupos
+
+    Returns:
+        Tuple con (estadístico W, p-value) por dataset
+    """
+    z = np.abs(values - np.repeat(medians, counts))
+    group_means = np.add.reduceat(z, starts) / counts
+    z -= np.repeat(group_means, counts)
+    within_groups = np.add.reduceat(np.square(z, out=z), starts)
+
+    n = counts.astype(np.float64).reshape(-1, 2)
+    means = group_means.reshape(-1, 2)
+    total = n.sum(axis=1)
+    grand_mean = (n * means).sum(axis=1) / total
+    between = (n * (means - grand_mean[:, None])**2).sum(axis=1)
+    within = within_groups.reshape(-1, 2).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        statistic = (total - 2) * between / within
+    return statistic, stats.f.sf(statistic, 1, total - 2)
+
+def batch_analysis(names: Sequence[str], values: np.ndarray, counts: np.ndarray,
+                   alpha: float = 0.05, include_normality: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Resultados equivalentes a comprehensive_analysis para varios datasets
+
+    Args:
+        names: Nombre de cada dataset
+        values: Valores apilados (ver stack_datasets)
+        counts: Tamaño de cada grupo (2 por dataset)
+        alpha: Nivel de significancia
+        include_normality: Agregar 'normalidad' (Shapiro-Wilk / Anderson-Darling);
+            no tiene forma vectorizada y se calcula dataset por dataset
+
+    Returns:
+        Diccionario nombre -> resultados con las mismas secciones que
+        comprehensive_analysis ('normalidad' solo si se pide)
+    """
+    starts, means, variances = ragged_moments(values, counts)
+    minimums, maximums, quantile_values = ragged_order_statistics(
+        values, counts, starts, list(DEFAULT_QUANTILES.values())
+    )
+    median_column = list(DEFAULT_QUANTILES).index('mediana')
+    levene_statistic, levene_p = ragged_levene(values, counts, starts, quantile_values[:, median_column])
+    tests = vectorized_welch(counts[0::2], means[0::2], variances[0::2],
+                             counts[1::2], means[1::2], variances[1::2], alpha)
+    n1, n2 = counts[0::2], counts[1::2]
+    pooled_std = np.sqrt(((n1 - 1) * variances[0::2] + (n2 - 1) * variances[1::2]) / (n1 + n2 - 2))
+
+    # Solo el armado de los diccionarios recorre los datasets
+    descriptive = []
+    for g in range(counts.size):
+        group_stats = {'n': int(counts[g]), 'media': float(means[g]), 'var': float(variances[g]),
+                       'std': float(np.sqrt(variances[g])), 'min': float(minimums[g]), 'max': float(maximums[g])}
+        group_stats.update(zip(DEFAULT_QUANTILES, quantile_values[g].tolist()))
+        group_stats['iqr'] = group_stats['q75'] - group_stats['q25']
+        descriptive.append(group_stats)
+
+    results = {}
+    for i, name in enumerate(names):
+        p_value = float(tests['p_value'][i])
+        mean_diff = float(tests['mean_difference'][i])
+        d = float(tests['cohens_d'][i])
+        ttest_results = {
+            't_statistic': float(tests['t_statistic'][i]),
+            'p_value': p_value,
+            'degrees_freedom': float(tests['degrees_freedom'][i]),
+            't_critical': float(tests['t_critical'][i]),
+            'is_significant': bool(p_value < alpha),
+            'alpha': alpha,
+            'mean_difference': mean_diff,
+            'se_difference': float(tests['se_difference'][i]),
+            'ci_lower': float(tests['ci_lower'][i]),
+            'ci_upper': float(tests['ci_upper'][i]),
+            'interpretation': interpret_ttest_result(p_value, alpha, mean_diff)
+        }
+        cohens_results = {
+            'cohens_d': d,
+            'pooled_std': float(pooled_std[i]),
+            'effect_size_interpretation': interpret_cohens_d(abs(d)),
+            'direction': 'improvement' if d > 0 else 'deterioration' if d < 0 else 'no_change'
+        }
+        before_stats, after_stats = descriptive[2 * i], descriptive[2 * i + 1]
+        business_impact = business_impact_summary(
+            before_stats['media'], after_stats['media'], ttest_results, cohens_results, alpha
+        )
+        result = {
+            'estadisticas_descriptivas': {'antes': before_stats, 'despues': after_stats},
+            'welch_ttest': ttest_results,
+            'cohens_d': cohens_results
+        }
+        if include_normality:
+            start, split = starts[2 * i], starts[2 * i + 1]
+            result['normalidad'] = normality_tests(values[start:split], values[split:split + counts[2 * i + 1]])
+        result.update({
+            'levene_test': {'statistic': float(levene_statistic[i]), 'p_value': float(levene_p[i])},
+            'impacto_negocio': business_impact,
+            'resumen_ejecutivo': generate_executive_summary(business_impact, ttest_results, cohens_results)
+        })
+        results[name] = result
+
+    return results
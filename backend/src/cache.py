@@ -0,0 +1,228 @@
+"""
+Caché de resultados de análisis Kaizen - Cafetería
+Resultados direccionados por contenido: la clave es un hash de los datos y de
+los parámetros, así que un mismo dataset nunca se analiza dos veces
+"""
+
+import copy
+import hashlib
+import json
+import os
+import pickle
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+# Cambiar al modificar el cálculo de comprehensive_analysis: invalida el caché en disco
+ANALYSIS_CACHE_VERSION = "1"
+
+# Cambiar al modificar el aspecto de los gráficos: invalida los archivos renderizados
+PLOT_CACHE_VERSION = "1"
+
+def _column_bytes(series: pd.Series) -> np.ndarray:
+    """Representación binaria estable de una columna para el hash"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Las categorías se hashean aparte; aquí basta con los códigos
+        return np.ascontiguousarray(series.cat.codes.to_numpy())
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return np.ascontiguousarray(series.to_numpy().view('int64'))
+    values = series.to_numpy()
+    if values.dtype == object:
+        return np.frombuffer(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes(), dtype=np.uint8)
+    return np.ascontiguousarray(values)
+
+def data_fingerprint(df_before: pd.DataFrame, df_after: pd.DataFrame) -> str:
+    """
+    Hash BLAKE2b del contenido de un par antes/después
+
+    Recorre cada columna una sola vez sobre su buffer binario (códigos para
+    categóricas, int64 para fechas), sin convertir a texto.
+
+    Args:
+        df_before: DataFrame con datos antes
+        df_after: DataFrame con datos después
+
+    Returns:
+        Huella hexadecimal de 32 caracteres
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for periodo, df in (('antes', df_before), ('despues', df_after)):
+        digest.update(f"{periodo}:{len(df)}".encode())
+        for column in df.columns:
+            series = df[column]
+            digest.update(f"|{column}:{series.dtype}".encode())
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                digest.update(repr(list(series.cat.categories)).encode())
+            digest.update(memoryview(_column_bytes(series)).cast('B'))
+    return digest.hexdigest()
+
+def analysis_cache_key(fingerprint: str, params: Dict[str, Any]) -> str:
+    """
+    Clave de caché para un dataset y unos parámetros de análisis
+    """
+    payload = json.dumps({'data': fingerprint, 'params': params, 'version': ANALYSIS_CACHE_VERSION},
+                         sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+def render_options_key(params: Dict[str, Any]) -> str:
+    """
+    Clave corta de unas opciones de renderizado (nombre de directorio)
+    """
+    payload = json.dumps({'params': params, 'version': PLOT_CACHE_VERSION}, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+# Memo de ETags por archivo (acotado, se descarta el más antiguo)
+_ETAG_MEMO_SIZE = 1024
+_etag_memo: Dict[tuple, str] = {}
+_etag_lock = threading.Lock()
+
+def file_etag(path: str) -> str:
+    """
+    ETag fuerte (hash BLAKE2b del contenido) de un archivo
+
+    Se memoriza por (ruta, tamaño, mtime): el archivo solo se lee de nuevo si
+    cambia en disco.
+    """
+    stat = os.stat(path)
+    signature = (path, stat.st_size, stat.st_mtime_ns)
+    with _etag_lock:
+        etag = _etag_memo.get(signature)
+    if etag is None:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        etag = f'"{digest.hexdigest()}"'
+        with _etag_lock:
+            if len(_etag_memo) >= _ETAG_MEMO_SIZE:
+                _etag_memo.pop(next(iter(_etag_memo)))
+            _etag_memo[signature] = etag
+    return etag
+
+def _strip_encoding(etag: str) -> str:
+    """Quita el sufijo de codificación (-gzip, -br) que añade la compresión"""
+    for suffix in ('-gzip"', '-br"'):
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evalúa un encabezado If-None-Match contra un ETag (comparación débil, RFC 9110)
+    """
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    if '*' in candidates:
+        return True
+    return etag in (_strip_encoding(candidate[2:] if candidate.startswith('W/') else candidate)
+                    for candidate in candidates)
+
+class AnalysisCache:
+    """
+    Caché LRU en memoria con nivel opcional en disco
+
+    Los aciertos en disco se promueven a memoria. Los valores se copian al
+    entrar y al salir, de modo que quien los modifique no altera el caché.
+    """
+
+    def __init__(self, max_entries: int = 128, cache_dir: Optional[str] = None):
+        """
+        Args:
+            max_entries: Entradas máximas en memoria (0 = sin nivel en memoria)
+            cache_dir: Directorio del nivel en disco (None = sin disco)
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries: 'OrderedDict[str, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0}
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Busca un resultado; retorna None si no está en ningún nivel
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._counters['hits'] += 1
+                return copy.deepcopy(self._entries[key])
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['disk_hits'] += 1
+            self._remember(key, value)
+        return copy.deepcopy(value)
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Guarda un resultado en memoria y, si está configurado, en disco
+        """
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._remember(key, value)
+            self._counters['stores'] += 1
+        self._write_disk(key, value)
+
+    def clear(self) -> None:
+        """
+        Vacía el nivel en memoria (el nivel en disco se conserva)
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Contadores de aciertos/fallos y ocupación
+        """
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['disk_hits'] + self._counters['misses']
+            hits = self._counters['hits'] + self._counters['disk_hits']
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'cache_dir': self.cache_dir,
+                'hit_rate': hits / lookups if lookups else None,
+                **self._counters
+            }
+
+    def _remember(self, key: str, value: Any) -> None:
+        """Inserta en el nivel en memoria respetando max_entries"""
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        """Ruta del archivo en disco de una clave"""
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def _read_disk(self, key: str) -> Optional[Any]:
+        """Lee una entrada del disco; los archivos corruptos cuentan como fallo"""
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _write_disk(self, key: str, value: Any) -> None:
+        """Escribe una entrada en disco de forma atómica"""
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
@@ -0,0 +1,220 @@
+"""
+Datos de gráficos para análisis Kaizen - Cafetería
+Agregados compactos (bins, resúmenes de cinco números, series semanales) para
+que el frontend dibuje los gráficos; su tamaño no depende del número de filas
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Tuple
+
+from src.quantile_sketch import QuantileSketch, fence_error_bounds, tukey_whiskers
+
+# Límites de los parámetros de los gráficos
+MAX_HISTOGRAM_BINS = 200
+MAX_OUTLIER_SAMPLE = 1000
+
+def _service_times(df: pd.DataFrame) -> np.ndarray:
+    """Tiempos de atención como array float64"""
+    return df['tiempo_atencion_min'].to_numpy(dtype=np.float64)
+
+def histogram_data(df_before: pd.DataFrame, df_after: pd.DataFrame, bins: int = 20) -> Dict[str, Any]:
+    """
+    Histograma de ambos períodos sobre los mismos bordes
+
+    Args:
+        df_before: DataFrame con datos antes
+        df_after: DataFrame con datos después
+        bins: Número de bins
+
+    Returns:
+        Bordes compartidos, conteos por período y media de cada período
+    """
+    before_times = _service_times(df_before)
+    after_times = _service_times(df_after)
+
+    all_min = min(before_times.min(initial=np.inf), after_times.min(initial=np.inf))
+    all_max = max(before_times.max(initial=-np.inf), after_times.max(initial=-np.inf))
+    if not np.isfinite(all_min):
+        all_min, all_max = 0.0, 1.0
+    edges = np.histogram_bin_edges([], bins=bins, range=(all_min, all_max))
+
+    def period(times: np.ndarray) -> Dict[str, Any]:
+        counts, _ = np.histogram(times, bins=edges)
+        return {
+            'n': int(times.size),
+            'media': float(times.mean()) if times.size else None,
+            'counts': counts.tolist()
+        }
+
+    return {
+        'bin_edges': edges.tolist(),
+        'antes': period(before_times),
+        'despues': period(after_times)
+    }
+
+def five_number_summary(times: np.ndarray, whisker: float = 1.5,
+                        max_outliers: int = 50) -> Dict[str, Any]:
+    """
+    Resumen de cinco números con bigotes y valores atípicos (como matplotlib)
+
+    Los bigotes llegan al dato más extremo dentro de [q1 - whisker·IQR,
+    q3 + whisker·IQR]. De los atípicos se devuelve el conteo y una muestra de
+    a lo sumo max_outliers valores repartidos uniformemente por rango.
+
+    Args:
+        times: Tiempos de atención
+        whisker: Multiplicador del IQR para los bigotes
+        max_outliers: Tamaño máximo de la muestra de atípicos
+
+    Returns:
+        Diccionario con n, media, min, q1, mediana, q3, max, bigotes y atípicos
+    """
+    if times.size == 0:
+        return {'n': 0}
+
+    q1, median, q3 = np.percentile(times, [25, 50, 75])
+    iqr = q3 - q1
+    low_fence = q1 - whisker * iqr
+    high_fence = q3 + whisker * iqr
+
+    inside = times[(times >= low_fence) & (times <= high_fence)]
+    outliers = np.sort(times[(times < low_fence) | (times > high_fence)])
+    if outliers.size > max_outliers:
+        sample = outliers[np.linspace(0, outliers.size - 1, max_outliers).round().astype(np.int64)]
+    else:
+        sample = outliers
+
+    return {
+        'n': int(times.size),
+        'media': float(times.mean()),
+        'min': float(times.min()),
+        'q1': float(q1),
+        'mediana': float(median),
+        'q3': float(q3),
+        'max': float(times.max()),
+        'whisker_low': float(inside.min()) if inside.size else float(q1),
+        'whisker_high': float(inside.max()) if inside.size else float(q3),
+        'n_outliers': int(outliers.size),
+        'outliers': sample.tolist()
+    }
+
+def boxplot_data(df_before: pd.DataFrame, df_after: pd.DataFrame,
+                 max_outliers: int = 50) -> Dict[str, Any]:
+    """
+    Resúmenes de cinco números de ambos períodos
+    """
+    return {
+        'antes': five_number_summary(_service_times(df_before), max_outliers=max_outliers),
+        'despues': five_number_summary(_service_times(df_after), max_outliers=max_outliers)
+    }
+
+def sketch_five_number_summary(stats: Dict[str, Any], sketch: QuantileSketch, whisker: float = 1.5,
+                               max_outliers: int = 50) -> Dict[str, Any]:
+    """
+    Resumen de cinco números aproximado, sin recorrer los datos
+
+    Mismas claves que five_number_summary; cuartiles, bigotes y atípicos
+    salen del sketch (los atípicos de la muestra son valores representativos
+    de sus buckets). Se agregan los límites de los bigotes, 'error_relativo'
+    y 'cota_error': la de cada bigote es la del valor de su posición; los
+    datos a menos de la cota de un límite pueden cambiar de lado respecto del
+    boxplot exacto, y con ellos bigote y conteo de atípicos.
+
+    Args:
+        stats: n y media del período (p. ej. RunningMoments.to_stats())
+        sketch: Sketch de cuantiles del período
+        whisker: Multiplicador del IQR para los bigotes
+        max_outliers: Tamaño máximo de la muestra de atípicos
+    """
+    if sketch.n == 0:
+        return {'n': 0}
+
+    values, n_low, n_high = tukey_whiskers(sketch, whisker)
+    n_outliers = n_low + n_high
+    positions = np.linspace(0, n_outliers - 1, min(max_outliers, n_outliers)).round().astype(np.int64)
+    ranks = np.where(positions < n_low, positions, sketch.n - n_high + positions - n_low)
+    keys = ['q1', 'mediana', 'q3', 'whisker_low', 'whisker_high']
+    bounds = dict(zip(keys, sketch.error_bound(np.array([values[key] for key in keys])).tolist()))
+    bounds['limite_inferior'], bounds['limite_superior'] = fence_error_bounds(
+        sketch, values['q1'], values['q3'], whisker
+    )
+
+    return {
+        'n': int(sketch.n),
+        'media': float(stats['media']),
+        'min': float(sketch.minimum),
+        **{key: values[key] for key in ('q1', 'mediana', 'q3')},
+        'max': float(sketch.maximum),
+        'whisker_low': values['whisker_low'],
+        'whisker_high': values['whisker_high'],
+        'n_outliers': n_outliers,
+        'outliers': sketch.rank_values(ranks).tolist() if ranks.size else [],
+        'limite_inferior': values['limite_inferior'],
+        'limite_superior': values['limite_superior'],
+        'error_relativo': sketch.relative_accuracy,
+        'cota_error': bounds
+    }
+
+def sketch_boxplot_data(stats: Tuple[Dict[str, Any], Dict[str, Any]],
+                        sketches: Tuple[QuantileSketch, QuantileSketch],
+                        max_outliers: int = 50) -> Dict[str, Any]:
+    """
+    Resúmenes de cinco números aproximados de ambos períodos
+    """
+    return {
+        'antes': sketch_five_number_summary(stats[0], sketches[0], max_outliers=max_outliers),
+        'despues': sketch_five_number_summary(stats[1], sketches[1], max_outliers=max_outliers)
+    }
+
+def weekly_series(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Media, desviación estándar y conteo por semana (lunes a domingo, igual que
+    to_period('W') en create_timeline_plot)
+
+    Agrupa con np.bincount sobre el número de semana en vez de groupby.
+    """
+    if df.empty:
+        return []
+
+    days = df['fecha'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    # 1970-01-01 fue jueves: +3 alinea las semanas al lunes
+    weeks = (days + 3) // 7
+    first_week = weeks.min()
+    codes = weeks - first_week
+    times = _service_times(df)
+
+    counts = np.bincount(codes)
+    present = counts > 0
+    means = np.bincount(codes, weights=times) / np.maximum(counts, 1)
+    squared = np.bincount(codes, weights=(times - means[codes]) ** 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        stds = np.sqrt(squared / (counts - 1))
+
+    week_starts = ((np.flatnonzero(present) + first_week) * 7 - 3).astype('datetime64[D]')
+    return [
+        {
+            'semana_inicio': str(start),
+            'semana_fin': str(start + np.timedelta64(6, 'D')),
+            'n': int(n),
+            'media': float(mean),
+            'std': float(std) if np.isfinite(std) else None
+        }
+        for start, n, mean, std in zip(week_starts, counts[present], means[present], stds[present])
+    ]
+
+def timeline_data(df_before: pd.DataFrame, df_after: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Series semanales de media ± desviación estándar de ambos períodos
+    """
+    return {
+        'antes': weekly_series(df_before),
+        'despues': weekly_series(df_after)
+    }
+
+# Tipos de gráfico disponibles en /charts/{chart_type}
+CHART_TYPES = {
+    'histogram': histogram_data,
+    'boxplot': boxplot_data,
+    'timeline': timeline_data
+}
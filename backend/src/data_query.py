@@ -0,0 +1,200 @@
+"""
+Consulta de filas para análisis Kaizen - Cafetería
+Filtros, proyección de columnas, paginación (offset o cursor) y serialización
+NDJSON por bloques, con memoria acotada sin importar el tamaño del dataset
+"""
+
+import base64
+import json
+import numpy as np
+import pandas as pd
+from datetime import date, timedelta
+from typing import Tuple, Dict, Any, Iterator, List, Optional
+
+# Tamaños de página y de bloque de escaneo
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 100_000
+SCAN_BLOCK_ROWS = 65_536
+
+# Formatos de respuesta de /data/current
+DATA_RESPONSE_FORMATS = ['json', 'ndjson']
+
+# Posición en la secuencia lógica antes + después: (índice de período, fila)
+Position = Tuple[int, int]
+
+class InvalidCursorError(ValueError):
+    """El cursor no es válido o pertenece a otro dataset"""
+
+def encode_cursor(dataset_id: str, position: Position) -> str:
+    """
+    Codifica una posición de escaneo como cursor opaco
+    """
+    payload = json.dumps({'d': dataset_id, 'p': position[0], 'r': position[1]}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str, dataset_id: str) -> Position:
+    """
+    Decodifica un cursor y verifica que corresponda al dataset
+
+    Raises:
+        InvalidCursorError: Si el cursor está mal formado o es de otro dataset
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        position = (int(payload['p']), int(payload['r']))
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError(f"Cursor inválido: {e}")
+    if payload.get('d') != dataset_id:
+        raise InvalidCursorError("El cursor pertenece a otro dataset")
+    if position[0] < 0 or position[1] < 0:
+        raise InvalidCursorError("Cursor inválido: posición negativa")
+    return position
+
+def row_mask(df: pd.DataFrame, filters: Dict[str, Any]) -> Optional[np.ndarray]:
+    """
+    Máscara booleana de las filas que cumplen los filtros
+
+    Args:
+        df: Bloque de datos
+        filters: Claves opcionales 'servidor' y 'franja_horaria' (listas de
+            valores) y 'fecha_desde' / 'fecha_hasta' (fechas, inclusivas)
+
+    Returns:
+        Array booleano, o None si no hay filtros
+    """
+    mask = None
+
+    def combine(condition: np.ndarray) -> None:
+        nonlocal mask
+        mask = condition if mask is None else mask & condition
+
+    for column in ('servidor', 'franja_horaria'):
+        values = filters.get(column)
+        if values:
+            combine(df[column].isin(values).to_numpy())
+
+    fecha_desde: Optional[date] = filters.get('fecha_desde')
+    fecha_hasta: Optional[date] = filters.get('fecha_hasta')
+    if fecha_desde is not None or fecha_hasta is not None:
+        fechas = df['fecha'].to_numpy()
+        if fecha_desde is not None:
+            combine(fechas >= np.datetime64(fecha_desde, 'ns'))
+        if fecha_hasta is not None:
+            combine(fechas < np.datetime64(fecha_hasta + timedelta(days=1), 'ns'))
+
+    return mask
+
+def count_rows(frames: List[pd.DataFrame], filters: Dict[str, Any]) -> int:
+    """
+    Número total de filas que cumplen los filtros
+    """
+    total = 0
+    for df in frames:
+        for start in range(0, len(df), SCAN_BLOCK_ROWS):
+            mask = row_mask(df.iloc[start:start + SCAN_BLOCK_ROWS], filters)
+            total += min(SCAN_BLOCK_ROWS, len(df) - start) if mask is None else int(mask.sum())
+    return total
+
+def normalize_start(frames: List[pd.DataFrame], start: Position) -> Optional[Position]:
+    """Posición válida equivalente a start, o None si está más allá del final"""
+    index, offset = start
+    while index < len(frames) and offset >= len(frames[index]):
+        index, offset = index + 1, 0
+    return (index, offset) if index < len(frames) else None
+
+def iter_rows(frames: List[pd.DataFrame], filters: Dict[str, Any], columns: Optional[List[str]] = None,
+              start: Position = (0, 0), skip: int = 0, limit: Optional[int] = None,
+              block_rows: int = SCAN_BLOCK_ROWS) -> Iterator[Tuple[int, pd.DataFrame, Optional[Position]]]:
+    """
+    Recorre por bloques las filas que cumplen los filtros
+
+    Solo se materializa un bloque a la vez, de modo que la memoria depende
+    de block_rows y no del tamaño del dataset.
+
+    Args:
+        frames: Períodos en orden (antes, después)
+        filters: Filtros de row_mask
+        columns: Columnas a proyectar (None = todas)
+        start: Posición desde la que se escanea
+        skip: Filas coincidentes a saltar antes de devolver (paginación por offset)
+        limit: Máximo de filas a devolver (None = sin límite)
+        block_rows: Filas por bloque de escaneo
+
+    Yields:
+        Tuplas (índice de período, bloque filtrado, posición siguiente o None
+        si el escaneo llegó al final)
+    """
+    remaining = limit
+    frame_index, row = start
+
+    while frame_index < len(frames):
+        df = frames[frame_index]
+        while row < len(df):
+            if remaining == 0:
+                return
+            block = df.iloc[row:row + block_rows]
+            mask = row_mask(block, filters)
+            positions = np.arange(len(block)) if mask is None else np.flatnonzero(mask)
+
+            if skip:
+                skipped = min(skip, len(positions))
+                positions = positions[skipped:]
+                skip -= skipped
+
+            end = row + len(block)
+            if remaining is not None and len(positions) >= remaining:
+                positions = positions[:remaining]
+                end = row + int(positions[-1]) + 1 if len(positions) else end
+                remaining = 0
+            elif remaining is not None:
+                remaining -= len(positions)
+
+            if len(positions):
+                selected = block.iloc[positions]
+                if columns:
+                    selected = selected[columns]
+                yield frame_index, selected, normalize_start(frames, (frame_index, end))
+            row = end
+        frame_index, row = frame_index + 1, 0
+
+def read_page(frames: List[pd.DataFrame], filters: Dict[str, Any], columns: Optional[List[str]] = None,
+              start: Position = (0, 0), skip: int = 0,
+              limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[pd.DataFrame], Optional[Position]]:
+    """
+    Lee una página de filas filtradas
+
+    Returns:
+        Tuple con (un DataFrame por período con sus filas de la página,
+        posición siguiente o None si no quedan filas)
+    """
+    pieces: List[List[pd.DataFrame]] = [[] for _ in frames]
+    next_position: Optional[Position] = None
+    for frame_index, block, next_position in iter_rows(frames, filters, columns, start, skip, limit):
+        pieces[frame_index].append(block)
+
+    empty = [df.iloc[:0][columns] if columns else df.iloc[:0] for df in frames]
+    pages = [pd.concat(blocks) if blocks else empty[index] for index, blocks in enumerate(pieces)]
+    if next_position is not None and sum(len(page) for page in pages) < limit:
+        next_position = None
+    return pages, next_position
+
+def _iso_dates(df: pd.DataFrame) -> pd.DataFrame:
+    """Convierte 'fecha' a texto ISO 8601 de forma vectorizada"""
+    if 'fecha' not in df.columns:
+        return df
+    return df.assign(fecha=np.datetime_as_string(df['fecha'].to_numpy(), unit='s'))
+
+def records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Filas como lista de diccionarios serializables (fechas en ISO 8601)
+    """
+    return _iso_dates(df).to_dict('records')
+
+def iter_ndjson(frames: List[pd.DataFrame], filters: Dict[str, Any], columns: Optional[List[str]] = None,
+                start: Position = (0, 0), skip: int = 0, limit: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Serializa las filas filtradas como NDJSON, un bloque a la vez
+    """
+    for _, block, _ in iter_rows(frames, filters, columns, start, skip, limit):
+        yield _iso_dates(block).to_json(orient='records', lines=True, force_ascii=False).encode()
@@ -0,0 +1,439 @@
+"""
+Almacén de datasets para análisis Kaizen - Cafetería
+Mantiene varios pares antes/después identificados por ID, con presupuesto de
+memoria, expulsión LRU, volcado opcional a disco en formato columnar y
+anexado incremental de observaciones con momentos acumulados
+"""
+
+import os
+import threading
+import uuid
+import pandas as pd
+from collections import OrderedDict
+from datetime import datetime
+from typing import Tuple, Dict, Any, List, Optional
+
+from src.generate_data import memory_footprint
+from src.persistence import storage_path, save_simulation_data, load_simulation_data
+from src.cache import data_fingerprint
+from src.ingest import concat_chunks, conform_chunk
+from src.online_stats import RunningMoments
+from src.sequential_testing import SequentialMonitor, DEFAULT_CURVE_POINTS
+from src.quantile_sketch import QuantileSketch, DEFAULT_RELATIVE_ACCURACY
+
+# Sketches de cuantiles (uno por error relativo pedido) que se mantienen por dataset
+MAX_SKETCHES_PER_DATASET = 4
+
+class DatasetNotFoundError(KeyError):
+    """El dataset solicitado no existe (o fue expulsado sin volcado a disco)"""
+
+class DatasetStore:
+    """
+    Almacén de datasets con expulsión LRU por presupuesto de bytes
+    
+    Cuando la memoria ocupada supera max_bytes se expulsan los datasets usados
+    hace más tiempo. Con spill_dir configurado, los datasets expulsados se
+    vuelcan a disco (Feather, legible con memory-map) y se recargan de forma
+    transparente al pedirlos; sin spill_dir se descartan. El estado
+    incremental (historial del monitor secuencial, sketches) también cuenta
+    para el presupuesto: un volcado no lo libera, un descarte sí.
+    """
+    
+    def __init__(self, max_bytes: Optional[int] = None, spill_dir: Optional[str] = None,
+                 spill_format: str = 'feather'):
+        """
+        Args:
+            max_bytes: Presupuesto de memoria en bytes (None = sin límite)
+            spill_dir: Directorio para volcar datasets expulsados (None = descartar)
+            spill_format: Formato de volcado ('feather' o 'parquet')
+        """
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.spill_format = spill_format
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.RLock()
+        self._latest_id: Optional[str] = None
+        self._counters = {'evictions': 0, 'spills': 0, 'reloads': 0}
+        
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+    
+    def add(self, df_before: pd.DataFrame, df_after: pd.DataFrame,
+            metadata: Optional[Dict[str, Any]] = None, dataset_id: Optional[str] = None) -> str:
+        """
+        Registra un dataset y lo marca como el más reciente
+        
+        Args:
+            df_before: DataFrame con datos antes
+            df_after: DataFrame con datos después
+            metadata: Información adicional (origen, parámetros...)
+            dataset_id: ID a usar (por defecto se genera uno nuevo)
+        
+        Returns:
+            ID del dataset
+        """
+        dataset_id = dataset_id or uuid.uuid4().hex
+        entry = {
+            'df_before': df_before,
+            'df_after': df_after,
+            'nbytes': memory_footprint(df_before)['total'] + memory_footprint(df_after)['total'],
+            'n_before': len(df_before),
+            'n_after': len(df_after),
+            'created_at': datetime.now().isoformat(),
+            'spill_path': None,
+            'fingerprint': None,
+            'pending': ([], []),
+            'dtypes': (df_before.dtypes, df_after.dtypes),
+            'moments': None,
+            'sequential': None,
+            'sketches': OrderedDict(),
+            'appended_batches': 0,
+            'metadata': metadata or {}
+        }
+        
+        with self._lock:
+            old_entry = self._entries.pop(dataset_id, None)
+            if old_entry is not None:
+                self._remove_spill_file(old_entry)
+            self._entries[dataset_id] = entry
+            self._latest_id = dataset_id
+            self._enforce_budget(keep=dataset_id)
+        
+        return dataset_id
+    
+    def resolve_id(self, dataset_id: Optional[str] = None) -> str:
+        """
+        Devuelve el ID indicado o, si es None, el del dataset más reciente
+        """
+        with self._lock:
+            dataset_id = dataset_id or self._latest_id
+            if dataset_id is None or dataset_id not in self._entries:
+                raise DatasetNotFoundError(dataset_id)
+            return dataset_id
+    
+    def get(self, dataset_id: Optional[str] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Obtiene un dataset (recargándolo desde disco si fue volcado)
+        
+        Args:
+            dataset_id: ID del dataset (None = el más reciente)
+        
+        Returns:
+            Tuple con DataFrames (antes, después)
+        """
+        with self._lock:
+            dataset_id = self.resolve_id(dataset_id)
+            entry = self._entries[dataset_id]
+            
+            if entry['df_before'] is None:
+                entry['df_before'], entry['df_after'] = load_simulation_data(
+                    entry['spill_path'], self.spill_format
+                )
+                self._remove_spill_file(entry)
+                self._counters['reloads'] += 1
+            
+            
+            if entry['pending'][0] or entry['pending'][1]:
+                entry['df_before'], entry['df_after'] = (
+                    concat_chunks([df] + batches) if batches else df
+                    for df, batches in zip((entry['df_before'], entry['df_after']), entry['pending'])
+                )
+                entry['pending'] = ([], [])
+                entry['dtypes'] = (entry['df_before'].dtypes, entry['df_after'].dtypes)
+            
+            self._entries.move_to_end(dataset_id)
+            self._enforce_budget(keep=dataset_id)
+            return entry['df_before'], entry['df_after']
+    
+    def append(self, dataset_id: str, before_batch: pd.DataFrame,
+               after_batch: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Anexa observaciones nuevas a un dataset en O(tamaño del lote)
+        
+        Los lotes quedan pendientes y se concatenan con los datos existentes
+        la próxima vez que se pidan con get(); los momentos acumulados, el
+        monitor secuencial y los sketches de cuantiles (si ya existen) se
+        actualizan en el acto. La huella se invalida.
+        
+        Args:
+            dataset_id: ID del dataset
+            before_batch: Observaciones nuevas del período antes (puede estar vacío)
+            after_batch: Observaciones nuevas del período después (puede estar vacío)
+        
+        Returns:
+            Información actualizada del dataset
+        
+        Raises:
+            ValueError: Si un lote no se puede combinar con los tipos del
+                dataset (se rechaza sin modificar nada)
+        """
+        with self._lock:
+            dataset_id = self.resolve_id(dataset_id)
+            entry = self._entries[dataset_id]
+            
+            # Validar ambos lotes antes de tocar el dataset: un lote guardado
+            # que no se pudiera concatenar rompería cada get() posterior
+            before_batch, after_batch = (
+                batch if batch.empty else conform_chunk(batch, dtypes)
+                for batch, dtypes in zip((before_batch, after_batch), entry['dtypes'])
+            )
+            
+            for index, batch in enumerate((before_batch, after_batch)):
+                if batch.empty:
+                    continue
+                entry['pending'][index].append(batch)
+                if entry['moments'] is not None:
+                    values = batch['tiempo_atencion_min'].to_numpy()
+                    monitor = entry['sequential']
+                    if monitor is not None and index == 1:
+                        # Una mirada por observación, con los momentos previos al lote
+                        monitor.observe(entry['moments'][0], entry['moments'][1], values,
+                                        batch['fecha'].to_numpy() if 'fecha' in batch.columns else None)
+                    entry['moments'][index].update(values)
+                    if monitor is not None and index == 0:
+                        monitor.observe_before(*entry['moments'])
+                for sketches in entry['sketches'].values():
+                    sketches[index].update(batch['tiempo_atencion_min'].to_numpy())
+                entry['nbytes'] += memory_footprint(batch)['total']
+            
+            entry['n_before'] += len(before_batch)
+            entry['n_after'] += len(after_batch)
+            entry['fingerprint'] = None
+            entry['appended_batches'] += 1
+            self._entries.move_to_end(dataset_id)
+            # El historial del monitor crece ~40 bytes por observación después
+            self._enforce_budget(keep=dataset_id)
+            return self._describe(dataset_id, entry)
+    
+    def running_moments(self, dataset_id: Optional[str] = None) -> Tuple[RunningMoments, RunningMoments]:
+        """
+        Momentos acumulados (antes, después) de un dataset
+        
+        La primera vez se calculan sobre los datos completos; después se
+        mantienen con cada append(). Se devuelven copias.
+        """
+        with self._lock:
+            dataset_id = self.resolve_id(dataset_id)
+            entry = self._entries[dataset_id]
+            if entry['moments'] is None:
+                df_before, df_after = self.get(dataset_id)
+                entry['moments'] = (
+                    RunningMoments.from_values(df_before['tiempo_atencion_min'].to_numpy()),
+                    RunningMoments.from_values(df_after['tiempo_atencion_min'].to_numpy())
+                )
+            return entry['moments'][0].copy(), entry['moments'][1].copy()
+    
+    def quantile_sketches(self, dataset_id: Optional[str] = None,
+                          relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> Tuple[QuantileSketch, QuantileSketch]:
+        """
+        Sketches de cuantiles (antes, después) de un dataset
+        
+        La primera vez se construyen sobre los datos completos; después se
+        mantienen con cada append(). Se conservan los de los últimos
+        MAX_SKETCHES_PER_DATASET errores relativos pedidos. Se devuelven copias.
+        """
+        with self._lock:
+            dataset_id = self.resolve_id(dataset_id)
+            entry = self._entries[dataset_id]
+            sketches = entry['sketches'].get(relative_accuracy)
+            if sketches is None:
+                df_before, df_after = self.get(dataset_id)
+                sketches = (
+                    QuantileSketch.from_values(df_before['tiempo_atencion_min'].to_numpy(), relative_accuracy),
+                    QuantileSketch.from_values(df_after['tiempo_atencion_min'].to_numpy(), relative_accuracy)
+                )
+                entry['sketches'][relative_accuracy] = sketches
+                while len(entry['sketches']) > MAX_SKETCHES_PER_DATASET:
+                    entry['sketches'].popitem(last=False)
+            entry['sketches'].move_to_end(relative_accuracy)
+            return sketches[0].copy(), sketches[1].copy()
+    
+    def sequential_summary(self, dataset_id: Optional[str] = None, alpha: float = 0.05,
+                           curve_points: int = DEFAULT_CURVE_POINTS,
+                           build: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Estado del test secuencial (mSPRT) de un dataset
+        
+        La primera vez recorre el período después en orden de fecha, con el
+        período antes como línea base; después cada append() agrega sus
+        miradas en O(tamaño del lote).
+        
+        Args:
+            dataset_id: ID del dataset (None = el más reciente)
+            alpha: Nivel de significancia
+            curve_points: Puntos de la curva de p-values
+            build: Crear el monitor si aún no existe (False = devolver None)
+        
+        Returns:
+            Resultado de SequentialMonitor.summary(), o None
+        """
+        with self._lock:
+            dataset_id = self.resolve_id(dataset_id)
+            entry = self._entries[dataset_id]
+            if entry['sequential'] is None:
+                if not build:
+                    return None
+                self.running_moments(dataset_id)
+                df_before, df_after = self.get(dataset_id)
+                entry['sequential'] = SequentialMonitor.from_data(
+                    df_before['tiempo_atencion_min'].to_numpy(),
+                    df_after['tiempo_atencion_min'].to_numpy(),
+                    df_after['fecha'].to_numpy() if 'fecha' in df_after.columns else None
+                )
+                self._enforce_budget(keep=dataset_id)
+            return entry['sequential'].summary(alpha, curve_points)
+    
+    def fingerprint(self, dataset_id: Optional[str] = None) -> str:
+        """
+        Huella de contenido de un dataset (se calcula una vez y se memoriza)
+        
+        Args:
+            dataset_id: ID del dataset (None = el más reciente)
+        
+        Returns:
+            Hash hexadecimal de los datos antes/después
+        """
+        with self._lock:
+            dataset_id = self.resolve_id(dataset_id)
+            entry = self._entries[dataset_id]
+            if entry['fingerprint'] is None:
+                df_before, df_after = self.get(dataset_id)
+                entry['fingerprint'] = data_fingerprint(df_before, df_after)
+            return entry['fingerprint']
+    
+    def has_fingerprint(self, fingerprint: str) -> bool:
+        """
+        Indica si algún dataset registrado tiene ya calculada esa huella
+        """
+        with self._lock:
+            return any(entry['fingerprint'] == fingerprint for entry in self._entries.values())
+    
+    def info(self, dataset_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Devuelve la información de un dataset sin cargar sus datos
+        """
+        with self._lock:
+            dataset_id = self.resolve_id(dataset_id)
+            return self._describe(dataset_id, self._entries[dataset_id])
+    
+    def list_datasets(self) -> List[Dict[str, Any]]:
+        """
+        Lista todos los datasets, del menos al más recientemente usado
+        """
+        with self._lock:
+            return [self._describe(dataset_id, entry) for dataset_id, entry in self._entries.items()]
+    
+    def remove(self, dataset_id: str) -> bool:
+        """
+        Elimina un dataset (y su volcado en disco, si lo hay)
+        
+        Returns:
+            True si el dataset existía
+        """
+        with self._lock:
+            entry = self._entries.pop(dataset_id, None)
+            if entry is None:
+                return False
+            self._remove_spill_file(entry)
+            if self._latest_id == dataset_id:
+                self._latest_id = next(reversed(self._entries), None)
+            return True
+    
+    def clear(self) -> int:
+        """
+        Elimina todos los datasets
+        
+        Returns:
+            Número de datasets eliminados
+        """
+        with self._lock:
+            dataset_ids = list(self._entries.keys())
+            for dataset_id in dataset_ids:
+                self.remove(dataset_id)
+            return len(dataset_ids)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Estadísticas del almacén: ocupación, presupuesto y contadores
+        """
+        with self._lock:
+            in_memory = [entry for entry in self._entries.values() if entry['df_before'] is not None]
+            return {
+                'datasets': len(self._entries),
+                'in_memory': len(in_memory),
+                'spilled': len(self._entries) - len(in_memory),
+                'bytes_in_memory': self._bytes_in_memory(),
+                'max_bytes': self.max_bytes,
+                'spill_dir': self.spill_dir,
+                'latest_dataset_id': self._latest_id,
+                **self._counters
+            }
+    
+    def _describe(self, dataset_id: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Información pública de una entrada"""
+        return {
+            'dataset_id': dataset_id,
+            'n_before': entry['n_before'],
+            'n_after': entry['n_after'],
+            'nbytes': entry['nbytes'],
+            'state_bytes': self._state_bytes(entry),
+            'in_memory': entry['df_before'] is not None,
+            'created_at': entry['created_at'],
+            'fingerprint': entry['fingerprint'],
+            'pending_rows': sum(len(batch) for batches in entry['pending'] for batch in batches),
+            'appended_batches': entry['appended_batches'],
+            'sequential_looks': entry['sequential'].n_looks if entry['sequential'] is not None else None,
+            'metadata': entry['metadata']
+        }
+    
+    def _state_bytes(self, entry: Dict[str, Any]) -> int:
+        """
+        Bytes del estado incremental de una entrada (historial del monitor
+        secuencial y sketches), que queda en memoria aunque el dataset se vuelque
+        """
+        monitor = entry['sequential']
+        return ((monitor.nbytes if monitor is not None else 0)
+                + sum(sketch.nbytes for sketches in entry['sketches'].values() for sketch in sketches))
+    
+    def _bytes_in_memory(self) -> int:
+        """Bytes ocupados por los datasets cargados en memoria y su estado incremental"""
+        return sum((entry['nbytes'] if entry['df_before'] is not None else 0) + self._state_bytes(entry)
+                   for entry in self._entries.values())
+    
+    def _enforce_budget(self, keep: Optional[str] = None) -> None:
+        """
+        Expulsa datasets LRU hasta cumplir el presupuesto de memoria
+        
+        El dataset 'keep' (el que se está usando) nunca se expulsa, aunque por
+        sí solo supere el presupuesto.
+        """
+        if self.max_bytes is None:
+            return
+        
+        for dataset_id in list(self._entries.keys()):
+            if self._bytes_in_memory() <= self.max_bytes:
+                break
+            entry = self._entries[dataset_id]
+            if dataset_id == keep or entry['df_before'] is None:
+                continue
+            
+            self._counters['evictions'] += 1
+            if self.spill_dir:
+                entry['spill_path'] = save_simulation_data(
+                    entry['df_before'], entry['df_after'],
+                    storage_path(os.path.join(self.spill_dir, dataset_id), self.spill_format),
+                    self.spill_format
+                )
+                entry['df_before'] = None
+                entry['df_after'] = None
+                self._counters['spills'] += 1
+            else:
+                del self._entries[dataset_id]
+                if self._latest_id == dataset_id:
+                    self._latest_id = next(reversed(self._entries), None)
+    
+    def _remove_spill_file(self, entry: Dict[str, Any]) -> None:
+        """Borra el archivo de volcado de una entrada, si existe"""
+        if entry['spill_path'] and os.path.exists(entry['spill_path']):
+            os.remove(entry['spill_path'])
+        entry['spill_path'] = None
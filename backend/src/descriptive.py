@@ -0,0 +1,92 @@
+"""
+Estadísticas descriptivas para análisis Kaizen - Cafetería
+Núcleo compartido: momentos en dos recorridos y todos los cuantiles (más
+mínimo y máximo) de un único np.partition, reutilizados por el resumen, el
+t-test, Cohen's d y Levene
+"""
+
+import numpy as np
+from typing import Dict, Any, Optional, Sequence
+
+# Cuantiles calculados por describe() y su nombre en el resultado
+DEFAULT_QUANTILES = {'q25': 0.25, 'mediana': 0.5, 'q75': 0.75}
+
+def moments(values: np.ndarray) -> Dict[str, Any]:
+    """
+    Tamaño, media y varianza muestral (ddof=1)
+
+    La varianza se calcula sobre las desviaciones a la media (dos
+    recorridos) en vez de con sumas de cuadrados, que pierden precisión.
+
+    Args:
+        values: Observaciones
+
+    Returns:
+        Diccionario con n, media, var y std (NaN si no hay suficientes datos)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = values.size
+    if n == 0:
+        return {'n': 0, 'media': np.nan, 'var': np.nan, 'std': np.nan}
+
+    mean = values.mean()
+    deviations = values - mean
+    var = float(np.dot(deviations, deviations) / (n - 1)) if n > 1 else np.nan
+    return {'n': int(n), 'media': float(mean), 'var': var, 'std': float(np.sqrt(var))}
+
+def order_statistics(values: np.ndarray, quantiles: Sequence[float]) -> Dict[str, Any]:
+    """
+    Mínimo, máximo y cuantiles de un solo np.partition
+
+    Los cuantiles usan interpolación lineal, igual que np.percentile.
+
+    Args:
+        values: Observaciones
+        quantiles: Cuantiles en [0, 1]
+
+    Returns:
+        Diccionario con 'min', 'max' y 'quantiles' (lista en el mismo orden)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = values.size
+    if n == 0:
+        return {'min': np.nan, 'max': np.nan, 'quantiles': [np.nan] * len(quantiles)}
+
+    positions = np.asarray(quantiles, dtype=np.float64) * (n - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, n - 1)
+    kth = np.unique(np.concatenate([[0, n - 1], lower, upper]))
+    partitioned = np.partition(values, kth)
+
+    weights = positions - lower
+    quantile_values = partitioned[lower] + (partitioned[upper] - partitioned[lower]) * weights
+    return {
+        'min': float(partitioned[0]),
+        'max': float(partitioned[n - 1]),
+        'quantiles': [float(value) for value in quantile_values]
+    }
+
+def describe(values: np.ndarray, quantiles: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Estadísticas descriptivas completas de una columna
+
+    Cada columna se recorre un número constante de veces (media, desviaciones
+    y una partición) sin importar cuántos cuantiles se pidan.
+
+    Args:
+        values: Observaciones
+        quantiles: Nombre -> cuantil (por defecto q25, mediana y q75)
+
+    Returns:
+        Diccionario con n, media, var, std, min, max, los cuantiles pedidos
+        e iqr (si se pidieron q25 y q75)
+    """
+    quantiles = DEFAULT_QUANTILES if quantiles is None else quantiles
+    result = moments(values)
+    order = order_statistics(values, list(quantiles.values()))
+    result['min'] = order['min']
+    result['max'] = order['max']
+    result.update(zip(quantiles.keys(), order['quantiles']))
+    if 'q25' in result and 'q75' in result:
+        result['iqr'] = result['q75'] - result['q25']
+    return result
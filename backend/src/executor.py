@@ -0,0 +1,237 @@
+"""
+Capa de ejecución para trabajo intensivo en CPU - Análisis Kaizen
+Ejecuta generación, análisis y renderizado fuera del event loop de FastAPI,
+con cola acotada y timeout por tarea
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+EXECUTOR_MODES = ['process', 'thread', 'inline']
+
+class TaskQueueFullError(RuntimeError):
+    """La cola de tareas alcanzó su profundidad máxima"""
+
+class TaskTimeoutError(TimeoutError):
+    """La tarea superó el tiempo máximo de espera"""
+
+class TaskExecutor:
+    """
+    Ejecutor de tareas CPU-bound con profundidad de cola y timeout
+    
+    Modos:
+        - 'process': pool de procesos (por defecto; aísla el renderizado de matplotlib)
+        - 'thread': pool de hilos (útil si el trabajo libera el GIL)
+        - 'inline': ejecuta en el hilo que llama (depuración y pruebas)
+    
+    Una tarea que supera el timeout deja de esperarse y se cancela si aún no
+    empezó; si ya se está ejecutando en un proceso termina en segundo plano
+    y sigue contando para la profundidad de cola hasta que finaliza.
+    """
+    
+    def __init__(self, mode: str = 'process', max_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None, timeout: Optional[float] = None):
+        """
+        Args:
+            mode: 'process', 'thread' o 'inline'
+            max_workers: Número de workers (por defecto os.cpu_count())
+            max_pending: Tareas máximas en ejecución o en cola (None = sin límite)
+            timeout: Segundos máximos de espera por tarea (None = sin límite)
+        """
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Modo '{mode}' no soportado. Disponibles: {EXECUTOR_MODES}")
+        
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._counters = {'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0, 'timeouts': 0}
+    
+    def _get_pool(self) -> Executor:
+        """Crea el pool de forma perezosa en el primer uso"""
+        if self._pool is None:
+            if self.mode == 'process':
+                # 'spawn' evita heredar locks de los hilos del servidor al hacer fork
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+    
+    def _reserve_slot(self) -> None:
+        """Ocupa un lugar en la cola o lanza TaskQueueFullError"""
+        with self._lock:
+            if self.max_pending is not None and self._pending >= self.max_pending:
+                self._counters['rejected'] += 1
+                raise TaskQueueFullError(
+                    f"Cola de tareas llena ({self._pending}/{self.max_pending}). Intenta más tarde."
+                )
+            self._pending += 1
+            self._counters['submitted'] += 1
+    
+    def _release_slot(self, future: Future) -> None:
+        """Libera el lugar de una tarea cuando realmente termina"""
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self._counters['failed'] += 1
+            else:
+                self._counters['completed'] += 1
+    
+    async def run(self, func: Callable, *args: Any, timeout: Optional[float] = None,
+                  **kwargs: Any) -> Any:
+        """
+        Ejecuta func(*args, **kwargs) fuera del event loop y espera su resultado
+        
+        En modo 'process' func y sus argumentos deben poder serializarse con
+        pickle (funciones definidas a nivel de módulo).
+        
+        Args:
+            func: Función a ejecutar
+            timeout: Timeout específico de la tarea (por defecto el del ejecutor)
+        
+        Returns:
+            Resultado de la función
+        """
+        self._reserve_slot()
+        
+        if self.mode == 'inline':
+            future: Future = Future()
+            try:
+                future.set_result(func(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            self._release_slot(future)
+            return future.result()
+        
+        try:
+            future = self._get_pool().submit(func, *args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._release_slot)
+        
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            with self._lock:
+                self._counters['timeouts'] += 1
+            raise TaskTimeoutError(f"La tarea superó el tiempo máximo de {timeout} s")
+    
+    async def run_many(self, calls: Sequence[Tuple[Callable, tuple]],
+                       timeout: Optional[float] = None) -> List[Any]:
+        """
+        Ejecuta varias llamadas en paralelo ocupando un solo lugar de la cola
+        
+        Pensado para trabajo de una misma petición que se reparte entre los
+        workers (p.ej. un gráfico por proceso): el grupo se admite o se
+        rechaza completo y el timeout aplica al grupo.
+        
+        Args:
+            calls: Pares (func, args) a ejecutar
+            timeout: Timeout del grupo (por defecto el del ejecutor)
+        
+        Returns:
+            Lista con el resultado de cada llamada, o la excepción que lanzó
+        """
+        self._reserve_slot()
+        group: Future = Future()
+        
+        if self.mode == 'inline':
+            results = []
+            for func, args in calls:
+                try:
+                    results.append(func(*args))
+                except Exception as e:
+                    results.append(e)
+            group.set_result(None)
+            self._release_slot(group)
+            return results
+        
+        futures: List[Future] = []
+        try:
+            for func, args in calls:
+                futures.append(self._get_pool().submit(func, *args))
+        except Exception:
+            for future in futures:
+                future.cancel()
+            with self._lock:
+                self._pending -= 1
+            raise
+        
+        # El lugar se libera cuando terminan todas las llamadas del grupo
+        remaining = [len(futures)]
+        def on_done(_: Future) -> None:
+            with self._lock:
+                remaining[0] -= 1
+                finished = remaining[0] == 0
+            if finished:
+                group.set_result(None)
+                self._release_slot(group)
+        for future in futures:
+            future.add_done_callback(on_done)
+        if not futures:
+            group.set_result(None)
+            self._release_slot(group)
+        
+        timeout = self.timeout if timeout is None else timeout
+        gathered = asyncio.gather(*(asyncio.wrap_future(future) for future in futures),
+                                  return_exceptions=True)
+        try:
+            return await asyncio.wait_for(asyncio.shield(gathered), timeout)
+        except asyncio.TimeoutError:
+            for future in futures:
+                future.cancel()
+            with self._lock:
+                self._counters['timeouts'] += 1
+            raise TaskTimeoutError(f"El grupo de tareas superó el tiempo máximo de {timeout} s")
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Estado del ejecutor: configuración, tareas pendientes y contadores
+        """
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'timeout_s': self.timeout,
+                'pending': self._pending,
+                **self._counters
+            }
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Detiene el pool de workers"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+
+def executor_from_env() -> TaskExecutor:
+    """
+    Crea un TaskExecutor configurado con variables de entorno
+    
+    Variables:
+        KAIZEN_EXECUTOR_MODE: 'process' (defecto), 'thread' o 'inline'
+        KAIZEN_EXECUTOR_WORKERS: Número de workers (defecto: CPUs disponibles)
+        KAIZEN_EXECUTOR_MAX_PENDING: Profundidad máxima de cola (defecto: 4 x workers)
+        KAIZEN_TASK_TIMEOUT: Timeout por tarea en segundos (defecto: 300)
+    """
+    max_workers = int(os.getenv("KAIZEN_EXECUTOR_WORKERS", "0")) or os.cpu_count() or 1
+    return TaskExecutor(
+        mode=os.getenv("KAIZEN_EXECUTOR_MODE", "process"),
+        max_workers=max_workers,
+        max_pending=int(os.getenv("KAIZEN_EXECUTOR_MAX_PENDING", str(4 * max_workers))),
+        timeout=float(os.getenv("KAIZEN_TASK_TIMEOUT", "300"))
+    )
@@ -5,9 +5,175 @@ Simula tiempos de atención antes y después de implementar mejoras
 
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-import random
-from typing import Tuple, Dict, Any
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Tuple, Dict, Any, Iterable, Iterator, List, Optional
+from src.descriptive import describe
+
+# Catálogos usados para codificar columnas como enteros
+FRANJAS_HORARIAS = np.array(['07:00-09:00', '09:00-11:00', '11:00-13:00',
+                             '13:00-15:00', '15:00-17:00', '17:00-19:00'], dtype=object)
+SERVIDORES = np.array(['Servidor_1', 'Servidor_2', 'Servidor_3'], dtype=object)
+DIAS_SEMANA = np.array(['Monday', 'Tuesday', 'Wednesday', 'Thursday',
+                        'Friday', 'Saturday', 'Sunday'], dtype=object)
+
+# Tipos compactos de las columnas: categóricas con catálogo fijo, fechas
+# datetime64 y tiempos float64
+PERIODO_DTYPE = pd.CategoricalDtype(['antes', 'despues'])
+FRANJA_HORARIA_DTYPE = pd.CategoricalDtype(FRANJAS_HORARIAS, ordered=True)
+DIA_SEMANA_DTYPE = pd.CategoricalDtype(DIAS_SEMANA, ordered=True)
+SERVIDOR_DTYPE = pd.CategoricalDtype(SERVIDORES)
+
+# Periodos de la simulación (fecha inicio, fecha fin inclusive)
+PERIODO_ANTES = (datetime(2024, 1, 1), datetime(2024, 3, 31))
+PERIODO_DESPUES = (datetime(2024, 4, 1), datetime(2024, 6, 30))
+
+# Tiempo de atención mínimo simulado (minutos)
+TIEMPO_MINIMO_MIN = 1.0
+
+# Filas por bloque. Cada bloque tiene su propio flujo aleatorio derivado de la
+# semilla, por lo que el resultado no depende del número de procesos usados.
+DEFAULT_BLOCK_SIZE = 1_000_000
+
+def _generate_block(
+    entropy: int,
+    spawn_key: Tuple[int, ...],
+    n: int,
+    mean: float,
+    std: float,
+    day_counts: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Genera un bloque de observaciones con un np.random.Generator aislado
+    
+    Args:
+        entropy: Entropía de la SeedSequence raíz
+        spawn_key: Clave (grupo, bloque) que identifica el flujo aleatorio
+        n: Número de observaciones del bloque
+        mean: Media de tiempo (minutos)
+        std: Desviación estándar
+        day_counts: Observaciones del bloque por cada día del periodo
+    
+    Returns:
+        Diccionario de arrays (tiempos, desplazamiento de días y códigos)
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=spawn_key))
+    
+    times = np.maximum(
+        rng.normal(mean, std, n),
+        TIEMPO_MINIMO_MIN
+    )
+    
+    return {
+        'tiempo_atencion_min': np.round(times, 2),
+        # Desplazamientos de día ya ordenados: no hace falta ordenar después
+        'dia': np.repeat(np.arange(len(day_counts), dtype=np.int32), day_counts),
+        'franja_horaria': rng.integers(0, len(FRANJAS_HORARIAS), n, dtype=np.int8),
+        'servidor': rng.integers(0, len(SERVIDORES), n, dtype=np.int8)
+    }
+
+def _block_sizes(n: int, block_size: int) -> List[int]:
+    """Divide n observaciones en bloques de tamaño fijo"""
+    full_blocks, remainder = divmod(n, block_size)
+    return [block_size] * full_blocks + ([remainder] if remainder else [])
+
+def _plan_blocks(
+    n_before: int,
+    n_after: int,
+    before_mean: float,
+    after_mean: float,
+    before_std: float,
+    after_std: float,
+    seed: Optional[int],
+    block_size: int
+) -> List[tuple]:
+    """
+    Planifica los bloques de ambos periodos como argumentos de _generate_block
+    
+    Las fechas de cada periodo se reparten con una multinomial uniforme sobre
+    los días (equivalente a elegir un día al azar por fila). Cada bloque recibe
+    el tramo de conteos que le corresponde, así los bloques se emiten en orden
+    de fecha y el de 'antes' precede siempre al de 'después'.
+    
+    Returns:
+        Lista de tuplas (entropy, (grupo, bloque), n, media, std, conteos por día)
+    """
+    if block_size < 1:
+        raise ValueError("block_size debe ser mayor que 0")
+    
+    entropy = np.random.SeedSequence(seed).entropy
+    
+    periods = [
+        (n_before, before_mean, before_std, PERIODO_ANTES),
+        (n_after, after_mean, after_std, PERIODO_DESPUES)
+    ]
+    tasks = []
+    for group, (n, mean, std, (start_date, end_date)) in enumerate(periods):
+        n_days = (end_date - start_date).days + 1
+        
+        # Conteo de observaciones por día con un flujo propio del grupo
+        rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(group,)))
+        day_counts = rng.multinomial(n, np.full(n_days, 1.0 / n_days))
+        day_ends = np.cumsum(day_counts)
+        day_starts = day_ends - day_counts
+        
+        row = 0
+        for block, size in enumerate(_block_sizes(n, block_size)):
+            block_counts = (np.clip(day_ends, row, row + size)
+                            - np.clip(day_starts, row, row + size))
+            tasks.append((entropy, (group, block), size, mean, std, block_counts))
+            row += size
+    
+    return tasks
+
+def _build_period_frame(
+    blocks: List[Dict[str, np.ndarray]],
+    start_date: datetime,
+    periodo: str
+) -> pd.DataFrame:
+    """
+    Une los bloques generados de un periodo en un DataFrame
+    
+    Args:
+        blocks: Bloques de arrays en orden
+        start_date: Primer día del periodo
+        periodo: Etiqueta del periodo ('antes' o 'despues')
+    
+    Returns:
+        DataFrame con el esquema de la simulación (columnas categóricas)
+    """
+    def column(name: str, dtype) -> np.ndarray:
+        if not blocks:
+            return np.empty(0, dtype=dtype)
+        if len(blocks) == 1:
+            return blocks[0][name]
+        return np.concatenate([block[name] for block in blocks])
+    
+    times = column('tiempo_atencion_min', np.float64)
+    
+    # Fechas como datetime64[D]: día inicial + desplazamiento
+    dates = np.datetime64(start_date.date(), 'D') + column('dia', np.int32)
+    
+    # Día de la semana derivado de la fecha (1970-01-01 fue jueves)
+    weekday_codes = (dates.astype(np.int64) + 3) % 7
+    
+    return pd.DataFrame({
+        'fecha': dates.astype('datetime64[ns]'),
+        'periodo': pd.Categorical.from_codes(
+            np.full(len(times), PERIODO_DTYPE.categories.get_loc(periodo), dtype=np.int8),
+            dtype=PERIODO_DTYPE
+        ),
+        'tiempo_atencion_min': times,
+        'franja_horaria': pd.Categorical.from_codes(column('franja_horaria', np.int8),
+                                                    dtype=FRANJA_HORARIA_DTYPE),
+        'dia_semana': pd.Categorical.from_codes(weekday_codes, dtype=DIA_SEMANA_DTYPE),
+        'servidor': pd.Categorical.from_codes(column('servidor', np.int8),
+                                              dtype=SERVIDOR_DTYPE)
+    })
+
+# Fecha inicial y etiqueta de cada grupo, en el orden de _plan_blocks
+_GROUPS = [(PERIODO_ANTES[0], 'antes'), (PERIODO_DESPUES[0], 'despues')]
 
 def generate_simulation_data(
     n_before: int = 100,
@@ -16,11 +182,23 @@ def generate_simulation_data(
     after_mean: float = 6.2,
     before_std: float = 2.1,
     after_std: float = 1.5,
-    seed: int = None
+    seed: Optional[int] = None,
+    n_workers: int = 1,
+    block_size: int = DEFAULT_BLOCK_SIZE
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Genera datos simulados de tiempos de atención antes y después de mejoras Kaizen
     
+    Todas las columnas se generan como arrays de NumPy en una sola operación
+    (sin bucles por fila), por lo que escala a millones de registros. Las
+    filas de cada periodo salen ordenadas por fecha.
+    
+    La aleatoriedad proviene de generadores np.random.Generator independientes
+    derivados de una SeedSequence (uno por grupo y bloque), sin tocar el estado
+    global de NumPy. Con n_workers > 1 los bloques se generan en un pool de
+    procesos; para una misma semilla el resultado es idéntico bit a bit sin
+    importar el número de procesos.
+    
     Args:
         n_before: Número de observaciones antes
         n_after: Número de observaciones después
@@ -28,82 +206,97 @@ def generate_simulation_data(
         after_mean: Media de tiempo después (minutos)
         before_std: Desviación estándar antes
         after_std: Desviación estándar después
-        seed: Semilla para reproducibilidad
+        seed: Semilla para reproducibilidad (None usa entropía del sistema)
+        n_workers: Número de procesos para generar los bloques
+        block_size: Filas por bloque aleatorio independiente
     
     Returns:
         Tuple con DataFrames (antes, después)
     """
-    if seed:
-        np.random.seed(seed)
-        random.seed(seed)
+    tasks = _plan_blocks(n_before, n_after, before_mean, after_mean,
+                         before_std, after_std, seed, block_size)
     
-    # Generar fechas realistas
-    start_date_before = datetime(2024, 1, 1)
-    end_date_before = datetime(2024, 3, 31)
-    start_date_after = datetime(2024, 4, 1)
-    end_date_after = datetime(2024, 6, 30)
+    if n_workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(tasks))) as pool:
+            results = list(pool.map(_generate_block, *zip(*tasks)))
+    else:
+        results = [_generate_block(*task) for task in tasks]
     
-    # Datos ANTES de la mejora Kaizen
-    before_times = np.maximum(
-        np.random.normal(before_mean, before_std, n_before),
-        1.0  # Tiempo mínimo 1 minuto
-    )
+    blocks_by_group: Dict[int, List[Dict[str, np.ndarray]]] = {0: [], 1: []}
+    for task, result in zip(tasks, results):
+        blocks_by_group[task[1][0]].append(result)
     
-    before_dates = [
-        start_date_before + timedelta(
-            days=random.randint(0, (end_date_before - start_date_before).days)
-        ) for _ in range(n_before)
-    ]
+    # Datos ANTES de la mejora Kaizen
+    df_before = _build_period_frame(blocks_by_group[0], *_GROUPS[0])
     
-    before_hours = [
-        random.choice(['07:00-09:00', '09:00-11:00', '11:00-13:00', 
-                      '13:00-15:00', '15:00-17:00', '17:00-19:00'])
-        for _ in range(n_before)
-    ]
+    # Datos DESPUÉS de la mejora Kaizen
+    df_after = _build_period_frame(blocks_by_group[1], *_GROUPS[1])
     
-    df_before = pd.DataFrame({
-        'fecha': before_dates,
-        'periodo': 'antes',
-        'tiempo_atencion_min': np.round(before_times, 2),
-        'franja_horaria': before_hours,
-        'dia_semana': [date.strftime('%A') for date in before_dates],
-        'servidor': [f'Servidor_{random.randint(1, 3)}' for _ in range(n_before)]
-    })
+    return df_before, df_after
+
+def iter_simulation_data(
+    n_before: int = 100,
+    n_after: int = 100,
+    before_mean: float = 8.5,
+    after_mean: float = 6.2,
+    before_std: float = 2.1,
+    after_std: float = 1.5,
+    seed: Optional[int] = None,
+    n_workers: int = 1,
+    chunk_size: int = DEFAULT_BLOCK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """
+    Variante en streaming de generate_simulation_data
     
-    # Datos DESPUÉS de la mejora Kaizen
-    after_times = np.maximum(
-        np.random.normal(after_mean, after_std, n_after),
-        1.0  # Tiempo mínimo 1 minuto
-    )
+    Emite DataFrames de como máximo chunk_size filas, primero los de 'antes' y
+    luego los de 'después', en orden de fecha global. La memoria máxima es de
+    unos pocos chunks (n_workers + 1 con procesos) sin importar el total de
+    filas. Concatenar los chunks de cada periodo reproduce exactamente
+    generate_simulation_data con block_size=chunk_size y la misma semilla.
     
-    after_dates = [
-        start_date_after + timedelta(
-            days=random.randint(0, (end_date_after - start_date_after).days)
-        ) for _ in range(n_after)
-    ]
+    Args:
+        n_before: Número de observaciones antes
+        n_after: Número de observaciones después
+        before_mean: Media de tiempo antes (minutos)
+        after_mean: Media de tiempo después (minutos)
+        before_std: Desviación estándar antes
+        after_std: Desviación estándar después
+        seed: Semilla para reproducibilidad (None usa entropía del sistema)
+        n_workers: Número de procesos que generan chunks por adelantado
+        chunk_size: Filas máximas por chunk
     
-    after_hours = [
-        random.choice(['07:00-09:00', '09:00-11:00', '11:00-13:00', 
-                      '13:00-15:00', '15:00-17:00', '17:00-19:00'])
-        for _ in range(n_after)
-    ]
+    Yields:
+        DataFrames con el esquema de la simulación
+    """
+    tasks = _plan_blocks(n_before, n_after, before_mean, after_mean,
+                         before_std, after_std, seed, chunk_size)
     
-    df_after = pd.DataFrame({
-        'fecha': after_dates,
-        'periodo': 'despues',
-        'tiempo_atencion_min': np.round(after_times, 2),
-        'franja_horaria': after_hours,
-        'dia_semana': [date.strftime('%A') for date in after_dates],
-        'servidor': [f'Servidor_{random.randint(1, 3)}' for _ in range(n_after)]
-    })
+    if n_workers <= 1:
+        for task in tasks:
+            yield _build_period_frame([_generate_block(*task)], *_GROUPS[task[1][0]])
+        return
     
-    return df_before, df_after
+    # Ventana acotada de chunks en vuelo para no acumular resultados
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append((task, pool.submit(_generate_block, *task)))
+            if len(pending) > n_workers:
+                done_task, future = pending.popleft()
+                yield _build_period_frame([future.result()], *_GROUPS[done_task[1][0]])
+        while pending:
+            done_task, future = pending.popleft()
+            yield _build_period_frame([future.result()], *_GROUPS[done_task[1][0]])
 
 def save_simulation_to_csv(df_before: pd.DataFrame, df_after: pd.DataFrame, 
                           output_path: str = "simulation_data.csv") -> str:
     """
     Guarda los datos simulados en un archivo CSV
     
+    Si ambos DataFrames ya vienen ordenados por fecha (como los que produce
+    generate_simulation_data) se escriben uno tras otro sin concatenar ni
+    ordenar en memoria.
+    
     Args:
         df_before: DataFrame con datos antes
         df_after: DataFrame con datos después
@@ -112,6 +305,15 @@ def save_simulation_to_csv(df_before: pd.DataFrame, df_after: pd.DataFrame,
     Returns:
         Ruta del archivo guardado
     """
+    dates_in_order = (
+        df_before['fecha'].is_monotonic_increasing
+        and df_after['fecha'].is_monotonic_increasing
+        and (df_before.empty or df_after.empty
+             or df_before['fecha'].iloc[-1] <= df_after['fecha'].iloc[0])
+    )
+    if dates_in_order:
+        return save_simulation_stream_to_csv([df_before, df_after], output_path)
+    
     # Combinar ambos datasets
     df_combined = pd.concat([df_before, df_after], ignore_index=True)
     
@@ -123,6 +325,113 @@ def save_simulation_to_csv(df_before: pd.DataFrame, df_after: pd.DataFrame,
     
     return output_path
 
+def save_simulation_stream_to_csv(chunks: Iterable[pd.DataFrame],
+                                  output_path: str = "simulation_data.csv") -> str:
+    """
+    Guarda en CSV una secuencia de chunks escribiéndolos uno a uno
+    
+    Los chunks se escriben en el orden recibido, por lo que deben venir ya
+    ordenados por fecha (por ejemplo, los de iter_simulation_data).
+    
+    Args:
+        chunks: Iterable de DataFrames con el esquema de la simulación
+        output_path: Ruta del archivo de salida
+    
+    Returns:
+        Ruta del archivo guardado
+    """
+    with open(output_path, 'w', newline='') as csv_file:
+        header = True
+        for chunk in chunks:
+            if chunk.empty and not header:
+                continue
+            chunk.to_csv(csv_file, index=False, header=header)
+            header = False
+    
+    return output_path
+
+def coerce_simulation_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte un DataFrame con el esquema de la simulación a tipos compactos
+    
+    Pensado para cualquier ruta de ingesta (CSV, uploads): 'fecha' pasa a
+    datetime64, 'tiempo_atencion_min' a float64 y las columnas de texto a
+    Categorical. Si los valores caben en el catálogo de la simulación se usa
+    ese catálogo; en otro caso las categorías se infieren de los datos.
+    
+    Args:
+        df: DataFrame con (un subconjunto de) las columnas de la simulación
+    
+    Returns:
+        DataFrame con los tipos convertidos
+    """
+    # Copia superficial: las columnas se reemplazan, no se modifican in situ
+    df = df.copy(deep=False)
+    
+    if 'fecha' in df.columns:
+        df['fecha'] = pd.to_datetime(df['fecha'])
+    if 'tiempo_atencion_min' in df.columns:
+        df['tiempo_atencion_min'] = pd.to_numeric(df['tiempo_atencion_min']).astype(np.float64)
+    
+    categorical_columns = {
+        'periodo': PERIODO_DTYPE,
+        'franja_horaria': FRANJA_HORARIA_DTYPE,
+        'dia_semana': DIA_SEMANA_DTYPE,
+        'servidor': SERVIDOR_DTYPE
+    }
+    for column, dtype in categorical_columns.items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if values.dropna().isin(dtype.categories).all():
+            df[column] = values.astype(dtype)
+        else:
+            df[column] = values.astype('category')
+    
+    return df
+
+def memory_footprint(df: pd.DataFrame) -> Dict[str, int]:
+    """
+    Calcula la memoria ocupada por cada columna de un DataFrame
+    
+    Args:
+        df: DataFrame a inspeccionar
+    
+    Returns:
+        Diccionario columna -> bytes, más 'index' y 'total'
+    """
+    usage = df.memory_usage(deep=True, index=True)
+    footprint = {('index' if name == 'Index' else name): int(value) for name, value in usage.items()}
+    footprint['total'] = int(usage.sum())
+    return footprint
+
+def load_simulation_from_csv(input_path: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Carga un CSV guardado con save_simulation_to_csv con tipos compactos
+    
+    Args:
+        input_path: Ruta del archivo CSV
+    
+    Returns:
+        Tuple con DataFrames (antes, después)
+    """
+    df = pd.read_csv(
+        input_path,
+        parse_dates=['fecha'],
+        dtype={
+            'periodo': 'category',
+            'tiempo_atencion_min': np.float64,
+            'franja_horaria': 'category',
+            'dia_semana': 'category',
+            'servidor': 'category'
+        }
+    )
+    df = coerce_simulation_dtypes(df)
+    
+    df_before = df[df['periodo'] == 'antes'].reset_index(drop=True)
+    df_after = df[df['periodo'] == 'despues'].reset_index(drop=True)
+    return df_before, df_after
+
 def get_simulation_summary(df_before: pd.DataFrame, df_after: pd.DataFrame) -> Dict[str, Any]:
     """
     Genera resumen estadístico de la simulación
@@ -135,26 +444,25 @@ def get_simulation_summary(df_before: pd.DataFrame, df_after: pd.DataFrame) -> D
         Diccionario con estadísticas descriptivas
     """
     return {
-        'antes': {
-            'n_observaciones': len(df_before),
-            'media': float(df_before['tiempo_atencion_min'].mean()),
-            'mediana': float(df_before['tiempo_atencion_min'].median()),
-            'std': float(df_before['tiempo_atencion_min'].std()),
-            'min': float(df_before['tiempo_atencion_min'].min()),
-            'max': float(df_before['tiempo_atencion_min'].max()),
-            'fecha_inicio': df_before['fecha'].min().strftime('%Y-%m-%d'),
-            'fecha_fin': df_before['fecha'].max().strftime('%Y-%m-%d')
-        },
-        'despues': {
-            'n_observaciones': len(df_after),
-            'media': float(df_after['tiempo_atencion_min'].mean()),
-            'mediana': float(df_after['tiempo_atencion_min'].median()),
-            'std': float(df_after['tiempo_atencion_min'].std()),
-            'min': float(df_after['tiempo_atencion_min'].min()),
-            'max': float(df_after['tiempo_atencion_min'].max()),
-            'fecha_inicio': df_after['fecha'].min().strftime('%Y-%m-%d'),
-            'fecha_fin': df_after['fecha'].max().strftime('%Y-%m-%d')
-        }
+        'antes': period_summary(df_before),
+        'despues': period_summary(df_after)
+    }
+
+def period_summary(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Resumen de un período con el núcleo de estadísticas descriptivas
+    (una partición para mediana, mínimo y máximo)
+    """
+    summary = describe(df['tiempo_atencion_min'].to_numpy(), quantiles={'mediana': 0.5})
+    return {
+        'n_observaciones': summary['n'],
+        'media': summary['media'],
+        'mediana': summary['mediana'],
+        'std': summary['std'],
+        'min': summary['min'],
+        'max': summary['max'],
+        'fecha_inicio': df['fecha'].min().strftime('%Y-%m-%d'),
+        'fecha_fin': df['fecha'].max().strftime('%Y-%m-%d')
     }
 
 if __name__ == "__main__":
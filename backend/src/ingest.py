@@ -0,0 +1,243 @@
+"""
+Ingesta de datos reales de tiempos de atención para análisis Kaizen - Cafetería
+Lee archivos CSV/Parquet por chunks, valida y separa antes/después
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from pandas.api.types import union_categoricals
+from typing import Tuple, Dict, Any, Iterator, List, Optional, BinaryIO
+
+from src.generate_data import coerce_simulation_dtypes, DIA_SEMANA_DTYPE, FRANJA_HORARIA_DTYPE, SERVIDOR_DTYPE
+
+# Columnas reconocidas en los archivos de entrada
+KNOWN_COLUMNS = ['fecha', 'periodo', 'tiempo_atencion_min', 'franja_horaria', 'dia_semana', 'servidor']
+REQUIRED_COLUMNS = ['fecha', 'tiempo_atencion_min']
+
+# Filas por chunk al parsear (acota la memoria de la ingesta)
+DEFAULT_CHUNK_ROWS = 500_000
+
+UPLOAD_FORMATS = ['csv', 'parquet']
+
+def infer_upload_format(filename: Optional[str]) -> str:
+    """
+    Deduce el formato del archivo subido a partir de su nombre
+    
+    Args:
+        filename: Nombre del archivo
+    
+    Returns:
+        'csv' o 'parquet'
+    """
+    name = (filename or '').lower()
+    if name.endswith('.parquet') or name.endswith('.pq'):
+        return 'parquet'
+    if name.endswith('.csv'):
+        return 'csv'
+    raise ValueError(f"No se puede deducir el formato de '{filename}'. Usa .csv o .parquet")
+
+def iter_file_chunks(file_obj: BinaryIO, fmt: str,
+                     chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Lee un archivo por chunks sin cargar su contenido completo en memoria
+    
+    Args:
+        file_obj: Archivo binario abierto (posicionado al inicio)
+        fmt: 'csv' o 'parquet'
+        chunk_rows: Filas por chunk
+    
+    Yields:
+        DataFrames con las columnas reconocidas del archivo
+    """
+    if fmt == 'csv':
+        reader = pd.read_csv(
+            file_obj,
+            chunksize=chunk_rows,
+            usecols=lambda column: column in KNOWN_COLUMNS,
+            dtype={
+                'periodo': 'category',
+                'franja_horaria': 'category',
+                'dia_semana': 'category',
+                'servidor': 'category'
+            }
+        )
+        with reader:
+            for chunk in reader:
+                yield chunk
+    elif fmt == 'parquet':
+        parquet_file = pq.ParquetFile(file_obj)
+        columns = [name for name in parquet_file.schema_arrow.names if name in KNOWN_COLUMNS]
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Formato '{fmt}' no soportado. Disponibles: {UPLOAD_FORMATS}")
+
+def prepare_chunk(chunk: pd.DataFrame, cutoff_date: Optional[pd.Timestamp] = None) -> Tuple[pd.DataFrame, int]:
+    """
+    Valida un chunk, convierte tipos y asigna el periodo de cada fila
+    
+    Se descartan filas con fecha o tiempo no parseable, tiempos no positivos
+    y (sin fecha de corte) periodos distintos de 'antes'/'despues'.
+    
+    Args:
+        chunk: DataFrame crudo leído del archivo
+        cutoff_date: Fecha de corte; filas anteriores son 'antes' y el resto 'despues'
+    
+    Returns:
+        Tuple con (DataFrame limpio con tipos compactos, filas descartadas)
+    """
+    missing = [column for column in REQUIRED_COLUMNS if column not in chunk.columns]
+    if missing:
+        raise ValueError(f"Faltan columnas obligatorias: {missing}")
+    if cutoff_date is None and 'periodo' not in chunk.columns:
+        raise ValueError("Se requiere una columna 'periodo' o una fecha de corte (cutoff_date)")
+    
+    chunk = chunk.copy(deep=False)
+    chunk['fecha'] = pd.to_datetime(chunk['fecha'], errors='coerce')
+    chunk['tiempo_atencion_min'] = pd.to_numeric(chunk['tiempo_atencion_min'], errors='coerce')
+    
+    if cutoff_date is not None:
+        chunk['periodo'] = np.where(chunk['fecha'] < cutoff_date, 'antes', 'despues')
+    
+    valid = (
+        chunk['fecha'].notna()
+        & chunk['tiempo_atencion_min'].notna()
+        & (chunk['tiempo_atencion_min'] > 0)
+        & chunk['periodo'].isin(['antes', 'despues'])
+    )
+    n_invalid = int((~valid).sum())
+    if n_invalid:
+        chunk = chunk[valid]
+    
+    # Completar columnas opcionales para mantener el esquema de la simulación
+    if 'dia_semana' not in chunk.columns:
+        chunk['dia_semana'] = pd.Categorical.from_codes(
+            chunk['fecha'].dt.dayofweek.to_numpy(), dtype=DIA_SEMANA_DTYPE
+        )
+    if 'franja_horaria' not in chunk.columns:
+        chunk['franja_horaria'] = pd.Categorical([None] * len(chunk), dtype=FRANJA_HORARIA_DTYPE)
+    if 'servidor' not in chunk.columns:
+        chunk['servidor'] = pd.Categorical([None] * len(chunk), dtype=SERVIDOR_DTYPE)
+    
+    chunk = coerce_simulation_dtypes(chunk[KNOWN_COLUMNS])
+    return chunk, n_invalid
+
+def concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatena chunks conservando columnas categóricas
+    
+    Si un mismo campo llegó con categorías distintas en cada chunk, las
+    categorías se unen en lugar de degradar la columna a texto. Un chunk
+    cuyos valores caben en el catálogo trae su dtype ordenado y otro con un
+    valor nuevo uno inferido sin orden: la unión ignora el orden y el tipo
+    de la columna completa se vuelve a decidir con coerce_simulation_dtypes.
+    
+    Args:
+        chunks: Lista de DataFrames con el mismo esquema
+    
+    Returns:
+        DataFrame concatenado
+    """
+    if not chunks:
+        return coerce_simulation_dtypes(pd.DataFrame({column: [] for column in KNOWN_COLUMNS}))
+    
+    combined = pd.concat(chunks, ignore_index=True)
+    merged = [column for column in chunks[0].columns
+              if isinstance(chunks[0][column].dtype, pd.CategoricalDtype) and combined[column].dtype == object]
+    if merged:
+        for column in merged:
+            combined[column] = union_categoricals([chunk[column] for chunk in chunks], ignore_order=True)
+        coerced = coerce_simulation_dtypes(combined[merged])
+        for column in merged:
+            combined[column] = coerced[column]
+    return combined
+
+def conform_chunk(chunk: pd.DataFrame, dtypes: pd.Series) -> pd.DataFrame:
+    """
+    Ajusta un chunk preparado a los tipos de un DataFrame existente
+    
+    Las columnas categóricas toman el dtype existente si sus valores caben
+    en él; si no, conservan el suyo y concat_chunks une las categorías.
+    
+    Args:
+        chunk: DataFrame devuelto por prepare_chunk
+        dtypes: Tipos de las columnas del DataFrame existente
+    
+    Returns:
+        Chunk con las columnas y tipos del DataFrame existente
+    
+    Raises:
+        ValueError: Si faltan columnas o los tipos no se pueden combinar
+    """
+    missing = [column for column in dtypes.index if column not in chunk.columns]
+    if missing:
+        raise ValueError(f"Faltan columnas: {missing}")
+    
+    chunk = chunk[list(dtypes.index)].copy(deep=False)
+    for column, dtype in dtypes.items():
+        values = chunk[column]
+        if isinstance(dtype, pd.CategoricalDtype):
+            if values.dtype != dtype and values.dropna().isin(dtype.categories).all():
+                chunk[column] = values.astype(dtype)
+        elif values.dtype != dtype:
+            try:
+                chunk[column] = values.astype(dtype)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"La columna '{column}' no se puede convertir a {dtype}: {e}")
+    
+    # Misma concatenación que hará el almacén con los datos existentes
+    try:
+        concat_chunks([pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in dtypes.items()}), chunk])
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Los tipos del lote no se pueden combinar con el dataset: {e}")
+    return chunk
+
+def ingest_service_times(file_obj: BinaryIO, fmt: str, cutoff_date: Optional[str] = None,
+                         chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]:
+    """
+    Ingresa un archivo de tiempos de atención reales por chunks
+    
+    Args:
+        file_obj: Archivo binario abierto (CSV o Parquet)
+        fmt: 'csv' o 'parquet'
+        cutoff_date: Fecha de corte antes/después (ISO); si es None se usa la columna 'periodo'
+        chunk_rows: Filas por chunk
+    
+    Returns:
+        Tuple con (DataFrame antes, DataFrame después, reporte de ingesta)
+    """
+    cutoff = pd.Timestamp(cutoff_date) if cutoff_date else None
+    
+    before_chunks: List[pd.DataFrame] = []
+    after_chunks: List[pd.DataFrame] = []
+    rows_read = 0
+    rows_invalid = 0
+    n_chunks = 0
+    
+    for raw_chunk in iter_file_chunks(file_obj, fmt, chunk_rows):
+        n_chunks += 1
+        rows_read += len(raw_chunk)
+        
+        chunk, n_invalid = prepare_chunk(raw_chunk, cutoff)
+        rows_invalid += n_invalid
+        
+        is_before = (chunk['periodo'] == 'antes').to_numpy()
+        if is_before.any():
+            before_chunks.append(chunk[is_before])
+        if not is_before.all():
+            after_chunks.append(chunk[~is_before])
+    
+    df_before = concat_chunks(before_chunks)
+    df_after = concat_chunks(after_chunks)
+    
+    report = {
+        'formato': fmt,
+        'chunks': n_chunks,
+        'filas_leidas': rows_read,
+        'filas_descartadas': rows_invalid,
+        'filas_antes': len(df_before),
+        'filas_despues': len(df_after),
+        'fecha_corte': cutoff.strftime('%Y-%m-%d') if cutoff is not None else None
+    }
+    return df_before, df_after, report
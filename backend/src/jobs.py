@@ -0,0 +1,177 @@
+"""
+Cola de trabajos asíncronos para análisis Kaizen - Cafetería
+Ejecuta análisis pesados en segundo plano dentro del proceso de la API,
+con límite de trabajos concurrentes y consulta de estado/progreso
+"""
+
+import asyncio
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+JOB_STATUSES = ['queued', 'running', 'completed', 'failed']
+
+class JobNotFoundError(KeyError):
+    """El trabajo solicitado no existe (o ya fue descartado)"""
+
+class JobQueueFullError(RuntimeError):
+    """Hay demasiados trabajos esperando en estado 'queued'"""
+
+# Firma de la función de progreso que recibe cada trabajo: (fracción 0-1, etapa)
+ProgressCallback = Callable[[float, str], None]
+
+class JobManager:
+    """
+    Gestor de trabajos en segundo plano sin broker externo
+    
+    Cada trabajo es una tarea de asyncio independiente de la petición que lo
+    creó, por lo que sigue ejecutándose aunque el cliente se desconecte. Un
+    semáforo limita cuántos trabajos pesados corren a la vez; el resto espera
+    en estado 'queued', hasta max_queued (cada trabajo en cola retiene sus
+    propios datos). Se conservan los últimos max_jobs trabajos.
+    """
+    
+    def __init__(self, max_concurrent: int = 2, max_jobs: int = 500, max_queued: Optional[int] = None):
+        """
+        Args:
+            max_concurrent: Trabajos ejecutándose a la vez como máximo
+            max_jobs: Trabajos retenidos (los terminados más antiguos se descartan)
+            max_queued: Trabajos esperando turno como máximo (None = sin límite)
+        """
+        self.max_concurrent = max_concurrent
+        self.max_jobs = max_jobs
+        self.max_queued = max_queued
+        self._rejected = 0
+        self._jobs: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+    
+    def submit(self, kind: str, job_func: Callable[[ProgressCallback], Awaitable[Any]],
+               metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Encola un trabajo; debe llamarse desde el event loop
+        
+        Args:
+            kind: Tipo de trabajo (p. ej. 'analysis')
+            job_func: Corrutina que recibe la función de progreso y devuelve el resultado
+            metadata: Parámetros del trabajo a mostrar en su estado
+        
+        Returns:
+            ID del trabajo
+        
+        Raises:
+            JobQueueFullError: Si ya hay max_queued trabajos en cola
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            if self.max_queued is not None:
+                queued = sum(1 for job in self._jobs.values() if job['status'] == 'queued')
+                if queued >= self.max_queued:
+                    self._rejected += 1
+                    raise JobQueueFullError(
+                        f"Cola de trabajos llena ({queued}/{self.max_queued}). Intenta más tarde."
+                    )
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'kind': kind,
+                'status': 'queued',
+                'progress': 0.0,
+                'stage': 'en cola',
+                'metadata': metadata or {},
+                'error': None,
+                'result': None,
+                'created_at': datetime.now().isoformat(),
+                'started_at': None,
+                'finished_at': None
+            }
+            self._prune()
+        
+        task = asyncio.get_running_loop().create_task(self._run(job_id, job_func))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+        return job_id
+    
+    async def _run(self, job_id: str, job_func: Callable[[ProgressCallback], Awaitable[Any]]) -> None:
+        """Ejecuta un trabajo respetando el límite de concurrencia"""
+        def update_progress(progress: float, stage: str) -> None:
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is not None:
+                    job['progress'] = round(min(max(progress, 0.0), 1.0), 3)
+                    job['stage'] = stage
+        
+        async with self._semaphore:
+            self._update(job_id, status='running', stage='iniciando',
+                         started_at=datetime.now().isoformat())
+            try:
+                result = await job_func(update_progress)
+            except Exception as e:
+                self._update(job_id, status='failed', error=str(e), stage='error',
+                             finished_at=datetime.now().isoformat())
+            else:
+                self._update(job_id, status='completed', result=result, progress=1.0,
+                             stage='completado', finished_at=datetime.now().isoformat())
+    
+    def _update(self, job_id: str, **fields: Any) -> None:
+        """Actualiza campos de un trabajo si todavía existe"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+    
+    def _prune(self) -> None:
+        """Descarta los trabajos terminados más antiguos por encima de max_jobs"""
+        finished = [job_id for job_id, job in self._jobs.items()
+                    if job['status'] in ('completed', 'failed')]
+        while len(self._jobs) > self.max_jobs and finished:
+            del self._jobs[finished.pop(0)]
+    
+    def get(self, job_id: str) -> Dict[str, Any]:
+        """
+        Estado de un trabajo (sin el resultado)
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise JobNotFoundError(job_id)
+            return {key: value for key, value in job.items() if key != 'result'}
+    
+    def result(self, job_id: str) -> Any:
+        """
+        Resultado de un trabajo completado (None si aún no termina)
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise JobNotFoundError(job_id)
+            return job['result']
+    
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """
+        Estado de todos los trabajos retenidos, del más antiguo al más reciente
+        """
+        with self._lock:
+            return [{key: value for key, value in job.items() if key != 'result'}
+                    for job in self._jobs.values()]
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Conteo de trabajos por estado y configuración
+        """
+        with self._lock:
+            counts = {status: 0 for status in JOB_STATUSES}
+            for job in self._jobs.values():
+                counts[job['status']] += 1
+            return {
+                'max_concurrent': self.max_concurrent,
+                'max_jobs': self.max_jobs,
+                'max_queued': self.max_queued,
+                'rejected': self._rejected,
+                **counts
+            }
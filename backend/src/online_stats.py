@@ -0,0 +1,131 @@
+"""
+Estadísticas en línea para análisis Kaizen - Cafetería
+Momentos acumulados (n, media, M2) que se actualizan por lotes con la fórmula
+de combinación de Chan et al. (generalización de Welford), de modo que el
+t-test, Cohen's d y el impacto de negocio se actualizan en O(tamaño del lote)
+"""
+
+import numpy as np
+from typing import Dict, Any, Optional
+
+from src.statistical_analysis import (welch_ttest_from_stats, cohens_d_from_stats, business_impact_summary,
+                                      generate_executive_summary)
+
+class RunningMoments:
+    """
+    Suficientes estadísticos de una muestra: n, media, M2 (suma de cuadrados
+    de desviaciones a la media), mínimo y máximo
+
+    update() incorpora un lote: calcula sus momentos con NumPy (desviaciones
+    a la media del lote, numéricamente estable) y los combina con los
+    acumulados sin volver a recorrer los datos anteriores.
+    """
+
+    def __init__(self, n: int = 0, mean: float = 0.0, m2: float = 0.0,
+                 minimum: float = np.inf, maximum: float = -np.inf):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+        self.minimum = minimum
+        self.maximum = maximum
+
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> 'RunningMoments':
+        """Momentos de un array completo"""
+        moments = cls()
+        moments.update(values)
+        return moments
+
+    def update(self, values: np.ndarray) -> 'RunningMoments':
+        """
+        Incorpora un lote de observaciones
+
+        Args:
+            values: Observaciones nuevas
+
+        Returns:
+            self (para encadenar)
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return self
+        batch_mean = values.mean()
+        deviations = values - batch_mean
+        return self.merge(RunningMoments(
+            values.size, float(batch_mean), float(np.dot(deviations, deviations)),
+            float(values.min()), float(values.max())
+        ))
+
+    def merge(self, other: 'RunningMoments') -> 'RunningMoments':
+        """
+        Combina con los momentos de otra muestra (Chan et al., 1979)
+
+        Returns:
+            self (para encadenar)
+        """
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.m2 = other.n, other.mean, other.m2
+            self.minimum, self.maximum = other.minimum, other.maximum
+            return self
+
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        return self
+
+    def copy(self) -> 'RunningMoments':
+        """Copia independiente"""
+        return RunningMoments(self.n, self.mean, self.m2, self.minimum, self.maximum)
+
+    def to_stats(self) -> Dict[str, Any]:
+        """
+        Momentos con las mismas claves que descriptive.moments() (más min/max)
+        """
+        if self.n == 0:
+            return {'n': 0, 'media': np.nan, 'var': np.nan, 'std': np.nan, 'min': np.nan, 'max': np.nan}
+        var = self.m2 / (self.n - 1) if self.n > 1 else np.nan
+        return {
+            'n': int(self.n),
+            'media': float(self.mean),
+            'var': float(var),
+            'std': float(np.sqrt(var)),
+            'min': float(self.minimum),
+            'max': float(self.maximum)
+        }
+
+def online_analysis(before: RunningMoments, after: RunningMoments, alpha: float = 0.05,
+                    descriptive: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Welch t-test, Cohen's d e impacto de negocio a partir de momentos
+    acumulados, en O(1)
+
+    Args:
+        before: Momentos del período antes
+        after: Momentos del período después
+        alpha: Nivel de significancia
+        descriptive: Estadísticas completas (con cuantiles) si ya se calcularon;
+            por defecto solo momentos, mínimo y máximo
+
+    Returns:
+        Diccionario con las mismas secciones que comprehensive_analysis para
+        estas pruebas
+    """
+    before_stats, after_stats = before.to_stats(), after.to_stats()
+    ttest_results = welch_ttest_from_stats(before_stats, after_stats, alpha)
+    cohens_results = cohens_d_from_stats(before_stats, after_stats)
+    business_impact = business_impact_summary(
+        before_stats['media'], after_stats['media'], ttest_results, cohens_results, alpha
+    )
+    return {
+        'estadisticas_descriptivas': descriptive or {'antes': before_stats, 'despues': after_stats},
+        'welch_ttest': ttest_results,
+        'cohens_d': cohens_results,
+        'impacto_negocio': business_impact,
+        'resumen_ejecutivo': generate_executive_summary(business_impact, ttest_results, cohens_results)
+    }
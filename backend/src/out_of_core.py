@@ -0,0 +1,318 @@
+"""
+Análisis fuera de memoria para proyecto Kaizen - Cafetería
+comprehensive_analysis sobre un archivo (CSV, Parquet o Feather) más grande
+que la RAM, leyendo por chunks solo las columnas periodo y tiempo en dos
+pasadas:
+
+1. Momentos combinables (Welch t-test, Cohen's d), un sketch de cuantiles
+   fino que ubica cada cuartil en un bucket estrecho y una muestra uniforme
+   (reservorio) para los tests de normalidad
+2. Valores exactos de los cuartiles (solo se guardan los que caen en sus
+   buckets) y sumas separadas bajo y sobre la mediana, de las que sale
+   Levene centrado en la mediana exacta
+
+La memoria depende del tamaño de chunk y de la muestra, no del archivo.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Dict, Any, Iterator, List, Tuple, Union, BinaryIO
+
+from src.descriptive import DEFAULT_QUANTILES
+from src.ingest import DEFAULT_CHUNK_ROWS
+from src.online_stats import RunningMoments
+from src.quantile_sketch import QuantileSketch
+from src.statistical_analysis import (welch_ttest_from_stats, cohens_d_from_stats, levene_from_deviations,
+                                      normality_tests, business_impact_summary, generate_executive_summary)
+
+# Columnas leídas del archivo
+OUT_OF_CORE_COLUMNS = ['periodo', 'tiempo_atencion_min']
+
+OUT_OF_CORE_FORMATS = ['csv', 'parquet', 'feather']
+
+# Error relativo del sketch que ubica los cuartiles: buckets de ~0.02% del
+# valor, así la segunda pasada guarda muy pocos candidatos por cuartil
+LOCATOR_ACCURACY = 1e-4
+
+# Observaciones por período para Shapiro-Wilk / Anderson-Darling (con menos
+# observaciones se usan todas y el resultado es el mismo que en memoria)
+NORMALITY_SAMPLE_SIZE = 100_000
+
+def iter_period_times(source: Union[str, BinaryIO], fmt: str,
+                      chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[Tuple[np.ndarray, np.ndarray, int]]:
+    """
+    Lee los tiempos de atención de un archivo por chunks, separados por período
+
+    Se descartan (y cuentan) las filas con tiempo no numérico o no positivo y
+    las de período distinto de 'antes'/'despues', como en la ingesta.
+
+    Args:
+        source: Ruta o archivo binario abierto (posicionado al inicio)
+        fmt: 'csv', 'parquet' o 'feather'
+        chunk_rows: Filas por chunk
+
+    Yields:
+        Tuple con (tiempos antes, tiempos después, filas descartadas) de cada chunk
+    """
+    if fmt == 'csv':
+        reader = pd.read_csv(source, chunksize=chunk_rows, usecols=lambda column: column in OUT_OF_CORE_COLUMNS,
+                             dtype={'periodo': 'category'})
+        with reader:
+            for chunk in reader:
+                yield split_periods(chunk)
+    elif fmt == 'parquet':
+        parquet_file = pq.ParquetFile(source)
+        check_columns(parquet_file.schema_arrow.names)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=OUT_OF_CORE_COLUMNS):
+            yield split_periods(batch.to_pandas())
+    elif fmt == 'feather':
+        reader = pa.ipc.open_file(pa.memory_map(source) if isinstance(source, str) else source)
+        check_columns(reader.schema.names)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i).select(OUT_OF_CORE_COLUMNS)
+            for start in range(0, batch.num_rows, chunk_rows):
+                yield split_periods(batch.slice(start, chunk_rows).to_pandas())
+    else:
+        raise ValueError(f"Formato '{fmt}' no soportado. Disponibles: {OUT_OF_CORE_FORMATS}")
+
+def check_columns(columns: List[str]) -> None:
+    """
+    Raises:
+        ValueError: Si faltan las columnas periodo o tiempo_atencion_min
+    """
+    missing = [column for column in OUT_OF_CORE_COLUMNS if column not in columns]
+    if missing:
+        raise ValueError(f"Faltan columnas requeridas para el análisis fuera de memoria: {missing}")
+
+def split_periods(chunk: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Tiempos válidos de cada período de un chunk y filas descartadas
+    """
+    check_columns(list(chunk.columns))
+    times = pd.to_numeric(chunk['tiempo_atencion_min'], errors='coerce').to_numpy(dtype=np.float64)
+    before = (chunk['periodo'] == 'antes').to_numpy(dtype=bool)
+    after = (chunk['periodo'] == 'despues').to_numpy(dtype=bool)
+    valid = times > 0
+    before &= valid
+    after &= valid
+    n_invalid = len(chunk) - int(before.sum()) - int(after.sum())
+    return times[before], times[after], n_invalid
+
+class PeriodScan:
+    """
+    Primera pasada de un período: momentos, sketch de ubicación y muestra
+    uniforme
+
+    La muestra se toma con prioridades aleatorias (se conservan los
+    NORMALITY_SAMPLE_SIZE valores con menor prioridad), que da una muestra
+    uniforme sin reemplazo en O(tamaño del chunk) por chunk.
+    """
+
+    def __init__(self, rng: np.random.Generator, sample_size: int = NORMALITY_SAMPLE_SIZE):
+        """
+        Args:
+            rng: Generador propio del período (la muestra no depende del tamaño de chunk)
+            sample_size: Observaciones de la muestra para normalidad
+        """
+        self.moments = RunningMoments()
+        self.sketch = QuantileSketch(LOCATOR_ACCURACY)
+        self.rng = rng
+        self.sample_size = sample_size
+        self.sample = np.empty(0)
+        self._priorities = np.empty(0)
+
+    def update(self, values: np.ndarray) -> None:
+        """Incorpora un chunk del período"""
+        if values.size == 0:
+            return
+        self.moments.update(values)
+        self.sketch.update(values)
+        sample = np.concatenate([self.sample, values])
+        priorities = np.concatenate([self._priorities, self.rng.random(values.size)])
+        if sample.size > self.sample_size:
+            keep = np.argpartition(priorities, self.sample_size - 1)[:self.sample_size]
+            sample, priorities = sample[keep], priorities[keep]
+        self.sample, self._priorities = sample, priorities
+
+class QuartileRefinement:
+    """
+    Segunda pasada de un período: cuartiles exactos y sumas para Levene
+
+    Cada posición que necesitan los cuantiles (interpolación lineal como
+    np.percentile) cae en un bucket conocido del sketch de la primera pasada;
+    de cada bucket se guardan solo sus valores distintos con su conteo. Los
+    valores fuera del rango de la mediana quedan, sin conocerla aún, bajo o
+    sobre ella: sus conteos y sumas (centradas en un pivote) bastan para
+    sumar |x - mediana| al final.
+    """
+
+    def __init__(self, scan: PeriodScan, quantiles: Dict[str, float] = DEFAULT_QUANTILES):
+        self.scan = scan
+        n = scan.moments.n
+        self.positions = np.asarray(list(quantiles.values()), dtype=np.float64) * (n - 1)
+        self.lower = np.floor(self.positions).astype(np.int64)
+        self.upper = np.minimum(self.lower + 1, n - 1)
+        ranks = np.concatenate([self.lower, self.upper])
+        rank_keys, below = scan.sketch.rank_keys(ranks)
+        self.rank_keys = dict(zip(ranks.tolist(), rank_keys.tolist()))
+        self.rank_below = dict(zip(ranks.tolist(), below.tolist()))
+        self.candidate_keys = np.unique(rank_keys)
+        self._candidates: List[Tuple[np.ndarray, np.ndarray]] = []
+
+        median = list(quantiles).index('mediana')
+        self.median_range = (self.rank_keys[int(self.lower[median])], self.rank_keys[int(self.upper[median])])
+        self.pivot = float(scan.sketch.quantiles([0.5])[0])
+        self.n_below = self.n_above = 0
+        self.sum_below = self.sum_above = 0.0
+
+    def update(self, values: np.ndarray) -> None:
+        """Incorpora un chunk del período (segunda lectura)"""
+        if values.size == 0:
+            return
+        keys = self.scan.sketch.bucket_keys(values)
+        is_candidate = np.isin(keys, self.candidate_keys)
+        if is_candidate.any():
+            self._candidates.append(np.unique(values[is_candidate], return_counts=True))
+
+        below = keys < self.median_range[0]
+        above = keys > self.median_range[1]
+        self.n_below += int(below.sum())
+        self.n_above += int(above.sum())
+        self.sum_below += float((values[below] - self.pivot).sum())
+        self.sum_above += float((values[above] - self.pivot).sum())
+
+    def candidates(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Valores candidatos distintos (ordenados) y su conteo"""
+        if not self._candidates:
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        values = np.concatenate([values for values, _ in self._candidates])
+        counts = np.concatenate([counts for _, counts in self._candidates])
+        unique, inverse = np.unique(values, return_inverse=True)
+        self._candidates = [(unique, np.bincount(inverse, weights=counts).astype(np.int64))]
+        return self._candidates[0]
+
+    def rank_value(self, rank: int, values: np.ndarray, counts: np.ndarray, keys: np.ndarray) -> float:
+        """Valor exacto de una posición a partir de los candidatos de su bucket"""
+        if rank == 0:
+            return self.scan.moments.minimum
+        if rank == self.scan.moments.n - 1:
+            return self.scan.moments.maximum
+        in_bucket = keys == self.rank_keys[rank]
+        cumulative = np.cumsum(counts[in_bucket])
+        return float(values[in_bucket][np.searchsorted(cumulative, rank - self.rank_below[rank], side='right')])
+
+    def quantile_values(self) -> np.ndarray:
+        """Cuantiles exactos, con la misma aritmética que order_statistics"""
+        values, counts = self.candidates()
+        keys = self.scan.sketch.bucket_keys(values) if values.size else np.empty(0, dtype=np.int64)
+        low = np.array([self.rank_value(int(rank), values, counts, keys) for rank in self.lower])
+        high = np.array([self.rank_value(int(rank), values, counts, keys) for rank in self.upper])
+        return low + (high - low) * (self.positions - self.lower)
+
+    def median_deviations(self, median: float) -> Tuple[float, float]:
+        """
+        Media de |x - mediana| y su suma de cuadrados dentro del grupo
+
+        Σ (x - mediana)² sale de los momentos de la primera pasada.
+        """
+        moments = self.scan.moments
+        shift = median - self.pivot
+        total = (self.n_below * shift - self.sum_below) + (self.sum_above - self.n_above * shift)
+        values, counts = self.candidates()
+        middle_keys = self.scan.sketch.bucket_keys(values) if values.size else np.empty(0, dtype=np.int64)
+        middle = (middle_keys >= self.median_range[0]) & (middle_keys <= self.median_range[1])
+        total += float(np.dot(np.abs(values[middle] - median), counts[middle]))
+
+        mean = total / moments.n
+        squares = moments.m2 + moments.n * (moments.mean - median)**2
+        return mean, max(squares - moments.n * mean * mean, 0.0)
+
+def out_of_core_analysis(source: Union[str, BinaryIO], fmt: str, alpha: float = 0.05,
+                         chunk_rows: int = DEFAULT_CHUNK_ROWS, seed: int = 0,
+                         sample_size: int = NORMALITY_SAMPLE_SIZE) -> Dict[str, Any]:
+    """
+    Resultados de comprehensive_analysis leyendo el archivo por chunks
+
+    Descriptivas, Welch t-test, Cohen's d, Levene, impacto de negocio y
+    resumen ejecutivo coinciden con comprehensive_analysis sobre los datos en
+    memoria (mismos cuartiles exactos; diferencias de redondeo < 1e-10). Los
+    tests de normalidad usan una muestra uniforme de sample_size observaciones
+    por período (todos los datos si hay menos).
+
+    Args:
+        source: Ruta o archivo binario abierto (se lee dos veces)
+        fmt: 'csv', 'parquet' o 'feather'
+        alpha: Nivel de significancia
+        chunk_rows: Filas por chunk
+        seed: Semilla de la muestra para normalidad
+        sample_size: Observaciones por período para los tests de normalidad
+
+    Returns:
+        Diccionario con las secciones de comprehensive_analysis más
+        'fuera_de_memoria' (chunks, filas leídas/descartadas y muestra usada)
+
+    Raises:
+        ValueError: Si faltan columnas o algún período tiene menos de 2 observaciones
+    """
+    scans = tuple(PeriodScan(np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(period,))), sample_size)
+                  for period in range(2))
+    n_chunks = rows_invalid = 0
+    for before, after, n_invalid in _read(source, fmt, chunk_rows):
+        n_chunks += 1
+        rows_invalid += n_invalid
+        scans[0].update(before)
+        scans[1].update(after)
+    if min(scan.moments.n for scan in scans) < 2:
+        raise ValueError("Cada período necesita al menos 2 observaciones válidas")
+
+    refinements = (QuartileRefinement(scans[0]), QuartileRefinement(scans[1]))
+    for before, after, _ in _read(source, fmt, chunk_rows):
+        refinements[0].update(before)
+        refinements[1].update(after)
+
+    descriptive = []
+    for scan, refinement in zip(scans, refinements):
+        period_stats = scan.moments.to_stats()
+        period_stats.update(zip(DEFAULT_QUANTILES, refinement.quantile_values().tolist()))
+        period_stats['iqr'] = period_stats['q75'] - period_stats['q25']
+        descriptive.append(period_stats)
+    before_stats, after_stats = descriptive
+
+    ttest_results = welch_ttest_from_stats(before_stats, after_stats, alpha)
+    cohens_results = cohens_d_from_stats(before_stats, after_stats)
+    deviations = [refinement.median_deviations(period_stats['mediana'])
+                  for refinement, period_stats in zip(refinements, descriptive)]
+    levene_test = levene_from_deviations([scan.moments.n for scan in scans],
+                                         [mean for mean, _ in deviations],
+                                         sum(within for _, within in deviations))
+    business_impact = business_impact_summary(
+        before_stats['media'], after_stats['media'], ttest_results, cohens_results, alpha
+    )
+
+    return {
+        'estadisticas_descriptivas': {'antes': before_stats, 'despues': after_stats},
+        'welch_ttest': ttest_results,
+        'cohens_d': cohens_results,
+        'normalidad': normality_tests(scans[0].sample, scans[1].sample),
+        'levene_test': {'statistic': levene_test[0], 'p_value': levene_test[1]},
+        'impacto_negocio': business_impact,
+        'resumen_ejecutivo': generate_executive_summary(business_impact, ttest_results, cohens_results),
+        'fuera_de_memoria': {
+            'formato': fmt,
+            'chunks': n_chunks,
+            'filas_por_chunk': chunk_rows,
+            'filas_leidas': int(scans[0].moments.n + scans[1].moments.n + rows_invalid),
+            'filas_descartadas': rows_invalid,
+            'pasadas': 2,
+            'muestra_normalidad': {'antes': int(scans[0].sample.size), 'despues': int(scans[1].sample.size)},
+            'candidatos_cuartiles': int(sum(refinement.candidates()[0].size for refinement in refinements))
+        }
+    }
+
+def _read(source: Union[str, BinaryIO], fmt: str, chunk_rows: int) -> Iterator[Tuple[np.ndarray, np.ndarray, int]]:
+    """Una lectura completa del archivo (rebobina los archivos abiertos)"""
+    if not isinstance(source, str):
+        source.seek(0)
+    return iter_period_times(source, fmt, chunk_rows)
@@ -0,0 +1,135 @@
+"""
+Persistencia columnar de datos simulados para análisis Kaizen - Cafetería
+Guarda y carga datasets en CSV, Parquet y Arrow IPC (Feather)
+"""
+
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from typing import Tuple, Dict, Optional
+
+from src.generate_data import save_simulation_to_csv, load_simulation_from_csv, coerce_simulation_dtypes
+
+# Formatos soportados: extensión y media type para descargas
+STORAGE_FORMATS: Dict[str, Dict[str, str]] = {
+    'csv': {'extension': '.csv', 'media_type': 'text/csv'},
+    'parquet': {'extension': '.parquet', 'media_type': 'application/vnd.apache.parquet'},
+    'feather': {'extension': '.feather', 'media_type': 'application/vnd.apache.arrow.file'}
+}
+
+# Compresión por defecto: Parquet comprime con zstd; Feather se guarda sin
+# comprimir para poder leerlo con memory-map sin copiar los buffers
+DEFAULT_COMPRESSION = {
+    'parquet': 'zstd',
+    'feather': 'uncompressed'
+}
+
+def storage_path(base_path: str, fmt: str) -> str:
+    """
+    Construye la ruta de un dataset para un formato dado
+    
+    Args:
+        base_path: Ruta sin extensión (p. ej. 'reports/simulation_data')
+        fmt: Formato ('csv', 'parquet' o 'feather')
+    
+    Returns:
+        Ruta con la extensión del formato
+    """
+    if fmt not in STORAGE_FORMATS:
+        raise ValueError(f"Formato '{fmt}' no soportado. Disponibles: {list(STORAGE_FORMATS.keys())}")
+    return base_path + STORAGE_FORMATS[fmt]['extension']
+
+def _infer_format(path: str) -> str:
+    """Deduce el formato a partir de la extensión del archivo"""
+    extension = os.path.splitext(path)[1].lower()
+    for fmt, info in STORAGE_FORMATS.items():
+        if info['extension'] == extension:
+            return fmt
+    raise ValueError(f"No se puede deducir el formato de '{path}'")
+
+def save_simulation_data(df_before: pd.DataFrame, df_after: pd.DataFrame,
+                         output_path: str, fmt: Optional[str] = None,
+                         compression: Optional[str] = None) -> str:
+    """
+    Guarda los datos simulados en el formato indicado
+    
+    En Parquet y Feather cada periodo se escribe como un bloque (row group o
+    record batch) propio, sin concatenar ambos DataFrames en memoria. Las
+    columnas categóricas se guardan con codificación de diccionario.
+    
+    Args:
+        df_before: DataFrame con datos antes
+        df_after: DataFrame con datos después
+        output_path: Ruta del archivo de salida
+        fmt: Formato ('csv', 'parquet', 'feather'); por defecto según extensión
+        compression: Códec de compresión (por defecto DEFAULT_COMPRESSION)
+    
+    Returns:
+        Ruta del archivo guardado
+    """
+    fmt = fmt or _infer_format(output_path)
+    
+    if fmt == 'csv':
+        return save_simulation_to_csv(df_before, df_after, output_path)
+    
+    if fmt not in STORAGE_FORMATS:
+        raise ValueError(f"Formato '{fmt}' no soportado. Disponibles: {list(STORAGE_FORMATS.keys())}")
+    
+    compression = compression or DEFAULT_COMPRESSION[fmt]
+    table_before = pa.Table.from_pandas(df_before, preserve_index=False)
+    table_after = pa.Table.from_pandas(df_after, preserve_index=False)
+    
+    if fmt == 'parquet':
+        with pq.ParquetWriter(output_path, table_before.schema, compression=compression) as writer:
+            writer.write_table(table_before)
+            writer.write_table(table_after)
+    else:
+        options = pa.ipc.IpcWriteOptions(
+            compression=None if compression == 'uncompressed' else compression
+        )
+        with pa.OSFile(output_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table_before.schema, options=options) as writer:
+                writer.write_table(table_before)
+                writer.write_table(table_after)
+    
+    return output_path
+
+def load_simulation_data(input_path: str, fmt: Optional[str] = None,
+                         memory_map: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Carga un dataset guardado con save_simulation_data
+    
+    Parquet y Feather se abren con memory-map, por lo que no se parsea texto
+    ni se lee el archivo completo a un buffer intermedio. Cada período se
+    filtra sobre la tabla Arrow antes de convertirlo, así cada fila se
+    materializa en pandas una sola vez (no un DataFrame completo más las
+    copias de cada período).
+    
+    Args:
+        input_path: Ruta del archivo
+        fmt: Formato ('csv', 'parquet', 'feather'); por defecto según extensión
+        memory_map: Abrir el archivo con memory-map (Parquet/Feather)
+    
+    Returns:
+        Tuple con DataFrames (antes, después)
+    """
+    fmt = fmt or _infer_format(input_path)
+    
+    if fmt == 'csv':
+        return load_simulation_from_csv(input_path)
+    
+    if fmt == 'parquet':
+        table = pq.read_table(input_path, memory_map=memory_map)
+    elif fmt == 'feather':
+        table = feather.read_table(input_path, memory_map=memory_map)
+    else:
+        raise ValueError(f"Formato '{fmt}' no soportado. Disponibles: {list(STORAGE_FORMATS.keys())}")
+    
+    df_before, df_after = (
+        coerce_simulation_dtypes(table.filter(pc.equal(table['periodo'], period)).to_pandas())
+        for period in ('antes', 'despues')
+    )
+    return df_before, df_after
@@ -0,0 +1,253 @@
+"""
+Análisis de potencia para proyecto Kaizen - Cafetería
+Simulación Monte Carlo del tamaño de muestra necesario para detectar una
+reducción del tiempo de atención con el Welch t-test: las réplicas de cada
+tamaño se generan como matrices (réplica × n) con el mismo modelo que
+generate_simulation_data y se testean todas a la vez
+"""
+
+import numpy as np
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from src.generate_data import TIEMPO_MINIMO_MIN
+from src.resampling import DEFAULT_MEMORY_BYTES, new_seed
+from src.segments import welch_statistics
+
+# Tamaños por período (antes) evaluados por defecto
+DEFAULT_N_GRID = [10, 20, 30, 50, 75, 100, 150, 200, 300, 500]
+
+# Reducciones porcentuales evaluadas por defecto (además de la pedida)
+DEFAULT_REDUCTIONS = [5.0, 10.0, 15.0, 20.0, 25.0, 30.0]
+
+DEFAULT_REPLICATES = 2000
+DEFAULT_TARGET_POWER = 0.8
+
+# Límites aceptados por la API
+MAX_REPLICATES = 20_000
+MAX_GRID_POINTS = 40
+MAX_REDUCTIONS = 20
+MAX_N = 100_000
+
+# Observaciones normales simuladas como máximo por petición
+# (réplicas × suma de n_antes + n_despues de la grilla)
+MAX_SIMULATED_VALUES = 1_000_000_000
+
+def simulated_times(z: np.ndarray, mean: float, std: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Tiempos de atención a partir de normales estándar, igual que
+    _generate_block: normal(mean, std) truncada en el mínimo y redondeada
+
+    Args:
+        z: Normales estándar
+        mean: Media
+        std: Desviación estándar
+        out: Array donde escribir el resultado (puede ser z)
+    """
+    times = np.multiply(z, std, out=out)
+    times += mean
+    np.maximum(times, TIEMPO_MINIMO_MIN, out=times)
+    return np.round(times, 2, out=times)
+
+def row_moments(times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Media y varianza muestral (ddof=1) de cada fila; times se sobrescribe
+
+    Como grouped_moments y ragged_moments, la varianza usa desviaciones a
+    la media de la fila.
+    """
+    n = times.shape[1]
+    means = times.sum(axis=1) / n
+    times -= means[:, None]
+    return means, np.square(times, out=times).sum(axis=1) / (n - 1)
+
+def nominal_cohens_d(before_mean: float, after_mean: float, before_std: float, after_std: float) -> float:
+    """Cohen's d de los parámetros (sin truncamiento), con la desviación combinada"""
+    return (before_mean - after_mean) / np.sqrt((before_std**2 + after_std**2) / 2)
+
+def power_row(before_mean: float, before_std: float, after_std: float,
+              n_before: int, n_after: int, reductions: Sequence[float],
+              n_replicates: int, seed: int, alpha: float = 0.05,
+              memory_bytes: int = DEFAULT_MEMORY_BYTES) -> np.ndarray:
+    """
+    Rechazos del Welch t-test para un tamaño de muestra y varias reducciones
+
+    Las normales de cada período se generan una vez por lote y se reutilizan
+    para todas las reducciones (números aleatorios comunes: curvas suaves y
+    una sola generación por tamaño). Cada período tiene un flujo propio
+    derivado de (seed, n_antes, n_despues), así que el resultado no depende
+    del lote, del orden ni del proceso en que se calcule cada tamaño.
+
+    Args:
+        before_mean: Media del período antes
+        before_std: Desviación estándar antes
+        after_std: Desviación estándar después
+        n_before: Observaciones por réplica antes
+        n_after: Observaciones por réplica después
+        reductions: Reducciones porcentuales de la media a evaluar
+        n_replicates: Réplicas simuladas
+        seed: Semilla
+        alpha: Nivel de significancia
+        memory_bytes: Memoria máxima de cada lote de réplicas
+
+    Returns:
+        Array con el número de réplicas significativas por reducción
+    """
+    rng_before = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(n_before, n_after, 0)))
+    rng_after = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(n_before, n_after, 1)))
+    after_means = [before_mean * (1 - reduction / 100) for reduction in reductions]
+
+    # Normales de ambos períodos + tiempos después de una reducción
+    batch = max(1, memory_bytes // (8 * (n_before + 2 * n_after)))
+
+    rejections = np.zeros(len(reductions), dtype=np.int64)
+    for start in range(0, n_replicates, batch):
+        rows = min(batch, n_replicates - start)
+        z_before = rng_before.standard_normal((rows, n_before))
+        mean_before, var_before = row_moments(simulated_times(z_before, before_mean, before_std, out=z_before))
+        z_after = rng_after.standard_normal((rows, n_after))
+        times_after = np.empty_like(z_after)
+        for i, after_mean in enumerate(after_means):
+            mean_after, var_after = row_moments(simulated_times(z_after, after_mean, after_std, out=times_after))
+            p_values = welch_statistics(n_before, mean_before, var_before, n_after, mean_after, var_after)['p_value']
+            rejections[i] += int((p_values < alpha).sum())
+    return rejections
+
+def sample_size_grid(n_grid: Sequence[int], n_before: int, n_after: int) -> List[Tuple[int, int]]:
+    """
+    Pares (n_antes, n_despues) de la grilla, manteniendo la proporción
+    n_despues / n_antes de la simulación
+    """
+    ratio = n_after / n_before
+    return [(int(n), max(2, int(round(n * ratio)))) for n in sorted(set(n_grid))]
+
+def validate_power_params(grid: Sequence[Tuple[int, int]], reductions: Sequence[float],
+                          n_replicates: int, alpha: float, target_power: float) -> None:
+    """
+    Valida la grilla y los parámetros de un análisis de potencia
+
+    Raises:
+        ValueError: Si algún parámetro está fuera de rango o el trabajo es excesivo
+    """
+    if not grid or len(grid) > MAX_GRID_POINTS:
+        raise ValueError(f"La grilla debe tener entre 1 y {MAX_GRID_POINTS} tamaños de muestra")
+    if any(n_before < 2 or n_before > MAX_N or n_after > MAX_N for n_before, n_after in grid):
+        raise ValueError(f"Los tamaños de muestra deben estar entre 2 y {MAX_N:,}")
+    if not reductions or len(reductions) > MAX_REDUCTIONS:
+        raise ValueError(f"Indica entre 1 y {MAX_REDUCTIONS} reducciones")
+    if any(not 0 <= reduction < 100 for reduction in reductions):
+        raise ValueError("Las reducciones porcentuales deben estar en [0, 100)")
+    if not 1 <= n_replicates <= MAX_REPLICATES:
+        raise ValueError(f"n_replicates debe estar entre 1 y {MAX_REPLICATES:,}")
+    if not 0 < alpha < 1 or not 0 < target_power < 1:
+        raise ValueError("alpha y target_power deben estar entre 0 y 1")
+    simulated = n_replicates * sum(n_before + n_after for n_before, n_after in grid)
+    if simulated > MAX_SIMULATED_VALUES:
+        raise ValueError(f"Demasiadas observaciones simuladas ({simulated:,}); el máximo es "
+                         f"{MAX_SIMULATED_VALUES:,}. Reduce n_replicates o la grilla.")
+
+def summarize_power(params: Dict[str, Any], grid: Sequence[Tuple[int, int]], reductions: Sequence[float],
+                    rejections: np.ndarray, n_replicates: int, seed: int, alpha: float = 0.05,
+                    target_power: float = DEFAULT_TARGET_POWER) -> Dict[str, Any]:
+    """
+    Curvas de potencia y tamaño mínimo por reducción
+
+    Args:
+        params: Medias y desviaciones de la simulación
+        grid: Pares (n_antes, n_despues) evaluados
+        reductions: Reducciones porcentuales evaluadas
+        rejections: Matriz (tamaño × reducción) de réplicas significativas
+        n_replicates: Réplicas por celda
+        seed: Semilla usada
+        alpha: Nivel de significancia
+        target_power: Potencia buscada para el tamaño mínimo
+
+    Returns:
+        Diccionario con una curva por reducción (potencia y error estándar
+        Monte Carlo por tamaño) y el menor tamaño de la grilla que alcanza
+        target_power
+    """
+    power = rejections / n_replicates
+    standard_error = np.sqrt(power * (1 - power) / n_replicates)
+
+    effects = []
+    for j, reduction in enumerate(reductions):
+        after_mean = params['before_mean'] * (1 - reduction / 100)
+        reached = np.flatnonzero(power[:, j] >= target_power)
+        minimum = ({'n_antes': grid[reached[0]][0], 'n_despues': grid[reached[0]][1]}
+                   if reached.size else None)
+        effects.append({
+            'reduccion_porcentual': float(reduction),
+            'media_despues': round(after_mean, 4),
+            'cohens_d': round(float(nominal_cohens_d(params['before_mean'], after_mean,
+                                                     params['before_std'], params['after_std'])), 4),
+            'n_minimo': minimum,
+            'curva': [
+                {'n_antes': n_before, 'n_despues': n_after,
+                 'potencia': float(power[i, j]), 'error_estandar': float(standard_error[i, j])}
+                for i, (n_before, n_after) in enumerate(grid)
+            ]
+        })
+
+    return {
+        'parametros': params,
+        'n_replicas': n_replicates,
+        'seed': seed,
+        'alpha': alpha,
+        'potencia_objetivo': target_power,
+        'prueba': 'Welch t-test bilateral',
+        'efectos': effects
+    }
+
+def power_grid(before_mean: float, after_mean: float, n_before: int, n_after: int,
+               n_grid: Optional[Sequence[int]] = None,
+               reductions: Optional[Sequence[float]] = None) -> Tuple[List[Tuple[int, int]], List[float]]:
+    """
+    Grilla de tamaños y reducciones, con los valores por defecto
+
+    Returns:
+        Tuple con (pares (n_antes, n_despues), reducciones ordenadas)
+    """
+    if n_before < 1 or n_after < 1:
+        raise ValueError("n_before y n_after deben ser mayores que 0")
+    if reductions is None:
+        requested = round((before_mean - after_mean) / before_mean * 100, 2)
+        reductions = DEFAULT_REDUCTIONS + ([requested] if 0 <= requested < 100 else [])
+    grid = sample_size_grid(n_grid or DEFAULT_N_GRID, n_before, n_after)
+    return grid, sorted(set(float(reduction) for reduction in reductions))
+
+def power_analysis(before_mean: float = 8.5, after_mean: float = 6.2, before_std: float = 2.1,
+                   after_std: float = 1.5, n_before: int = 100, n_after: int = 100,
+                   n_grid: Optional[Sequence[int]] = None, reductions: Optional[Sequence[float]] = None,
+                   n_replicates: int = DEFAULT_REPLICATES, alpha: float = 0.05,
+                   target_power: float = DEFAULT_TARGET_POWER, seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Análisis de potencia completo en el proceso actual (mismo resultado que
+    repartir los tamaños de la grilla con power_row)
+
+    Args:
+        before_mean, after_mean, before_std, after_std: Parámetros de la
+            simulación (como en generate_simulation_data)
+        n_before, n_after: Tamaños de la simulación (definen la proporción
+            entre períodos de la grilla)
+        n_grid: Tamaños del período antes a evaluar (default DEFAULT_N_GRID)
+        reductions: Reducciones porcentuales (default DEFAULT_REDUCTIONS más
+            la de before_mean -> after_mean)
+        n_replicates: Réplicas por celda
+        alpha: Nivel de significancia
+        target_power: Potencia buscada
+        seed: Semilla (None = aleatoria, se informa en el resultado)
+
+    Returns:
+        Diccionario de summarize_power
+    """
+    grid, reductions = power_grid(before_mean, after_mean, n_before, n_after, n_grid, reductions)
+    validate_power_params(grid, reductions, n_replicates, alpha, target_power)
+    seed = new_seed() if seed is None else seed
+
+    rejections = np.array([
+        power_row(before_mean, before_std, after_std, n_b, n_a, reductions, n_replicates, seed, alpha)
+        for n_b, n_a in grid
+    ])
+    params = {'before_mean': before_mean, 'after_mean': after_mean,
+              'before_std': before_std, 'after_std': after_std}
+    return summarize_power(params, grid, reductions, rejections, n_replicates, seed, alpha, target_power)
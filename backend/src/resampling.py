@@ -0,0 +1,305 @@
+"""
+Remuestreo para análisis Kaizen - Cafetería
+Intervalos bootstrap (diferencia de medias, de medianas y Cohen's d),
+vectorizados por lotes con memoria acotada, y test de permutación, ambos
+divisibles en bloques independientes para repartirlos entre workers
+"""
+
+import math
+import os
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple
+
+# Remuestras por bloque; cada bloque tiene su propio flujo aleatorio, así el
+# resultado no depende de cuántos workers se usen ni del presupuesto de memoria
+BLOCK_RESAMPLES = 1000
+
+# Memoria máxima (bytes) de cada lote vectorizado de remuestras bootstrap
+DEFAULT_MEMORY_BYTES = int(os.getenv("KAIZEN_RESAMPLING_MEMORY_BYTES", str(256 * 1024**2)))
+
+# Filas máximas (ambos períodos) por remuestra; por encima se usa bootstrap
+# m-de-n reescalado y el test de permutación se hace sobre una submuestra
+DEFAULT_MAX_ROWS = int(os.getenv("KAIZEN_RESAMPLING_MAX_ROWS", "50000"))
+
+# Memoria (bytes) de cada sub-bloque de permutaciones: del tamaño de la
+# caché L2 para que barajar filas no quede limitado por el ancho de banda
+PERMUTATION_BATCH_BYTES = 1024**2
+
+# Máximo de remuestras aceptadas por la API
+MAX_RESAMPLES = 100_000
+
+# Claves de spawn de SeedSequence para cada procedimiento
+_BOOTSTRAP_KEY = 0
+_PERMUTATION_KEY = 1
+
+def n_blocks(n_resamples: int) -> int:
+    """Número de bloques de BLOCK_RESAMPLES remuestras"""
+    return math.ceil(n_resamples / BLOCK_RESAMPLES)
+
+def block_ranges(n_resamples: int, n_tasks: int) -> List[Tuple[int, int]]:
+    """
+    Reparte los bloques en a lo sumo n_tasks rangos contiguos [inicio, fin)
+    """
+    total = n_blocks(n_resamples)
+    n_tasks = max(1, min(n_tasks, total))
+    bounds = np.linspace(0, total, n_tasks + 1).round().astype(int)
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+def _block_generator(seed: int, procedure: int, block: int, stream: int) -> np.random.Generator:
+    """Generador independiente de un bloque (acceso directo por spawn_key)"""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(procedure, block, stream)))
+
+def _block_size(block: int, n_resamples: int) -> int:
+    """Remuestras del bloque (el último puede ser más corto)"""
+    return min(BLOCK_RESAMPLES, n_resamples - block * BLOCK_RESAMPLES)
+
+def bootstrap_fraction(n_before: int, n_after: int, max_rows: int = DEFAULT_MAX_ROWS) -> float:
+    """
+    Fracción m/n de filas por remuestra (1.0 = bootstrap clásico)
+
+    Se usa la misma fracción en ambos períodos para que todas las
+    réplicas se reescalen con el mismo factor sqrt(m/n).
+    """
+    return min(1.0, max_rows / max(n_before + n_after, 1))
+
+def _cohens_d(mean_before: np.ndarray, mean_after: np.ndarray, var_before: np.ndarray,
+              var_after: np.ndarray, n_before: int, n_after: int) -> np.ndarray:
+    """Cohen's d (desviación pooled), vectorizado"""
+    pooled = np.sqrt(((n_before - 1) * var_before + (n_after - 1) * var_after) / (n_before + n_after - 2))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (mean_before - mean_after) / pooled
+
+def bootstrap_estimates(before: np.ndarray, after: np.ndarray) -> np.ndarray:
+    """Diferencia de medias, diferencia de medianas y Cohen's d observadas"""
+    return np.array([
+        before.mean() - after.mean(),
+        np.median(before) - np.median(after),
+        _cohens_d(before.mean(), after.mean(), before.var(ddof=1), after.var(ddof=1),
+                  before.size, after.size)
+    ])
+
+def bootstrap_blocks(before: np.ndarray, after: np.ndarray, n_resamples: int, seed: int,
+                     block_start: int, block_stop: int, max_rows: int = DEFAULT_MAX_ROWS,
+                     memory_bytes: int = DEFAULT_MEMORY_BYTES) -> np.ndarray:
+    """
+    Réplicas bootstrap de los bloques [block_start, block_stop)
+
+    Cada lote remuestrea con reemplazo (índices int32) tantas réplicas como
+    quepan en memory_bytes y calcula las tres estadísticas por fila. Los
+    datos se ordenan una vez: así la mediana de una réplica es el valor en
+    la mediana de sus índices, que se particionan en el lugar (int32, más
+    barato que np.median sobre los valores).
+
+    Returns:
+        Array (remuestras, 3): diferencia de medias, de medianas y Cohen's d
+        (sin reescalar)
+    """
+    before = np.sort(np.asarray(before, dtype=np.float64))
+    after = np.sort(np.asarray(after, dtype=np.float64))
+    fraction = bootstrap_fraction(before.size, after.size, max_rows)
+    m_before = max(2, math.ceil(fraction * before.size))
+    m_after = max(2, math.ceil(fraction * after.size))
+
+    # Índices int32 + valores float64
+    bytes_per_resample = 12 * (m_before + m_after)
+    batch = max(1, memory_bytes // bytes_per_resample)
+
+    def statistics(values: np.ndarray, indices: np.ndarray, m: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Media, varianza (ddof=1) y mediana de cada fila de una réplica"""
+        sample = values[indices]
+        # Reducciones por fila (no einsum): el resultado no depende del tamaño del lote
+        means = sample.sum(axis=1) / m
+        # Desviaciones a la media, como moments() (sin sumas de cuadrados)
+        sample -= means[:, None]
+        variances = np.square(sample, out=sample).sum(axis=1) / (m - 1)
+        middle = [(m - 1) // 2, m // 2]
+        indices.partition(middle, axis=1)
+        medians = (values[indices[:, middle[0]]] + values[indices[:, middle[1]]]) / 2
+        return means, variances, medians
+
+    replicates = []
+    for block in range(block_start, block_stop):
+        size = _block_size(block, n_resamples)
+        rng_before = _block_generator(seed, _BOOTSTRAP_KEY, block, 0)
+        rng_after = _block_generator(seed, _BOOTSTRAP_KEY, block, 1)
+        for start in range(0, size, batch):
+            rows = min(batch, size - start)
+            mean_before, var_before, median_before = statistics(
+                before, rng_before.integers(0, before.size, (rows, m_before), dtype=np.int32), m_before
+            )
+            mean_after, var_after, median_after = statistics(
+                after, rng_after.integers(0, after.size, (rows, m_after), dtype=np.int32), m_after
+            )
+            replicates.append(np.column_stack([
+                mean_before - mean_after,
+                median_before - median_after,
+                _cohens_d(mean_before, mean_after, var_before, var_after, m_before, m_after)
+            ]))
+
+    return np.concatenate(replicates) if replicates else np.empty((0, 3))
+
+def summarize_bootstrap(before: np.ndarray, after: np.ndarray, replicates: np.ndarray,
+                        n_resamples: int, seed: int, alpha: float = 0.05,
+                        max_rows: int = DEFAULT_MAX_ROWS) -> Dict[str, Any]:
+    """
+    Intervalos percentil a partir de las réplicas
+
+    Con bootstrap m-de-n las réplicas se reescalan alrededor de la
+    estimación: theta + sqrt(m/n) · (theta* - theta).
+
+    Returns:
+        Sección 'bootstrap' de comprehensive_analysis
+    """
+    before = np.asarray(before, dtype=np.float64)
+    after = np.asarray(after, dtype=np.float64)
+    estimates = bootstrap_estimates(before, after)
+    fraction = bootstrap_fraction(before.size, after.size, max_rows)
+    scale = math.sqrt(fraction)
+    scaled = estimates + scale * (replicates - estimates)
+    lower, upper = np.nanquantile(scaled, [alpha / 2, 1 - alpha / 2], axis=0)
+    standard_errors = np.nanstd(scaled, axis=0, ddof=1)
+
+    def interval(index: int) -> Dict[str, Any]:
+        return {
+            'estimacion': float(estimates[index]),
+            'ci_lower': float(lower[index]),
+            'ci_upper': float(upper[index]),
+            'error_estandar': float(standard_errors[index]),
+            'excluye_cero': bool(lower[index] > 0 or upper[index] < 0)
+        }
+
+    return {
+        'n_resamples': int(n_resamples),
+        'seed': int(seed),
+        'alpha': alpha,
+        'metodo': 'percentil' if fraction == 1.0 else 'percentil m-de-n reescalado',
+        'filas_por_remuestra': {
+            'antes': max(2, math.ceil(fraction * before.size)),
+            'despues': max(2, math.ceil(fraction * after.size))
+        },
+        'factor_escala': scale,
+        'diferencia_medias': interval(0),
+        'diferencia_medianas': interval(1),
+        'cohens_d': interval(2)
+    }
+
+def bootstrap_analysis(before: np.ndarray, after: np.ndarray, n_resamples: int = 10_000,
+                       alpha: float = 0.05, seed: Optional[int] = None,
+                       max_rows: int = DEFAULT_MAX_ROWS,
+                       memory_bytes: int = DEFAULT_MEMORY_BYTES) -> Dict[str, Any]:
+    """
+    Bootstrap completo en el proceso actual (mismo resultado que repartir los
+    bloques entre workers con bootstrap_blocks)
+
+    Args:
+        before: Tiempos antes
+        after: Tiempos después
+        n_resamples: Número de remuestras
+        alpha: 1 - nivel de confianza de los intervalos
+        seed: Semilla (None = aleatoria, se informa en el resultado)
+        max_rows: Filas máximas por remuestra (ver DEFAULT_MAX_ROWS)
+        memory_bytes: Memoria máxima de cada lote
+
+    Returns:
+        Sección 'bootstrap' de comprehensive_analysis
+    """
+    seed = new_seed() if seed is None else seed
+    replicates = bootstrap_blocks(before, after, n_resamples, seed, 0, n_blocks(n_resamples),
+                                  max_rows, memory_bytes)
+    return summarize_bootstrap(before, after, replicates, n_resamples, seed, alpha, max_rows)
+
+def permutation_sample(before: np.ndarray, after: np.ndarray, seed: int,
+                       max_rows: int = DEFAULT_MAX_ROWS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Datos sobre los que se permuta: todos, o una submuestra sin reemplazo
+    proporcional de cada período si superan max_rows (el test sigue siendo
+    exacto para la submuestra, con menos potencia)
+    """
+    before = np.asarray(before, dtype=np.float64)
+    after = np.asarray(after, dtype=np.float64)
+    fraction = bootstrap_fraction(before.size, after.size, max_rows)
+    if fraction == 1.0:
+        return before, after
+    rng = _block_generator(seed, _PERMUTATION_KEY, 0, 2)
+    return (rng.choice(before, max(2, math.ceil(fraction * before.size)), replace=False),
+            rng.choice(after, max(2, math.ceil(fraction * after.size)), replace=False))
+
+def permutation_blocks(before: np.ndarray, after: np.ndarray, n_resamples: int, seed: int,
+                       block_start: int, block_stop: int, max_rows: int = DEFAULT_MAX_ROWS) -> int:
+    """
+    Permutaciones de los bloques [block_start, block_stop)
+
+    Cada sub-bloque copia los datos combinados en las filas de un buffer de
+    PERMUTATION_BATCH_BYTES, las baraja todas con una llamada a
+    rng.permuted(axis=1) (Fisher-Yates por fila en C) y suma las primeras
+    n_antes columnas como período antes. El buffer se reutiliza y cabe en
+    caché: con buffers más grandes o con claves aleatorias y
+    np.argpartition el costo pasa a ser de ancho de banda de memoria.
+
+    Returns:
+        Número de permutaciones con |diferencia| >= |diferencia observada|
+    """
+    before, after = permutation_sample(before, after, seed, max_rows)
+    pooled = np.concatenate([before, after])
+    total = pooled.sum()
+    n_before, n_after = before.size, after.size
+    observed = abs(before.mean() - after.mean())
+    # Tolerancia para empates numéricos con la diferencia observada
+    threshold = observed - 1e-12 * max(1.0, observed)
+
+    batch = max(1, PERMUTATION_BATCH_BYTES // pooled.nbytes)
+    buffer = np.empty((min(batch, BLOCK_RESAMPLES), pooled.size))
+    extreme = 0
+    for block in range(block_start, block_stop):
+        size = _block_size(block, n_resamples)
+        rng = _block_generator(seed, _PERMUTATION_KEY, block, 0)
+        sum_before = np.empty(size)
+        for start in range(0, size, batch):
+            shuffled = buffer[:min(batch, size - start)]
+            shuffled[:] = pooled
+            rng.permuted(shuffled, axis=1, out=shuffled)
+            sum_before[start:start + shuffled.shape[0]] = shuffled[:, :n_before].sum(axis=1)
+        differences = sum_before / n_before - (total - sum_before) / n_after
+        extreme += int((np.abs(differences) >= threshold).sum())
+    return extreme
+
+def summarize_permutation(before: np.ndarray, after: np.ndarray, extreme: int, n_resamples: int,
+                          seed: int, alpha: float = 0.05, max_rows: int = DEFAULT_MAX_ROWS) -> Dict[str, Any]:
+    """
+    p-value del test de permutación: (extremos + 1) / (permutaciones + 1)
+
+    Returns:
+        Sección 'permutation_test' de comprehensive_analysis
+    """
+    sample_before, sample_after = permutation_sample(before, after, seed, max_rows)
+    p_value = (extreme + 1) / (n_resamples + 1)
+    return {
+        'n_resamples': int(n_resamples),
+        'seed': int(seed),
+        'estadistico': 'diferencia de medias',
+        'diferencia_observada': float(sample_before.mean() - sample_after.mean()),
+        'n_extremos': int(extreme),
+        'p_value': float(p_value),
+        'p_value_minimo': float(1 / (n_resamples + 1)),
+        'is_significant': bool(p_value < alpha),
+        'alpha': alpha,
+        'filas_usadas': {'antes': int(sample_before.size), 'despues': int(sample_after.size)}
+    }
+
+def permutation_test(before: np.ndarray, after: np.ndarray, n_resamples: int = 10_000,
+                     alpha: float = 0.05, seed: Optional[int] = None,
+                     max_rows: int = DEFAULT_MAX_ROWS) -> Dict[str, Any]:
+    """
+    Test de permutación bilateral de la diferencia de medias en el proceso
+    actual (mismo resultado que repartir los bloques con permutation_blocks)
+
+    Returns:
+        Sección 'permutation_test' de comprehensive_analysis
+    """
+    seed = new_seed() if seed is None else seed
+    extreme = permutation_blocks(before, after, n_resamples, seed, 0, n_blocks(n_resamples), max_rows)
+    return summarize_permutation(before, after, extreme, n_resamples, seed, alpha, max_rows)
+
+def new_seed() -> int:
+    """Semilla aleatoria de 63 bits (se informa para reproducir el resultado)"""
+    return int(np.random.SeedSequence().generate_state(2, np.uint32).view(np.uint64)[0] >> np.uint64(1))
@@ -0,0 +1,215 @@
+"""
+Respuestas HTTP rápidas para la API Kaizen - Cafetería
+Serialización JSON con orjson (con soporte NumPy) y compresión gzip/brotli
+negociada según Accept-Encoding por encima de un tamaño mínimo
+"""
+
+import json
+import zlib
+import numpy as np
+import pandas as pd
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:  # Dependencia opcional: se usa json estándar
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # Dependencia opcional: solo se ofrece gzip
+    brotli = None
+
+# Tamaño mínimo (bytes) para comprimir una respuesta
+DEFAULT_MINIMUM_SIZE = 1024
+
+# Tipos de contenido que vale la pena comprimir (PNG/WebP/Parquet ya vienen comprimidos)
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/', 'image/svg+xml')
+
+def _default(obj: Any) -> Any:
+    """Tipos que orjson/json no serializan de forma nativa"""
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if hasattr(obj, 'model_dump'):
+        return obj.model_dump()
+    raise TypeError(f"Tipo no serializable a JSON: {type(obj).__name__}")
+
+def _replace_non_finite(obj: Any) -> Any:
+    """NaN/inf -> None para producir JSON válido con json estándar"""
+    if isinstance(obj, float) and not np.isfinite(obj):
+        return None
+    if isinstance(obj, dict):
+        return {key: _replace_non_finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_replace_non_finite(value) for value in obj]
+    return obj
+
+def dumps(content: Any) -> bytes:
+    """
+    Serializa a JSON (bytes UTF-8)
+
+    Con orjson: escalares y arrays NumPy nativos, NaN/inf como null. Sin
+    orjson: json estándar con el mismo tratamiento de tipos.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(_replace_non_finite(content), default=_default, ensure_ascii=False,
+                      allow_nan=False, separators=(',', ':')).encode('utf-8')
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse serializada con orjson cuando está instalado
+
+    Devolverla directamente desde un endpoint evita además el paso por
+    jsonable_encoder de FastAPI, que recorre y copia todo el contenido.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Elige 'br' o 'gzip' según Accept-Encoding (respetando q=0)
+
+    Returns:
+        Codificación elegida o None si el cliente no acepta ninguna soportada
+    """
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        parts = [part.strip() for part in item.split(';')]
+        if not parts[0]:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        accepted[parts[0].lower()] = quality
+
+    def acceptable(encoding: str) -> bool:
+        return accepted.get(encoding, accepted.get('*', 0.0)) > 0
+
+    if brotli is not None and acceptable('br'):
+        return 'br'
+    if acceptable('gzip'):
+        return 'gzip'
+    return None
+
+class _Compressor:
+    """Compresor incremental gzip o brotli con la misma interfaz"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+            self._process = self._compressor.process
+            self._finish = self._compressor.finish
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+            self._process = self._compressor.compress
+            self._finish = self._compressor.flush
+
+    def compress(self, data: bytes) -> bytes:
+        return self._process(data)
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI de compresión gzip/brotli
+
+    Comprime respuestas de tipos compresibles a partir de minimum_size bytes
+    (las respuestas en streaming se comprimen por fragmentos). Los ETag se
+    marcan con el sufijo de la codificación ("...-gzip", "...-br") porque
+    cada codificación es una representación distinta; etag_matches los
+    ignora al comparar.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = DEFAULT_MINIMUM_SIZE,
+                 gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get('accept-encoding', ''))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, compressor, passthrough
+
+            if message['type'] == 'http.response.start':
+                start_message = message
+                headers = Headers(raw=message['headers'])
+                content_type = headers.get('content-type', '')
+                passthrough = (
+                    'content-encoding' in headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                )
+                if passthrough:
+                    await send(message)
+                return
+
+            if message['type'] != 'http.response.body' or passthrough:
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers = MutableHeaders(raw=start_message['headers'])
+                headers['Content-Encoding'] = encoding
+                headers.add_vary_header('Accept-Encoding')
+                etag = headers.get('etag')
+                if etag and etag.endswith('"'):
+                    headers['ETag'] = f'{etag[:-1]}-{encoding}"'
+                if more_body:
+                    del headers['Content-Length']
+                else:
+                    compressed = compressor.compress(body) + compressor.finish()
+                    headers['Content-Length'] = str(len(compressed))
+                    await send(start_message)
+                    await send({'type': 'http.response.body', 'body': compressed})
+                    return
+                await send(start_message)
+
+            chunk = compressor.compress(body)
+            if not more_body:
+                chunk += compressor.finish()
+            if chunk or not more_body:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': more_body})
+
+        await self.app(scope, receive, send_compressed)
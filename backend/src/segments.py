@@ -0,0 +1,259 @@
+"""
+Análisis segmentado para proyecto Kaizen - Cafetería
+Welch t-test y Cohen's d de todos los segmentos (servidor, franja horaria,
+día de la semana) a la vez, a partir de momentos agrupados con np.bincount,
+con corrección por comparaciones múltiples entre segmentos
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from typing import Dict, Any, List, Tuple
+
+from src.statistical_analysis import interpret_cohens_d
+
+# Columnas por las que se puede segmentar
+SEGMENT_COLUMNS = ['servidor', 'franja_horaria', 'dia_semana']
+
+# Métodos de corrección por comparaciones múltiples
+CORRECTION_METHODS = ['holm', 'fdr_bh', 'bonferroni', 'none']
+
+def _segment_codes(before: pd.Series, after: pd.Series) -> Tuple[np.ndarray, np.ndarray, List[Any]]:
+    """
+    Códigos enteros de una columna en ambos períodos sobre las mismas categorías
+
+    Returns:
+        Tuple con (códigos antes, códigos después, etiquetas); -1 = valor faltante
+    """
+    if (isinstance(before.dtype, pd.CategoricalDtype) and isinstance(after.dtype, pd.CategoricalDtype)
+            and before.dtype == after.dtype):
+        return (before.cat.codes.to_numpy(np.int64), after.cat.codes.to_numpy(np.int64),
+                list(before.cat.categories))
+
+    categories = pd.Index(pd.concat([before.dropna(), after.dropna()]).unique()).sort_values()
+    return (pd.Categorical(before, categories=categories).codes.astype(np.int64),
+            pd.Categorical(after, categories=categories).codes.astype(np.int64),
+            list(categories))
+
+def grouped_moments(codes: np.ndarray, values: np.ndarray, n_groups: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    n, media y varianza muestral (ddof=1) de cada grupo con np.bincount
+
+    Args:
+        codes: Grupo de cada observación (0..n_groups-1)
+        values: Observaciones
+        n_groups: Número de grupos
+
+    Returns:
+        Tuple con (n, media, var) por grupo; NaN donde no hay datos suficientes
+    """
+    counts = np.bincount(codes, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.bincount(codes, weights=values, minlength=n_groups) / counts
+        deviations = values - means[codes]
+        variances = np.bincount(codes, weights=deviations * deviations, minlength=n_groups) / (counts - 1)
+    variances[counts < 2] = np.nan
+    return counts, means, variances
+
+def welch_statistics(n1: np.ndarray, mean1: np.ndarray, var1: np.ndarray,
+                     n2: np.ndarray, mean2: np.ndarray, var2: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Estadístico t, grados de libertad (Welch-Satterthwaite) y p-value
+    bilateral para muchos pares de grupos a la vez
+
+    Returns:
+        Diccionario de arrays: t, p, grados de libertad, diferencia de medias
+        y error estándar
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        se1, se2 = var1 / n1, var2 / n2
+        se_diff = np.sqrt(se1 + se2)
+        mean_diff = mean1 - mean2
+        t_statistic = mean_diff / se_diff
+        df = (se1 + se2)**2 / (se1**2 / (n1 - 1) + se2**2 / (n2 - 1))
+        p_value = 2 * stats.t.sf(np.abs(t_statistic), df)
+
+    return {
+        't_statistic': t_statistic,
+        'p_value': p_value,
+        'degrees_freedom': df,
+        'mean_difference': mean_diff,
+        'se_difference': se_diff
+    }
+
+def vectorized_welch(n1: np.ndarray, mean1: np.ndarray, var1: np.ndarray,
+                     n2: np.ndarray, mean2: np.ndarray, var2: np.ndarray,
+                     alpha: float = 0.05) -> Dict[str, np.ndarray]:
+    """
+    Welch t-test y Cohen's d para muchos pares de grupos a la vez
+
+    Mismas fórmulas que welch_ttest_from_stats y cohens_d_from_stats, sobre
+    arrays (un elemento por segmento).
+
+    Returns:
+        Diccionario de arrays: t, p, grados de libertad, diferencia de medias,
+        error estándar, valor crítico, intervalo de confianza y Cohen's d
+    """
+    results = welch_statistics(n1, mean1, var1, n2, mean2, var2)
+    mean_diff, se_diff = results['mean_difference'], results['se_difference']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t_critical = stats.t.ppf(1 - alpha / 2, results['degrees_freedom'])
+        pooled_std = np.sqrt(((n1 - 1) * var1 + (n2 - 1) * var2) / (n1 + n2 - 2))
+        d = mean_diff / pooled_std
+
+    results.update({
+        't_critical': t_critical,
+        'ci_lower': mean_diff - t_critical * se_diff,
+        'ci_upper': mean_diff + t_critical * se_diff,
+        'cohens_d': d
+    })
+    return results
+
+def adjust_p_values(p_values: np.ndarray, method: str = 'holm') -> np.ndarray:
+    """
+    Corrige p-values por comparaciones múltiples
+
+    Args:
+        p_values: p-values (los NaN se ignoran y se devuelven como NaN)
+        method: 'holm' (Holm-Bonferroni, controla FWER), 'fdr_bh'
+            (Benjamini-Hochberg, controla FDR), 'bonferroni' o 'none'
+
+    Returns:
+        p-values ajustados (acotados a 1)
+    """
+    if method not in CORRECTION_METHODS:
+        raise ValueError(f"Método de corrección '{method}' no soportado. Disponibles: {CORRECTION_METHODS}")
+
+    adjusted = np.full(p_values.shape, np.nan)
+    valid = np.flatnonzero(np.isfinite(p_values))
+    m = valid.size
+    if m == 0 or method == 'none':
+        adjusted[valid] = p_values[valid]
+        return adjusted
+
+    p = p_values[valid]
+    if method == 'bonferroni':
+        adjusted[valid] = np.minimum(p * m, 1.0)
+        return adjusted
+
+    order = np.argsort(p, kind='stable')
+    ranked = p[order]
+    if method == 'holm':
+        steps = np.maximum.accumulate(ranked * (m - np.arange(m)))
+    else:
+        steps = np.minimum.accumulate((ranked * m / np.arange(1, m + 1))[::-1])[::-1]
+    adjusted[valid[order]] = np.minimum(steps, 1.0)
+    return adjusted
+
+def segmented_analysis(df_before: pd.DataFrame, df_after: pd.DataFrame, by: List[str],
+                       alpha: float = 0.05, correction: str = 'holm',
+                       min_n: int = 2) -> Dict[str, Any]:
+    """
+    Comparación antes vs después en cada combinación de las columnas 'by'
+
+    Los momentos de todos los segmentos salen de dos np.bincount por período
+    sobre un código combinado, y los tests se calculan vectorizados; no se
+    itera comprehensive_analysis por grupo.
+
+    Args:
+        df_before: DataFrame con datos antes
+        df_after: DataFrame con datos después
+        by: Columnas de segmentación (subconjunto de SEGMENT_COLUMNS)
+        alpha: Nivel de significancia, aplicado a los p-values ajustados
+        correction: Método de corrección (ver CORRECTION_METHODS)
+        min_n: Observaciones mínimas por período para testear un segmento
+
+    Returns:
+        Diccionario con un registro por segmento y el resumen de la
+        corrección. is_significant usa los p-values ajustados; ci_lower y
+        ci_upper son intervalos 1 - alpha de cada segmento sin ajustar (Holm
+        y BH no tienen intervalos simultáneos), por lo que un intervalo que
+        excluye 0 no implica significancia tras la corrección.
+    """
+    unknown = [column for column in by if column not in SEGMENT_COLUMNS]
+    if not by or unknown:
+        raise ValueError(f"Columnas de segmentación inválidas: {unknown or by}. Disponibles: {SEGMENT_COLUMNS}")
+    if correction not in CORRECTION_METHODS:
+        raise ValueError(f"Método de corrección '{correction}' no soportado. Disponibles: {CORRECTION_METHODS}")
+
+    # Código combinado (mixed radix) de todas las columnas de segmentación
+    before_codes = np.zeros(len(df_before), dtype=np.int64)
+    after_codes = np.zeros(len(df_after), dtype=np.int64)
+    before_valid = np.ones(len(df_before), dtype=bool)
+    after_valid = np.ones(len(df_after), dtype=bool)
+    labels: List[List[Any]] = []
+    for column in by:
+        codes_b, codes_a, column_labels = _segment_codes(df_before[column], df_after[column])
+        before_codes = before_codes * len(column_labels) + codes_b
+        after_codes = after_codes * len(column_labels) + codes_a
+        before_valid &= codes_b >= 0
+        after_valid &= codes_a >= 0
+        labels.append(column_labels)
+    n_groups = int(np.prod([len(column_labels) for column_labels in labels]))
+
+    before_times = df_before['tiempo_atencion_min'].to_numpy(dtype=np.float64)[before_valid]
+    after_times = df_after['tiempo_atencion_min'].to_numpy(dtype=np.float64)[after_valid]
+    n1, mean1, var1 = grouped_moments(before_codes[before_valid], before_times, n_groups)
+    n2, mean2, var2 = grouped_moments(after_codes[after_valid], after_times, n_groups)
+
+    # Segmentos con datos en al menos un período; los que no llegan a min_n
+    # en ambos se informan sin testear
+    present = np.flatnonzero((n1 > 0) | (n2 > 0))
+    testable = (n1[present] >= max(min_n, 2)) & (n2[present] >= max(min_n, 2))
+    results = vectorized_welch(n1[present], mean1[present], var1[present],
+                               n2[present], mean2[present], var2[present], alpha)
+    p_values = np.where(testable, results['p_value'], np.nan)
+    adjusted = adjust_p_values(p_values, correction)
+    significant = adjusted < alpha
+
+    # Etiquetas de cada segmento a partir del código combinado
+    segment_labels = []
+    remainder = present.copy()
+    for column_labels in reversed(labels):
+        segment_labels.append(np.asarray(column_labels, dtype=object)[remainder % len(column_labels)])
+        remainder //= len(column_labels)
+    segment_labels.reverse()
+
+    def number(value: float) -> Any:
+        return float(value) if np.isfinite(value) else None
+
+    segments = []
+    for i in range(present.size):
+        mean_before, mean_after = mean1[present[i]], mean2[present[i]]
+        d = results['cohens_d'][i]
+        segment = {column: str(segment_labels[j][i]) for j, column in enumerate(by)}
+        segment.update({
+            'n_antes': int(n1[present[i]]),
+            'n_despues': int(n2[present[i]]),
+            'media_antes': number(mean_before),
+            'media_despues': number(mean_after),
+            'reduccion_porcentual': number((mean_before - mean_after) / mean_before * 100) if n1[present[i]] and n2[present[i]] else None,
+            'testeado': bool(testable[i]),
+            't_statistic': number(results['t_statistic'][i]) if testable[i] else None,
+            'degrees_freedom': number(results['degrees_freedom'][i]) if testable[i] else None,
+            'p_value': number(p_values[i]),
+            'p_value_ajustado': number(adjusted[i]),
+            'is_significant': bool(significant[i]),
+            'mean_difference': number(results['mean_difference'][i]) if testable[i] else None,
+            'ci_lower': number(results['ci_lower'][i]) if testable[i] else None,
+            'ci_upper': number(results['ci_upper'][i]) if testable[i] else None,
+            'cohens_d': number(d) if testable[i] else None,
+            'effect_size_interpretation': interpret_cohens_d(abs(d)) if testable[i] and np.isfinite(d) else None,
+            'direction': ('improvement' if d > 0 else 'deterioration' if d < 0 else 'no_change')
+                         if testable[i] and np.isfinite(d) else None
+        })
+        segments.append(segment)
+
+    return {
+        'segmentado_por': by,
+        'alpha': alpha,
+        'correccion': correction,
+        'min_n': min_n,
+        'n_segmentos': len(segments),
+        'n_testeados': int(testable.sum()),
+        'n_significativos': int(significant.sum()),
+        'n_mejoras_significativas': int((significant & (results['mean_difference'] > 0)).sum()),
+        'nivel_confianza_ic': 1 - alpha,
+        'ic_ajustado': False,
+        'segmentos': segments
+    }
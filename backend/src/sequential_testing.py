@@ -0,0 +1,223 @@
+"""
+Pruebas secuenciales para análisis Kaizen - Cafetería
+mSPRT (mixture sequential probability ratio test) sobre la diferencia de
+medias antes - después: p-values siempre válidos y secuencias de confianza
+que se pueden consultar después de cada observación sin inflar los falsos
+positivos, actualizadas desde momentos acumulados (Johari et al., 2017)
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.online_stats import RunningMoments
+
+# Escala (minutos) de la mezcla normal N(0, tau²) sobre la diferencia de
+# medias: el test tiene más potencia para efectos de ese orden
+DEFAULT_TAU = float(os.getenv("KAIZEN_SEQUENTIAL_TAU", "1.0"))
+
+# Observaciones mínimas del período después antes de la primera mirada (las
+# varianzas estimadas con muy pocos datos vuelven inestable la razón)
+BURN_IN = 10
+
+# Puntos de la curva devuelta por summary()
+DEFAULT_CURVE_POINTS = 200
+
+def log_likelihood_ratio(theta: np.ndarray, variance: np.ndarray, tau: float = DEFAULT_TAU) -> np.ndarray:
+    """
+    Logaritmo de la razón de verosimilitud de mezcla del mSPRT frente a
+    diferencia nula
+
+    Args:
+        theta: Diferencia de medias estimada (antes - después)
+        variance: Varianza de la estimación (var_antes/n_antes + var_despues/n_despues)
+        tau: Escala de la mezcla
+
+    Returns:
+        log Λ para cada mirada
+    """
+    tau2 = tau * tau
+    return 0.5 * np.log(variance / (variance + tau2)) + tau2 * theta**2 / (2 * variance * (variance + tau2))
+
+def confidence_radius(variance: np.ndarray, alpha: float = 0.05, tau: float = DEFAULT_TAU) -> np.ndarray:
+    """
+    Semiancho de la secuencia de confianza 1 - alpha: los valores de la
+    diferencia que el mSPRT no rechaza en esa mirada
+    """
+    tau2 = tau * tau
+    return np.sqrt(2 * variance * (variance + tau2) / tau2
+                   * (np.log(1 / alpha) + 0.5 * np.log((variance + tau2) / variance)))
+
+def prefix_moments(base: RunningMoments, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    n, media y varianza (ddof=1) después de cada observación de values
+    añadida a base, sin recorrer los datos anteriores
+
+    Los valores se centran en la media de base (o en el primer valor) y las
+    medias salen de sumas acumuladas. La suma de cuadrados de desviaciones sigue la
+    recurrencia de Welford, M2 += (x - media anterior)·(x - media nueva),
+    con incrementos no negativos (sin cancelación) y acumulados con cumsum.
+
+    Returns:
+        Tuple de arrays (n, media, varianza); varianza NaN con n < 2
+    """
+    values = np.asarray(values, dtype=np.float64)
+    k = np.arange(1, values.size + 1)
+    center = base.mean if base.n or not values.size else values[0]
+    n = base.n + k
+    # Todo centrado en center: las desviaciones no arrastran el redondeo de la magnitud
+    shifted = values - center
+    shifted_means = (base.n * (base.mean - center) + np.cumsum(shifted)) / n
+    previous = np.concatenate([[base.mean - center if base.n else 0.0], shifted_means[:-1]])
+    m2 = base.m2 + np.cumsum((shifted - previous) * (shifted - shifted_means))
+    means = center + shifted_means
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variances = np.where(n > 1, m2 / (n - 1), np.nan)
+    return n, means, variances
+
+class SequentialMonitor:
+    """
+    Historial de miradas de un mSPRT antes vs después
+
+    Cada observación nueva del período después es una mirada: se guardan
+    n_antes, n_despues, la diferencia estimada, su varianza y la fecha
+    (40 bytes por mirada). observe() procesa un lote en O(tamaño del lote)
+    con sumas acumuladas; summary() aplica alpha sobre el historial.
+    """
+
+    def __init__(self, tau: float = DEFAULT_TAU):
+        self.tau = tau
+        self._chunks: List[Dict[str, np.ndarray]] = []
+        self.n_looks = 0
+
+    @classmethod
+    def from_data(cls, before_times: np.ndarray, after_times: np.ndarray,
+                  after_dates: Optional[np.ndarray] = None, tau: float = DEFAULT_TAU) -> 'SequentialMonitor':
+        """
+        Monitor de un dataset completo, como si el período después se hubiera
+        observado en orden de fecha con el período antes como línea base
+
+        Returns:
+            Monitor con una mirada por observación del período después
+        """
+        after_times = np.asarray(after_times, dtype=np.float64)
+        if after_dates is not None:
+            order = np.argsort(after_dates, kind='stable')
+            after_times, after_dates = after_times[order], np.asarray(after_dates)[order]
+        monitor = cls(tau)
+        monitor.observe(RunningMoments.from_values(before_times), RunningMoments(), after_times, after_dates)
+        return monitor
+
+    def observe(self, before: RunningMoments, after: RunningMoments, after_values: np.ndarray,
+                after_dates: Optional[np.ndarray] = None) -> None:
+        """
+        Agrega una mirada por cada observación nueva del período después
+
+        Args:
+            before: Momentos actuales del período antes
+            after: Momentos del período después antes de este lote
+            after_values: Observaciones nuevas del período después, en orden de llegada
+            after_dates: Fechas de esas observaciones (opcional)
+        """
+        if before.n < 2 or len(after_values) == 0:
+            return
+        n_after, mean_after, var_after = prefix_moments(after, after_values)
+        looks = n_after >= max(BURN_IN, 2)
+        if not looks.any():
+            return
+        before_stats = before.to_stats()
+        dates = (pd.to_datetime(after_dates).to_numpy(dtype='datetime64[ns]')[looks] if after_dates is not None
+                 else np.full(int(looks.sum()), np.datetime64('NaT'), dtype='datetime64[ns]'))
+        self._append(np.full(int(looks.sum()), before.n), n_after[looks],
+                     before_stats['media'] - mean_after[looks],
+                     before_stats['var'] / before.n + var_after[looks] / n_after[looks], dates)
+
+    def observe_before(self, before: RunningMoments, after: RunningMoments) -> None:
+        """
+        Una mirada con los momentos actuales (tras anexar datos al período antes)
+        """
+        if before.n < 2 or after.n < max(BURN_IN, 2):
+            return
+        before_stats, after_stats = before.to_stats(), after.to_stats()
+        self._append(np.array([before.n]), np.array([after.n]),
+                     np.array([before_stats['media'] - after_stats['media']]),
+                     np.array([before_stats['var'] / before.n + after_stats['var'] / after.n]),
+                     np.array(['NaT'], dtype='datetime64[ns]'))
+
+    def _append(self, n_before: np.ndarray, n_after: np.ndarray, theta: np.ndarray,
+                variance: np.ndarray, dates: np.ndarray) -> None:
+        """Guarda un bloque de miradas"""
+        self._chunks.append({'n_before': n_before.astype(np.int64), 'n_after': n_after.astype(np.int64),
+                             'theta': theta, 'variance': variance, 'date': dates})
+        self.n_looks += theta.size
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria del historial de miradas"""
+        return sum(array.nbytes for chunk in self._chunks for array in chunk.values())
+
+    def history(self) -> Dict[str, np.ndarray]:
+        """Historial completo de miradas como arrays"""
+        if len(self._chunks) > 1:
+            self._chunks = [{key: np.concatenate([chunk[key] for chunk in self._chunks])
+                             for key in self._chunks[0]}]
+        return self._chunks[0] if self._chunks else {}
+
+    def summary(self, alpha: float = 0.05, curve_points: int = DEFAULT_CURVE_POINTS) -> Dict[str, Any]:
+        """
+        Estado del test secuencial al nivel alpha
+
+        Returns:
+            Diccionario con el p-value siempre válido (mínimo acumulado de
+            1/Λ), la secuencia de confianza (intersección acumulada de los
+            intervalos), la decisión, el primer punto en que la mejora (o el
+            deterioro) fue concluyente y una curva de hasta curve_points miradas
+        """
+        history = self.history()
+        result = {'tau': self.tau, 'alpha': alpha, 'burn_in': BURN_IN, 'n_miradas': self.n_looks}
+        if not history:
+            result.update({'p_value': 1.0, 'estimacion': None, 'ci_lower': None, 'ci_upper': None,
+                           'decision': 'continuar', 'punto_parada': None, 'curva': []})
+            return result
+
+        theta, variance = history['theta'], history['variance']
+        with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+            p_values = np.minimum(1.0, np.exp(-np.maximum.accumulate(log_likelihood_ratio(theta, variance, self.tau))))
+            radius = confidence_radius(variance, alpha, self.tau)
+        ci_lower = np.maximum.accumulate(theta - radius)
+        ci_upper = np.minimum.accumulate(theta + radius)
+
+        improvement = np.flatnonzero(ci_lower > 0)
+        deterioration = np.flatnonzero(ci_upper < 0)
+        stop = None
+        if improvement.size or deterioration.size:
+            first = min(index[0] for index in (improvement, deterioration) if index.size)
+            date = history['date'][first]
+            stop = {
+                'decision': 'mejora' if improvement.size and improvement[0] == first else 'deterioro',
+                'mirada': int(first + 1),
+                'n_antes': int(history['n_before'][first]),
+                'n_despues': int(history['n_after'][first]),
+                'fecha': None if np.isnat(date) else pd.Timestamp(date).isoformat(),
+                'p_value': float(p_values[first]),
+                'estimacion': float(theta[first])
+            }
+
+        points = np.unique(np.linspace(0, theta.size - 1, min(curve_points, theta.size)).astype(np.int64))
+        result.update({
+            'p_value': float(p_values[-1]),
+            'estimacion': float(theta[-1]),
+            'ci_lower': float(ci_lower[-1]),
+            'ci_upper': float(ci_upper[-1]),
+            'n_antes': int(history['n_before'][-1]),
+            'n_despues': int(history['n_after'][-1]),
+            'decision': stop['decision'] if stop else 'continuar',
+            'punto_parada': stop,
+            'curva': [
+                {'n_despues': int(history['n_after'][i]), 'p_value': float(p_values[i]),
+                 'estimacion': float(theta[i]), 'ci_lower': float(ci_lower[i]), 'ci_upper': float(ci_upper[i])}
+                for i in points
+            ]
+        })
+        return result
@@ -6,7 +6,10 @@ Implementa Welch t-test y Cohen's d para comparar antes vs después
 import numpy as np
 import pandas as pd
 from scipy import stats
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Optional, Tuple
+from src.descriptive import moments, describe
+from src.quantile_sketch import QuantileSketch, describe_with_sketch
+from src.resampling import bootstrap_analysis, permutation_test
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -23,24 +26,40 @@ def welch_ttest(before_data: np.ndarray, after_data: np.ndarray,
     Returns:
         Diccionario con resultados del test
     """
-    # Realizar Welch t-test (equal_var=False)
-    t_statistic, p_value = stats.ttest_ind(before_data, after_data, equal_var=False)
+    return welch_ttest_from_stats(moments(before_data), moments(after_data), alpha)
+
+def welch_ttest_from_stats(before_stats: Dict[str, Any], after_stats: Dict[str, Any],
+                           alpha: float = 0.05) -> Dict[str, Any]:
+    """
+    Welch t-test a partir de n, media y var de cada grupo (sin volver a
+    recorrer los datos); equivale a stats.ttest_ind(equal_var=False)
     
-    # Calcular grados de libertad para Welch t-test
-    n1, n2 = len(before_data), len(after_data)
-    s1, s2 = np.var(before_data, ddof=1), np.var(after_data, ddof=1)
+    Args:
+        before_stats: Resultado de moments() o describe() del período antes
+        after_stats: Resultado de moments() o describe() del período después
+        alpha: Nivel de significancia (default 0.05)
+    
+    Returns:
+        Diccionario con resultados del test
+    """
+    n1, n2 = before_stats['n'], after_stats['n']
+    s1, s2 = before_stats['var'], after_stats['var']
     
     # Fórmula de Welch para grados de libertad
     numerator = (s1/n1 + s2/n2)**2
     denominator = (s1/n1)**2/(n1-1) + (s2/n2)**2/(n2-1)
     df = numerator / denominator
     
+    # Estadístico t y p-value bilateral
+    mean_diff = before_stats['media'] - after_stats['media']
+    se_diff = np.sqrt(s1/n1 + s2/n2)
+    t_statistic = mean_diff / se_diff
+    p_value = 2 * stats.t.sf(abs(t_statistic), df)
+    
     # Valor crítico
     t_critical = stats.t.ppf(1 - alpha/2, df)
     
     # Intervalo de confianza para la diferencia de medias
-    mean_diff = np.mean(before_data) - np.mean(after_data)
-    se_diff = np.sqrt(s1/n1 + s2/n2)
     ci_lower = mean_diff - t_critical * se_diff
     ci_upper = mean_diff + t_critical * se_diff
     
@@ -49,7 +68,7 @@ def welch_ttest(before_data: np.ndarray, after_data: np.ndarray,
         'p_value': float(p_value),
         'degrees_freedom': float(df),
         't_critical': float(t_critical),
-        'is_significant': p_value < alpha,
+        'is_significant': bool(p_value < alpha),
         'alpha': alpha,
         'mean_difference': float(mean_diff),
         'se_difference': float(se_diff),
@@ -69,20 +88,26 @@ def cohens_d(before_data: np.ndarray, after_data: np.ndarray) -> Dict[str, Any]:
     Returns:
         Diccionario con Cohen's d y su interpretación
     """
-    # Medias
-    mean1, mean2 = np.mean(before_data), np.mean(after_data)
+    return cohens_d_from_stats(moments(before_data), moments(after_data))
+
+def cohens_d_from_stats(before_stats: Dict[str, Any], after_stats: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Cohen's d a partir de n, media y var de cada grupo
     
-    # Desviaciones estándar
-    std1, std2 = np.std(before_data, ddof=1), np.std(after_data, ddof=1)
+    Args:
+        before_stats: Resultado de moments() o describe() del período antes
+        after_stats: Resultado de moments() o describe() del período después
     
-    # Tamaños de muestra
-    n1, n2 = len(before_data), len(after_data)
+    Returns:
+        Diccionario con Cohen's d y su interpretación
+    """
+    n1, n2 = before_stats['n'], after_stats['n']
     
     # Desviación estándar pooled
-    pooled_std = np.sqrt(((n1-1)*std1**2 + (n2-1)*std2**2) / (n1+n2-2))
+    pooled_std = np.sqrt(((n1-1)*before_stats['var'] + (n2-1)*after_stats['var']) / (n1+n2-2))
     
     # Cohen's d
-    d = (mean1 - mean2) / pooled_std
+    d = (before_stats['media'] - after_stats['media']) / pooled_std
     
     return {
         'cohens_d': float(d),
@@ -114,13 +139,111 @@ def interpret_cohens_d(d_abs: float) -> str:
     else:
         return "Efecto grande"
 
-def comprehensive_analysis(df_before: pd.DataFrame, df_after: pd.DataFrame) -> Dict[str, Any]:
+def anderson_normality_test(data: np.ndarray) -> Tuple[float, float]:
+    """
+    Test de Anderson-Darling de normalidad con p-value aproximado
+    
+    scipy.stats.anderson solo devuelve valores críticos; el p-value se
+    aproxima con las fórmulas de D'Agostino y Stephens (1986) para media y
+    varianza estimadas.
+    
+    Args:
+        data: Array con las observaciones
+    
+    Returns:
+        Tuple con (estadístico A², p-value)
+    """
+    statistic = stats.anderson(data, dist='norm').statistic
+    n = len(data)
+    
+    # Estadístico ajustado por tamaño de muestra
+    a2 = statistic * (1 + 0.75 / n + 2.25 / n**2)
+    if a2 >= 0.6:
+        p_value = np.exp(1.2937 - 5.709 * a2 + 0.0186 * a2**2)
+    elif a2 >= 0.34:
+        p_value = np.exp(0.9177 - 4.279 * a2 - 1.38 * a2**2)
+    elif a2 >= 0.2:
+        p_value = 1 - np.exp(-8.318 + 42.796 * a2 - 59.938 * a2**2)
+    else:
+        p_value = 1 - np.exp(-13.436 + 101.14 * a2 - 223.73 * a2**2)
+    
+    return float(statistic), float(min(max(p_value, 0.0), 1.0))
+
+def normality_tests(before_data: np.ndarray, after_data: np.ndarray) -> Dict[str, Dict[str, float]]:
+    """
+    Test de normalidad de ambos períodos (Shapiro-Wilk para muestras
+    pequeñas, Anderson-Darling para grandes)
+    
+    Returns:
+        Sección 'normalidad' de comprehensive_analysis
+    """
+    if len(before_data) <= 50:
+        normality_before = stats.shapiro(before_data)
+        normality_after = stats.shapiro(after_data)
+    else:
+        normality_before = anderson_normality_test(before_data)
+        normality_after = anderson_normality_test(after_data)
+    
+    return {
+        'antes': {'statistic': float(normality_before[0]), 'p_value': float(normality_before[1])},
+        'despues': {'statistic': float(normality_after[0]), 'p_value': float(normality_after[1])}
+    }
+
+def levene_median_test(before_data: np.ndarray, after_data: np.ndarray,
+                       before_median: float, after_median: float) -> Tuple[float, float]:
+    """
+    Test de Levene centrado en la mediana (Brown-Forsythe) con medianas ya
+    calculadas; equivale a stats.levene(center='median') sin volver a ordenar
+    
+    Args:
+        before_data: Array con tiempos antes
+        after_data: Array con tiempos después
+        before_median: Mediana del período antes
+        after_median: Mediana del período después
+    
+    Returns:
+        Tuple con (estadístico W, p-value)
+    """
+    deviations = [np.abs(np.asarray(before_data, dtype=np.float64) - before_median),
+                  np.abs(np.asarray(after_data, dtype=np.float64) - after_median)]
+    group_means = np.array([z.mean() for z in deviations])
+    within = sum(np.dot(z - m, z - m) for z, m in zip(deviations, group_means))
+    return levene_from_deviations([len(z) for z in deviations], group_means, within)
+
+def levene_from_deviations(sizes, group_means, within: float) -> Tuple[float, float]:
+    """
+    Estadístico W y p-value de Levene a partir de los tamaños, las medias de
+    las desviaciones a la mediana de cada grupo y su suma de cuadrados
+    dentro de los grupos (sin los datos)
+    """
+    sizes = np.asarray(sizes, dtype=np.float64)
+    group_means = np.asarray(group_means, dtype=np.float64)
+    total = sizes.sum()
+    grand_mean = np.dot(sizes, group_means) / total
+    
+    between = np.dot(sizes, (group_means - grand_mean)**2)
+    k = len(sizes)
+    statistic = (total - k) / (k - 1) * between / within
+    p_value = stats.f.sf(statistic, k - 1, total - k)
+    return float(statistic), float(p_value)
+
+def comprehensive_analysis(df_before: pd.DataFrame, df_after: pd.DataFrame,
+                           alpha: float = 0.05, bootstrap_resamples: int = 0,
+                           permutation_resamples: int = 0, seed: Optional[int] = None,
+                           quantile_sketches: Optional[Tuple[QuantileSketch, QuantileSketch]] = None) -> Dict[str, Any]:
     """
     Realiza análisis estadístico completo
     
     Args:
         df_before: DataFrame con datos antes
         df_after: DataFrame con datos después
+        alpha: Nivel de significancia (default 0.05)
+        bootstrap_resamples: Remuestras bootstrap (0 = sin sección 'bootstrap')
+        permutation_resamples: Permutaciones (0 = sin sección 'permutation_test')
+        seed: Semilla del remuestreo (None = aleatoria, se informa en el resultado)
+        quantile_sketches: Sketches (antes, después) de los mismos datos; si se
+            pasan, mediana y cuartiles (y la mediana de Levene) son aproximados
+            y se informa su cota de error
     
     Returns:
         Diccionario con todos los resultados del análisis
@@ -128,77 +251,75 @@ def comprehensive_analysis(df_before: pd.DataFrame, df_after: pd.DataFrame) -> D
     before_times = df_before['tiempo_atencion_min'].values
     after_times = df_after['tiempo_atencion_min'].values
     
-    # Estadísticas descriptivas
+    # Estadísticas descriptivas (un solo núcleo por período, compartido por los tests)
+    if quantile_sketches is None:
+        before_stats = describe(before_times)
+        after_stats = describe(after_times)
+    else:
+        before_stats = describe_with_sketch(moments(before_times), quantile_sketches[0])
+        after_stats = describe_with_sketch(moments(after_times), quantile_sketches[1])
     descriptive_stats = {
-        'antes': {
-            'n': len(before_times),
-            'media': float(np.mean(before_times)),
-            'mediana': float(np.median(before_times)),
-            'std': float(np.std(before_times, ddof=1)),
-            'var': float(np.var(before_times, ddof=1)),
-            'min': float(np.min(before_times)),
-            'max': float(np.max(before_times)),
-            'q25': float(np.percentile(before_times, 25)),
-            'q75': float(np.percentile(before_times, 75)),
-            'iqr': float(np.percentile(before_times, 75) - np.percentile(before_times, 25))
-        },
-        'despues': {
-            'n': len(after_times),
-            'media': float(np.mean(after_times)),
-            'mediana': float(np.median(after_times)),
-            'std': float(np.std(after_times, ddof=1)),
-            'var': float(np.var(after_times, ddof=1)),
-            'min': float(np.min(after_times)),
-            'max': float(np.max(after_times)),
-            'q25': float(np.percentile(after_times, 25)),
-            'q75': float(np.percentile(after_times, 75)),
-            'iqr': float(np.percentile(after_times, 75) - np.percentile(after_times, 25))
-        }
+        'antes': before_stats,
+        'despues': after_stats
     }
     
     # Tests estadísticos
-    ttest_results = welch_ttest(before_times, after_times)
-    cohens_results = cohens_d(before_times, after_times)
-    
-    # Test de normalidad (Shapiro-Wilk para muestras pequeñas, Anderson-Darling para grandes)
-    if len(before_times) <= 50:
-        normality_before = stats.shapiro(before_times)
-        normality_after = stats.shapiro(after_times)
-    else:
-        normality_before = stats.anderson(before_times, dist='norm')
-        normality_after = stats.anderson(after_times, dist='norm')
+    ttest_results = welch_ttest_from_stats(before_stats, after_stats, alpha)
+    cohens_results = cohens_d_from_stats(before_stats, after_stats)
     
     # Test de igualdad de varianzas (Levene)
-    levene_test = stats.levene(before_times, after_times)
+    levene_test = levene_median_test(before_times, after_times,
+                                     before_stats['mediana'], after_stats['mediana'])
+    
+    # Conclusiones de negocio
+    business_impact = business_impact_summary(
+        before_stats['media'], after_stats['media'], ttest_results, cohens_results, alpha
+    )
     
-    # Cálculos de mejora
-    mean_before = descriptive_stats['antes']['media']
-    mean_after = descriptive_stats['despues']['media']
+    results = {
+        'estadisticas_descriptivas': descriptive_stats,
+        'welch_ttest': ttest_results,
+        'cohens_d': cohens_results,
+        'normalidad': normality_tests(before_times, after_times),
+        'levene_test': {'statistic': float(levene_test[0]), 'p_value': float(levene_test[1])},
+        'impacto_negocio': business_impact,
+        'resumen_ejecutivo': generate_executive_summary(business_impact, ttest_results, cohens_results)
+    }
+    
+    # Intervalos bootstrap y test de permutación (no asumen normalidad)
+    if bootstrap_resamples:
+        results['bootstrap'] = bootstrap_analysis(before_times, after_times, bootstrap_resamples, alpha, seed)
+    if permutation_resamples:
+        results['permutation_test'] = permutation_test(before_times, after_times, permutation_resamples, alpha, seed)
+    
+    return results
+
+def business_impact_summary(mean_before: float, mean_after: float, ttest_results: Dict,
+                            cohens_results: Dict, alpha: float = 0.05) -> Dict[str, Any]:
+    """
+    Cálculos de mejora y conclusiones de negocio
+    
+    Args:
+        mean_before: Media del período antes
+        mean_after: Media del período después
+        ttest_results: Resultado de welch_ttest
+        cohens_results: Resultado de cohens_d
+        alpha: Nivel de significancia
+    
+    Returns:
+        Diccionario con reducción absoluta y porcentual, significancia y efecto
+    """
     absolute_reduction = mean_before - mean_after
     percentage_reduction = (absolute_reduction / mean_before) * 100
     
-    # Conclusiones de negocio
-    business_impact = {
+    return {
         'reduccion_absoluta_min': float(absolute_reduction),
         'reduccion_porcentual': float(percentage_reduction),
         'tiempo_ahorrado_por_cliente': float(absolute_reduction),
         'significancia_estadistica': ttest_results['is_significant'],
         'magnitud_efecto': cohens_results['effect_size_interpretation'],
         'direccion_cambio': cohens_results['direction'],
-        'confianza_resultado': 95 if ttest_results['is_significant'] else None
-    }
-    
-    return {
-        'estadisticas_descriptivas': descriptive_stats,
-        'welch_ttest': ttest_results,
-        'cohens_d': cohens_results,
-        'normalidad': {
-            'antes': {'statistic': float(normality_before[0]), 'p_value': float(normality_before[1])},
-            'despues': {'statistic': float(normality_after[0]), 'p_value': float(normality_after[1])}
-        },
-        'levene_test': {'statistic': float(levene_test[0]), 'p_value': float(levene_test[1])},
-        'impacto_negocio': business_impact,
-        'resumen_ejecutivo': generate_executive_summary(business_impact, ttest_results, cohens_results)
+        'confianza_resultado': round((1 - alpha) * 100, 2) if ttest_results['is_significant'] else None
     }
 
 def generate_executive_summary(business_impact: Dict, ttest_results: Dict, cohens_results: Dict) -> str:
@@ -222,7 +343,7 @@ RESULTADOS DEL ANÁLISIS KAIZEN - CAFETERÍA
 
 💼 IMPACTO DE NEGOCIO:
 • Cada cliente ahorra {business_impact['tiempo_ahorrado_por_cliente']:.2f} minutos
-• La mejora es estadísticamente significativa con 95% de confianza
+• La mejora es estadísticamente significativa con {business_impact['confianza_resultado']:g}% de confianza
 • La implementación Kaizen ha sido efectiva
         """
     else:
@@ -0,0 +1,122 @@
+"""
+Tareas CPU-bound del análisis Kaizen - Cafetería
+Funciones a nivel de módulo (serializables con pickle) que la API ejecuta en
+el pool de workers de src.executor
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from typing import Tuple, Dict, Any, List, Optional
+
+from src.generate_data import generate_simulation_data, get_simulation_summary, save_simulation_to_csv
+from src.statistical_analysis import comprehensive_analysis
+from src.segments import segmented_analysis
+from src.resampling import bootstrap_blocks, permutation_blocks
+from src.power_analysis import power_row
+from src.batch_analysis import batch_analysis
+from src.out_of_core import out_of_core_analysis
+from src.ingest import DEFAULT_CHUNK_ROWS
+from src.visualization import create_plot
+
+def run_simulation(params: Dict[str, Any],
+                   csv_path: Optional[str] = None) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]:
+    """
+    Genera un dataset simulado, lo guarda en CSV y calcula su resumen
+    
+    Args:
+        params: Argumentos de generate_simulation_data
+        csv_path: Ruta del CSV a escribir (None = no guardar)
+    
+    Returns:
+        Tuple con (DataFrame antes, DataFrame después, resumen estadístico)
+    """
+    df_before, df_after = generate_simulation_data(**params)
+    
+    if csv_path:
+        os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+        save_simulation_to_csv(df_before, df_after, csv_path)
+    
+    return df_before, df_after, get_simulation_summary(df_before, df_after)
+
+def run_analysis(df_before: pd.DataFrame, df_after: pd.DataFrame,
+                 alpha: float = 0.05, quantile_sketches: Optional[Tuple[Any, Any]] = None) -> Dict[str, Any]:
+    """
+    Ejecuta comprehensive_analysis sobre un dataset (con cuantiles
+    aproximados si se pasan los sketches)
+    """
+    return comprehensive_analysis(df_before, df_after, alpha, quantile_sketches=quantile_sketches)
+
+def run_bootstrap_blocks(before_times: np.ndarray, after_times: np.ndarray, n_resamples: int,
+                         seed: int, block_start: int, block_stop: int) -> np.ndarray:
+    """
+    Calcula un rango de bloques de réplicas bootstrap (ver resampling.bootstrap_blocks)
+    """
+    return bootstrap_blocks(before_times, after_times, n_resamples, seed, block_start, block_stop)
+
+def run_permutation_blocks(before_times: np.ndarray, after_times: np.ndarray, n_resamples: int,
+                           seed: int, block_start: int, block_stop: int) -> int:
+    """
+    Calcula un rango de bloques del test de permutación (ver resampling.permutation_blocks)
+    """
+    return permutation_blocks(before_times, after_times, n_resamples, seed, block_start, block_stop)
+
+def run_power_row(before_mean: float, before_std: float, after_std: float, n_before: int, n_after: int,
+                  reductions: List[float], n_replicates: int, seed: int, alpha: float = 0.05) -> np.ndarray:
+    """
+    Simula un tamaño de muestra de la grilla de potencia (ver power_analysis.power_row)
+    """
+    return power_row(before_mean, before_std, after_std, n_before, n_after, reductions,
+                     n_replicates, seed, alpha)
+
+def run_batch_analysis(names: List[str], values: np.ndarray, counts: np.ndarray,
+                       alpha: float = 0.05, include_normality: bool = False) -> Dict[str, Any]:
+    """
+    Ejecuta batch_analysis sobre datasets apilados (ver batch_analysis.stack_datasets)
+    """
+    return batch_analysis(names, values, counts, alpha, include_normality)
+
+def run_segmented_analysis(df_before: pd.DataFrame, df_after: pd.DataFrame, by: List[str],
+                           alpha: float = 0.05, correction: str = 'holm',
+                           min_n: int = 2) -> Dict[str, Any]:
+    """
+    Ejecuta segmented_analysis sobre un dataset
+    """
+    return segmented_analysis(df_before, df_after, by, alpha, correction, min_n)
+
+def run_out_of_core_analysis(path: str, fmt: str, alpha: float = 0.05,
+                             chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Dict[str, Any]:
+    """
+    Analiza un archivo por chunks sin cargarlo en memoria (ver out_of_core.out_of_core_analysis)
+    """
+    return out_of_core_analysis(path, fmt, alpha, chunk_rows)
+
+def render_plot(plot_type: str, df_before: pd.DataFrame, df_after: pd.DataFrame,
+                analysis_results: Dict[str, Any], output_path: str,
+                profile: str = 'print') -> str:
+    """
+    Renderiza un gráfico (individual o dashboard)
+    
+    El archivo se escribe con un nombre temporal y se renombra al terminar,
+    de modo que nunca se sirve una imagen a medio escribir.
+    
+    Args:
+        plot_type: Tipo de gráfico (ver PLOT_FILENAMES)
+        df_before: DataFrame con datos antes (basta con PLOT_COLUMNS[plot_type])
+        df_after: DataFrame con datos después (basta con PLOT_COLUMNS[plot_type])
+        analysis_results: Resultados de comprehensive_analysis
+        output_path: Ruta final del gráfico (la extensión define el formato)
+        profile: Perfil de renderizado (ver RENDER_PROFILES)
+    
+    Returns:
+        Ruta del gráfico generado
+    """
+    base, extension = os.path.splitext(output_path)
+    temporary_path = f"{base}.{os.getpid()}.tmp{extension}"
+    try:
+        create_plot(plot_type, df_before, df_after, analysis_results, temporary_path, profile)
+        os.replace(temporary_path, output_path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+    return output_path
@@ -3,21 +3,70 @@ Módulo de visualización para análisis Kaizen - Cafetería
 Genera gráficos estadísticos y los guarda como archivos PNG
 """
 
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use('Agg')  # Backend sin interfaz: se renderiza en servidores y workers
+from matplotlib.figure import Figure
 import seaborn as sns
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, Optional
 import os
 from datetime import datetime
 
-# Configurar estilo de matplotlib
-plt.style.use('default')
-sns.set_palette("husl")
+# Nombre de archivo de cada gráfico dentro del directorio de salida
+PLOT_FILENAMES = {
+    'histogram': 'histogram_comparison.png',
+    'boxplot': 'boxplot_comparison.png',
+    'timeline': 'timeline_analysis.png',
+    'summary': 'statistical_summary.png',
+    'dashboard': 'dashboard_completo.png'
+}
+
+# Gráficos que muestran resultados del análisis (dependen de sus parámetros, p.ej. alpha)
+ANALYSIS_PLOT_TYPES = {'summary', 'dashboard'}
+
+# Perfiles de renderizado: resolución y recorte de márgenes
+# ('tight' exige una pasada extra de layout; solo compensa para impresión)
+RENDER_PROFILES = {
+    'preview': {'dpi': 72, 'bbox_inches': None},
+    'screen': {'dpi': 110, 'bbox_inches': None},
+    'print': {'dpi': 300, 'bbox_inches': 'tight'}
+}
+
+# Formatos de salida soportados y su media type
+PLOT_FORMATS = {
+    'png': 'image/png',
+    'webp': 'image/webp',
+    'svg': 'image/svg+xml'
+}
+
+# Ajustes para SVG: simplificar trazos, texto como texto e IDs deterministas
+SVG_RC_PARAMS = {
+    'path.simplify': True,
+    'path.simplify_threshold': 0.5,
+    'svg.fonttype': 'none',
+    'svg.hashsalt': 'kaizen'
+}
+
+# Columnas que necesita cada gráfico (se envía solo eso a los workers)
+PLOT_COLUMNS = {
+    'histogram': ['tiempo_atencion_min'],
+    'boxplot': ['tiempo_atencion_min'],
+    'timeline': ['fecha', 'periodo', 'tiempo_atencion_min'],
+    'summary': [],
+    'dashboard': ['tiempo_atencion_min']
+}
 
 def setup_plot_style():
-    """Configura el estilo global de los gráficos"""
-    plt.rcParams.update({
+    """
+    Configura el estilo global de los gráficos
+    
+    Se aplica una sola vez al importar el módulo: las figuras se crean con la
+    API orientada a objetos (Figure) y no modifican estado global después.
+    """
+    matplotlib.style.use('default')
+    sns.set_palette("husl")
+    matplotlib.rcParams.update({
         'figure.figsize': (12, 8),
         'font.size': 11,
         'axes.titlesize': 14,
@@ -26,18 +75,45 @@ def setup_plot_style():
         'ytick.labelsize': 10,
         'legend.fontsize': 11,
         'figure.dpi': 100,
-        'savefig.dpi': 300,
-        'savefig.bbox': 'tight'
+        'savefig.dpi': 300
     })
 
+setup_plot_style()
+
+def plot_filename(plot_type: str, fmt: str = 'png') -> str:
+    """
+    Nombre de archivo de un gráfico en el formato indicado
+    """
+    return f"{os.path.splitext(PLOT_FILENAMES[plot_type])[0]}.{fmt}"
+
+def save_figure(fig: Figure, output_path: str, profile: str = 'print') -> str:
+    """
+    Guarda una figura con un perfil de renderizado, creando el directorio si
+    no existe (el formato se deduce de la extensión: png, webp o svg)
+    """
+    if profile not in RENDER_PROFILES:
+        raise ValueError(f"Perfil '{profile}' no soportado. Disponibles: {list(RENDER_PROFILES.keys())}")
+    fmt = os.path.splitext(output_path)[1].lstrip('.').lower()
+    if fmt not in PLOT_FORMATS:
+        raise ValueError(f"Formato '{fmt}' no soportado. Disponibles: {list(PLOT_FORMATS.keys())}")
+    
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    settings = RENDER_PROFILES[profile]
+    if fmt == 'svg':
+        with matplotlib.rc_context(SVG_RC_PARAMS):
+            fig.savefig(output_path, format=fmt, metadata={'Date': None}, **settings)
+    else:
+        fig.savefig(output_path, format=fmt, **settings)
+    return output_path
+
 def create_comparison_histogram(df_before: pd.DataFrame, df_after: pd.DataFrame, 
-                              output_path: str = "reports/histogram_comparison.png") -> str:
+                              output_path: str = "reports/histogram_comparison.png",
+                              profile: str = 'print') -> str:
     """
     Crea histograma comparativo de tiempos antes vs después
     """
-    setup_plot_style()
-    
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+    fig = Figure(figsize=(15, 6))
+    ax1, ax2 = fig.subplots(1, 2)
     
     before_times = df_before['tiempo_atencion_min']
     after_times = df_after['tiempo_atencion_min']
@@ -62,31 +138,20 @@ def create_comparison_histogram(df_before: pd.DataFrame, df_after: pd.DataFrame,
     ax2.legend()
     ax2.grid(True, alpha=0.3)
     
-    plt.suptitle('Comparación de Tiempos de Atención - Análisis Kaizen', 
-                 fontsize=16, fontweight='bold', y=1.02)
-    plt.tight_layout()
-    
-    # Crear directorio si no existe
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.suptitle('Comparación de Tiempos de Atención - Análisis Kaizen', 
+                 fontsize=16, fontweight='bold')
+    fig.tight_layout()
     
-    return output_path
+    return save_figure(fig, output_path, profile)
 
 def create_boxplot_comparison(df_before: pd.DataFrame, df_after: pd.DataFrame,
-                            output_path: str = "reports/boxplot_comparison.png") -> str:
+                            output_path: str = "reports/boxplot_comparison.png",
+                            profile: str = 'print') -> str:
     """
     Crea boxplot comparativo de tiempos antes vs después
     """
-    setup_plot_style()
-    
-    # Combinar datos para boxplot
-    df_combined = pd.concat([
-        df_before[['tiempo_atencion_min']].assign(periodo='Antes'),
-        df_after[['tiempo_atencion_min']].assign(periodo='Después')
-    ])
-    
-    fig, ax = plt.subplots(figsize=(10, 8))
+    fig = Figure(figsize=(10, 8))
+    ax = fig.subplots()
     
     # Crear boxplot
     box_plot = ax.boxplot([df_before['tiempo_atencion_min'], df_after['tiempo_atencion_min']], 
@@ -120,31 +185,26 @@ def create_boxplot_comparison(df_before: pd.DataFrame, df_after: pd.DataFrame,
             bbox=dict(boxstyle="round,pad=0.3", facecolor="yellow", alpha=0.7),
             verticalalignment='top')
     
-    plt.tight_layout()
+    fig.tight_layout()
     
-    # Crear directorio si no existe
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    return output_path
+    return save_figure(fig, output_path, profile)
 
 def create_timeline_plot(df_before: pd.DataFrame, df_after: pd.DataFrame,
-                        output_path: str = "reports/timeline_analysis.png") -> str:
+                        output_path: str = "reports/timeline_analysis.png",
+                        profile: str = 'print') -> str:
     """
     Crea gráfico de línea temporal mostrando evolución de tiempos
     """
-    setup_plot_style()
-    
     # Combinar datos
     df_combined = pd.concat([df_before, df_after])
     df_combined['fecha'] = pd.to_datetime(df_combined['fecha'])
     
     # Agrupar por semana
     df_combined['semana'] = df_combined['fecha'].dt.to_period('W')
-    weekly_stats = df_combined.groupby(['semana', 'periodo'])['tiempo_atencion_min'].agg(['mean', 'std']).reset_index()
+    weekly_stats = df_combined.groupby(['semana', 'periodo'], observed=True)['tiempo_atencion_min'].agg(['mean', 'std']).reset_index()
     
-    fig, ax = plt.subplots(figsize=(14, 8))
+    fig = Figure(figsize=(14, 8))
+    ax = fig.subplots()
     
     # Separar datos por período
     before_data = weekly_stats[weekly_stats['periodo'] == 'antes']
@@ -175,24 +235,19 @@ def create_timeline_plot(df_before: pd.DataFrame, df_after: pd.DataFrame,
     ax.grid(True, alpha=0.3)
     
     # Rotar etiquetas del eje x
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    
-    # Crear directorio si no existe
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
     
-    return output_path
+    return save_figure(fig, output_path, profile)
 
 def create_statistical_summary_plot(analysis_results: Dict[str, Any],
-                                  output_path: str = "reports/statistical_summary.png") -> str:
+                                  output_path: str = "reports/statistical_summary.png",
+                                  profile: str = 'print') -> str:
     """
     Crea gráfico resumen con estadísticas principales
     """
-    setup_plot_style()
-    
-    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
+    fig = Figure(figsize=(16, 12))
+    (ax1, ax2), (ax3, ax4) = fig.subplots(2, 2)
     
     # Extraer datos
     stats_antes = analysis_results['estadisticas_descriptivas']['antes']
@@ -264,19 +319,34 @@ def create_statistical_summary_plot(analysis_results: Dict[str, Any],
     ax4.set_ylim(0, 1)
     ax4.axis('off')
     
-    plt.suptitle('Resumen Estadístico - Análisis Kaizen Cafetería', 
+    fig.suptitle('Resumen Estadístico - Análisis Kaizen Cafetería', 
                  fontsize=16, fontweight='bold')
-    plt.tight_layout()
+    fig.tight_layout()
     
-    # Crear directorio si no existe
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    return output_path
+    return save_figure(fig, output_path, profile)
+
+def create_plot(plot_type: str, df_before: pd.DataFrame, df_after: pd.DataFrame,
+                analysis_results: Dict[str, Any], output_path: str,
+                profile: str = 'print') -> str:
+    """
+    Genera un gráfico por tipo (ver PLOT_FILENAMES) y retorna su ruta
+    """
+    if plot_type == 'histogram':
+        return create_comparison_histogram(df_before, df_after, output_path, profile)
+    if plot_type == 'boxplot':
+        return create_boxplot_comparison(df_before, df_after, output_path, profile)
+    if plot_type == 'timeline':
+        return create_timeline_plot(df_before, df_after, output_path, profile)
+    if plot_type == 'summary':
+        return create_statistical_summary_plot(analysis_results, output_path, profile)
+    if plot_type == 'dashboard':
+        return create_combined_dashboard(df_before, df_after, analysis_results, output_path, profile)
+    raise ValueError(f"Tipo de gráfico no soportado: {plot_type}")
 
 def generate_all_plots(df_before: pd.DataFrame, df_after: pd.DataFrame, 
-                      analysis_results: Dict[str, Any]) -> Dict[str, str]:
+                      analysis_results: Dict[str, Any],
+                      output_dir: str = "reports",
+                      plot_types: Optional[List[str]] = None) -> Dict[str, str]:
     """
     Genera todos los gráficos y retorna las rutas de los archivos
     
@@ -284,37 +354,40 @@ def generate_all_plots(df_before: pd.DataFrame, df_after: pd.DataFrame,
         df_before: DataFrame con datos antes
         df_after: DataFrame con datos después  
         analysis_results: Resultados del análisis estadístico
+        output_dir: Directorio donde se guardan los gráficos
+        plot_types: Gráficos a generar (por defecto todos menos el dashboard)
     
     Returns:
         Diccionario con rutas de todos los gráficos generados
     """
     plot_paths = {}
-    
-    try:
-        # Crear todos los gráficos
-        plot_paths['histogram'] = create_comparison_histogram(df_before, df_after)
-        plot_paths['boxplot'] = create_boxplot_comparison(df_before, df_after)
-        plot_paths['timeline'] = create_timeline_plot(df_before, df_after)
-        plot_paths['summary'] = create_statistical_summary_plot(analysis_results)
-        
-        print(f"✅ Gráficos generados exitosamente:")
-        for plot_type, path in plot_paths.items():
-            print(f"  - {plot_type}: {path}")
-            
-    except Exception as e:
-        print(f"❌ Error generando gráficos: {e}")
+    if plot_types is None:
+        plot_types = ['histogram', 'boxplot', 'timeline', 'summary']
+    
+    # Crear los gráficos solicitados (un error no descarta los demás)
+    for plot_type in plot_types:
+        try:
+            plot_paths[plot_type] = create_plot(
+                plot_type, df_before, df_after, analysis_results,
+                os.path.join(output_dir, PLOT_FILENAMES[plot_type])
+            )
+        except Exception as e:
+            print(f"❌ Error generando gráfico {plot_type}: {e}")
+    
+    print(f"✅ Gráficos generados exitosamente:")
+    for plot_type, path in plot_paths.items():
+        print(f"  - {plot_type}: {path}")
         
     return plot_paths
 
 def create_combined_dashboard(df_before: pd.DataFrame, df_after: pd.DataFrame,
                             analysis_results: Dict[str, Any],
-                            output_path: str = "reports/dashboard_completo.png") -> str:
+                            output_path: str = "reports/dashboard_completo.png",
+                            profile: str = 'print') -> str:
     """
     Crea un dashboard completo con todos los análisis en una sola imagen
     """
-    setup_plot_style()
-    
-    fig = plt.figure(figsize=(20, 16))
+    fig = Figure(figsize=(20, 16))
     
     # Configurar grid de subplots
     gs = fig.add_gridspec(3, 3, hspace=0.3, wspace=0.3)
@@ -427,12 +500,7 @@ Significativo: {'SÍ' if ttest['is_significant'] else 'NO'}"""
     fig.suptitle('DASHBOARD COMPLETO - ANÁLISIS KAIZEN CAFETERÍA', 
                  fontsize=20, fontweight='bold', y=0.98)
     
-    # Crear directorio si no existe
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    return output_path
+    return save_figure(fig, output_path, profile)
 
 if __name__ == "__main__":
     # Ejemplo de uso para testing
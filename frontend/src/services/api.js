@@ -44,6 +44,97 @@ class ApiService {
     }
   }
 
+  /**
+   * Query string ('?a=1&b=2', o '' si no hay parámetros) sin valores undefined/null
+   * @param {Object} params
+   */
+  buildQuery(params = {}) {
+    const query = new URLSearchParams(
+      Object.entries(params).filter(([, value]) => value !== undefined && value !== null)
+    ).toString();
+    return query ? `?${query}` : '';
+  }
+
+  /**
+   * Datos agregados para dibujar un gráfico en el cliente
+   * @param {'histogram'|'boxplot'|'timeline'} chartType
+   * @param {Object} params - dataset_id, bins, max_outliers, quantiles (boxplot: 'exact'|'approx'), relative_accuracy
+   */
+  async getChartData(chartType, params = {}) {
+    return this.request(`/charts/${chartType}${this.buildQuery(params)}`);
+  }
+
+  /**
+   * Análisis antes vs después por segmento
+   * @param {Object} params - dataset_id, by (p. ej. 'servidor,franja_horaria'), alpha, correction, min_n
+   */
+  async getSegmentAnalysis(params = {}) {
+    return this.request(`/analyze/segments${this.buildQuery(params)}`);
+  }
+
+  /**
+   * Análisis completo de varios datasets en una sola llamada
+   * @param {Object[]} datasets - { nombre, antes: number[], despues: number[] }
+   * @param {Object} options - alpha, include_normality
+   */
+  async analyzeBatch(datasets, options = {}) {
+    return this.request('/analyze/batch', {
+      method: 'POST',
+      body: JSON.stringify({ ...options, datasets })
+    });
+  }
+
+  /**
+   * Análisis completo de un dataset persistido, leído por chunks en el servidor
+   * @param {string} datasetId - ID usado en /data/save
+   * @param {Object} params - format, alpha, chunk_rows
+   */
+  async analyzeStoredDataset(datasetId, params = {}) {
+    return this.request(`/analyze/stored${this.buildQuery({ ...params, dataset_id: datasetId })}`);
+  }
+
+  /**
+   * Curvas de potencia y tamaño de muestra mínimo por simulación
+   * @param {Object} params - Parámetros de /simulate más n_grid, reductions, n_replicates, alpha, target_power
+   */
+  async getPowerAnalysis(params = {}) {
+    return this.request('/power', {
+      method: 'POST',
+      body: JSON.stringify(params)
+    });
+  }
+
+  /**
+   * Anexa observaciones a un dataset y devuelve el análisis actualizado
+   * @param {string} datasetId
+   * @param {Object[]} observaciones - { fecha, tiempo_atencion_min, periodo?, servidor?, franja_horaria? }
+   * @param {'antes'|'despues'} periodo - Período por defecto de las observaciones
+   */
+  async appendObservations(datasetId, observaciones, periodo = 'despues') {
+    return this.request(`/datasets/${datasetId}/append`, {
+      method: 'POST',
+      body: JSON.stringify({ periodo, observaciones })
+    });
+  }
+
+  /**
+   * Análisis en línea desde los momentos acumulados de un dataset
+   * @param {string} datasetId
+   * @param {Object} params - alpha, include_quantiles, quantiles ('exact'|'approx'), relative_accuracy
+   */
+  async getOnlineAnalysis(datasetId, params = {}) {
+    return this.request(`/datasets/${datasetId}/online${this.buildQuery(params)}`);
+  }
+
+  /**
+   * Test secuencial (p-value siempre válido y punto de parada) de un dataset
+   * @param {string} datasetId
+   * @param {Object} params - alpha, curve_points
+   */
+  async getSequentialAnalysis(datasetId, params = {}) {
+    return this.request(`/datasets/${datasetId}/sequential${this.buildQuery(params)}`);
+  }
+
   // ... resto de métodos igual
 }
 